@@ -1,43 +1,208 @@
 from flask import Flask , render_template
 
 from controllers.home_controller import home_bp
-from controllers.model_controller import api_bp, init_crop_controller_with_translator,init_disease_controller,init_crop_controller
+from controllers.stream_controller import stream_bp, init_stream_controller
+from controllers.model_controller import api_bp, init_crop_controller_with_translator,init_disease_controller,init_crop_controller,init_history_controller,init_full_check_controller
+
+from controllers.health_controller import health_bp, init_health_controller
+from controllers.metrics_controller import metrics_bp
 
-from services.disease_service import DiseaseService
-from services.crop_service import CropService
 from services.sensor_service import SensorService
+from services.soil_history import SoilHistory
+from services.full_check_service import FullCheckService
+from services.scan_session import ScanSessionStore, SharedScanSessionStore
+from services.sensor_daemon import SensorDaemon, RemoteSensorService, RemoteSoilHistory, proxy_metrics
 from services.translation_service import TranslationService
+from services.model_registry import ModelRegistry, import_tflite
+from services import prefork
+from utilities import metrics
 
-try:
-    import tflite_runtime.interpreter as tflite
-except ImportError:
-    import tensorflow.lite as tflite
+# Largest request body accepted (same bound as the ASGI handlers)
+MAX_CONTENT_LENGTH = 10 * 1024 * 1024
 
-def create_app():
-    app = Flask(__name__)
 
-    disease_service = DiseaseService(
-        model_path="models/plant_disease_model.tflite",
+# --------------------------------------------------
+# MODEL LOADERS (heavy imports happen here, not at boot)
+# --------------------------------------------------
+def tune_disease_model():
+    """Fastest threads / XNNPACK for this host (cached)"""
+    from services.model_tuner import ModelTuner
+
+    return ModelTuner(
+        "models/plant_disease_model.tflite",
+        import_tflite(),
+        cache_path="data/model_tuning.json"
+    ).tune()
+
+def load_disease_service():
+    from services.disease_service import DiseaseService
+    from services.leaf_gate import LeafGate
+
+    tuning = prefork.get("disease_tuning") or tune_disease_model()
+
+    # Pre-forked workers split the cores between them
+    workers = prefork.get("workers", 1)
+
+    # Interpreters (and their threads) are always built in the
+    # worker; only the flatbuffer bytes may come from the master
+    return DiseaseService(
+        model_path=tuning["model_path"],
         labels_path="data/class_names.txt",
-        tflite=tflite
+        tflite=import_tflite(),
+        num_interpreters=max(1, tuning["num_interpreters"] // workers),
+        num_threads=tuning["num_threads"],
+        xnnpack=tuning["xnnpack"],
+        model_content=prefork.get("disease_model"),
+        leaf_gate=LeafGate()
     )
 
-    sensor_service = SensorService(simulate_on_fail=True)
+def load_crop_service(shared_memory=False):
+    preloaded = prefork.get("crop")
+    if preloaded is not None:
+        return preloaded
+
+    from services.crop_service import CropService
 
-    crop_service = CropService(
+    return CropService(
         model_path="models/random_forest.pkl",
         scaler_path="models/scaler.pkl",
-        targets_path="models/targets.pkl"
+        targets_path="models/targets.pkl",
+        inference_engine="compiled",
+        shared_memory=shared_memory
+    )
+
+def read_model_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def build_sensor_services():
+    """SensorService (background poller) writing into SoilHistory."""
+    soil_history = SoilHistory("data/soil_history.db")
+    sensor_service = SensorService(
+        simulate_on_fail=True,
+        background_poll=True,
+        history=soil_history
     )
+    return sensor_service, soil_history
 
-    translation_service=TranslationService()
+def prepare_prefork(workers=1, threads=None, preload_models=False):
+    """
+    Runs ONCE in the gunicorn master, before fork (see gunicorn.conf.py):
+    - disease model tuning, so workers never calibrate concurrently
+    - the worker count, which splits the cores between the
+      workers' interpreter pools
+    - the SensorDaemon: the ONE process polling the sensor and
+      writing soil history for all workers
+    - the WebSocket stream limit: each open stream holds one of a
+      worker's `threads`, so at most half of them may stream and the
+      rest always serve HTTP
+    preload_models: also load model artifacts here so forked workers
+    share them (TFLite flatbuffer bytes, CropService with its compiled
+    forest in shared memory); otherwise models load in each worker.
+    Nothing here starts a thread in the master.
+    """
+    prefork.prepare("workers", lambda: workers)
+    if threads:
+        prefork.prepare("max_streams", lambda: max(1, threads // 2))
+    tuning = prefork.prepare("disease_tuning", tune_disease_model)
+    prefork.prepare("sensor_daemon", lambda: SensorDaemon(build_sensor_services).start())
+
+    if preload_models:
+        prefork.prepare("disease_model", lambda: read_model_file(tuning["model_path"]))
+        prefork.prepare("crop", lambda: load_crop_service(shared_memory=True))
+
+def shutdown_prefork():
+    """Stops what prepare_prefork started (gunicorn master exit)."""
+    daemon = prefork.get("sensor_daemon")
+    if daemon is not None:
+        daemon.stop()
+
+def build_services(model_loading="background", sensor_service=None, translation_service=None):
+    """
+    Constructs every service ONCE.
+    Shared by the WSGI app (create_app) and the ASGI adapter (asgi.py).
+    model_loading: eager | background | lazy (see ModelRegistry)
+    sensor_service / translation_service: replacements (e.g. fakes
+    for bench.py); the real services are built when not given
+    """
+    registry = ModelRegistry(mode=model_loading)
+    disease_service = registry.register("disease", load_disease_service)
+    crop_service = registry.register("crop", load_crop_service)
+    registry.start()
+
+    daemon = prefork.get("sensor_daemon")
+    if daemon is not None:
+        # Pre-forked worker: the sensor daemon owns the bus and the history
+        client = daemon.client()
+        proxy_metrics(client)
+        soil_history = RemoteSoilHistory(client)
+        if sensor_service is None:
+            sensor_service = RemoteSensorService(client)
+    elif sensor_service is None:
+        sensor_service, soil_history = build_sensor_services()
+    else:
+        soil_history = SoilHistory("data/soil_history.db")
+
+    # Several workers: frames of one scan may land on any of them
+    if prefork.get("workers", 1) > 1:
+        scan_sessions = SharedScanSessionStore("data/scan_sessions.db")
+    else:
+        scan_sessions = ScanSessionStore()
+
+    if translation_service is None:
+        translation_service=TranslationService(
+            db_path="data/translations.db",
+            dictionary_path="data/translations.json"
+        )
     
-    init_disease_controller(disease_service)
-    init_crop_controller_with_translator(crop_service,sensor_service,translation_service)
+    return {
+        "registry": registry,
+        "disease": disease_service,
+        "sensor": sensor_service,
+        "crop": crop_service,
+        "translation": translation_service,
+        "history": soil_history,
+        # Shared by HTTP polling and the WebSocket stream
+        "scan_sessions": scan_sessions,
+        "full_check": FullCheckService(
+            sensor_service,
+            crop_service,
+            disease_service,
+            translation_service
+        )
+    }
+
+def create_app(services=None, enable_metrics=True):
+    """
+    services: dict from build_services() (built here if not given)
+    enable_metrics: record stage timings for /metrics
+    (off: instrumentation is a no-op)
+    """
+    app = Flask(__name__)
+    # Bounds every request body (frames, CSV uploads) BEFORE it is read
+    app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
+    metrics.enable(enable_metrics)
+
+    if services is None:
+        services = build_services()
+
+    init_disease_controller(services["disease"], services["scan_sessions"])
+    init_stream_controller(
+        services["disease"],
+        services["scan_sessions"],
+        max_streams=prefork.get("max_streams")
+    )
+    init_crop_controller_with_translator(services["crop"],services["sensor"],services["translation"])
+    init_history_controller(services["history"])
+    init_full_check_controller(services["full_check"])
+    init_health_controller(services["registry"])
 
 
     app.register_blueprint(home_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(metrics_bp)
     app.register_blueprint(api_bp, url_prefix="/api")
+    app.register_blueprint(stream_bp, url_prefix="/api")
 
     return app
 
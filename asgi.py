@@ -0,0 +1,232 @@
+"""
+ASGI entry point (async serving mode):
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Hot endpoints are served by native async handlers that await the
+services through AsyncServiceGateway; every other route (pages,
+batch, history, full check, ...) is the regular Flask app behind
+WsgiToAsgi. Both share ONE set of services.
+"""
+
+import json
+import time
+from urllib.parse import parse_qs
+
+import numpy as np
+from asgiref.wsgi import WsgiToAsgi
+
+from app import MAX_CONTENT_LENGTH, build_services, create_app
+from controllers.metrics_controller import REQUEST_SECONDS
+from services.async_gateway import AsyncServiceGateway
+from utilities import metrics
+
+# Largest request body accepted by the async handlers
+MAX_BODY_BYTES = MAX_CONTENT_LENGTH
+
+services = build_services()
+flask_app = create_app(services)
+gateway = AsyncServiceGateway(services)
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+# --------------------------------------------------
+# REQUEST / RESPONSE HELPERS
+# --------------------------------------------------
+def _headers(scope):
+    return {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+
+def _query(scope):
+    return {k: v[0] for k, v in parse_qs(scope["query_string"].decode()).items()}
+
+def _mimetype(scope):
+    return _headers(scope).get("content-type", "").split(";")[0].strip().lower()
+
+def _lang(scope):
+    return _headers(scope).get("x-language", "en")
+
+def _fresh(scope):
+    return _query(scope).get("fresh", "").lower() in ("1", "true", "yes")
+
+def _top_k(scope):
+    try:
+        return max(1, int(_query(scope).get("top_k", 1)))
+    except ValueError:
+        return 1
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise PayloadTooLarge()
+        if not message.get("more_body"):
+            return body
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+# --------------------------------------------------
+# ASYNC HANDLERS (same responses as model_controller)
+# --------------------------------------------------
+async def read_soil(scope, receive):
+    soil, meta = await gateway.read_soil_with_meta(fresh=_fresh(scope))
+    return 200, {**soil, "meta": meta}
+
+async def recommend_crops(scope, receive):
+    await _read_body(receive)
+
+    lang = _lang(scope)
+    soil, _ = await gateway.read_soil_with_meta(fresh=_fresh(scope))
+    try:
+        recommendations = await gateway.recommend_crops(soil)
+    except ValueError as e:
+        return 400, {"error": f"Invalid soil parameters: {e}"}
+    await gateway.name_crops(recommendations, lang)
+
+    return 200, {
+        "soil": soil,
+        "recommendations": recommendations,
+        "language": lang
+    }
+
+async def fertilizer_advice(scope, receive):
+    try:
+        data = json.loads(await _read_body(receive) or b"null")
+    except ValueError:
+        data = None
+    if not data:
+        return 400, {"error": "Invalid or missing JSON"}
+
+    crop = data.get("crop")
+    soil, _ = await gateway.read_soil_with_meta(fresh=_fresh(scope))
+
+    try:
+        soil_data = {
+            "N": float(soil["N"]),
+            "P": float(soil["P"]),
+            "K": float(soil["K"]),
+            "temperature": float(soil["temperature"]),
+            "humidity": float(soil["humidity"]),
+            "ph": float(soil["ph"]),
+            "rainfall": float(soil.get("rainfall", 0))
+        }
+    except Exception:
+        return 400, {"error": "Invalid soil parameters"}
+
+    try:
+        alerts = await gateway.fertilizer_alerts(crop, soil_data)
+    except ValueError as e:
+        return 400, {"error": f"Invalid soil parameters: {e}"}
+    advice = await gateway.localize_alerts(alerts, _lang(scope))
+
+    return 200, {
+        "crop": crop,
+        "fertilizer_advice": advice,
+        "alerts": alerts
+    }
+
+async def detect_disease(scope, receive):
+    body = await _read_body(receive)
+    if not body:
+        return 400, {"error": "No frame received"}
+
+    try:
+        frame = await gateway.decode_frame(np.frombuffer(body, np.uint8))
+        if frame is None:
+            return 400, {"error": "Invalid image"}
+
+        query = _query(scope)
+        session_id = _headers(scope).get("x-scan-session") or query.get("session")
+        session = services["scan_sessions"].get(session_id) if session_id else None
+
+        result = await gateway.detect_disease(
+            frame,
+            crop=query.get("crop", "TOMATO"),
+            session=session,
+            top_k=_top_k(scope)
+        )
+        return 200, result
+
+    except Exception as e:
+        print("Disease detection error:", e)
+        return 500, {"error": "Processing failed"}
+
+def _is_binary(scope):
+    mimetype = _mimetype(scope)
+    return mimetype == "application/octet-stream" or mimetype.startswith("image/")
+
+# (method, path) -> (handler, predicate); predicate False -> Flask
+ROUTES = {
+    ("GET", "/api/read-soil"): (read_soil, None),
+    ("POST", "/api/recommend-crops"): (recommend_crops, None),
+    ("POST", "/api/fertilizer-advice"): (fertilizer_advice, None),
+    # JSON / multipart frames keep using the Flask view
+    ("POST", "/api/detect-disease"): (detect_disease, _is_binary),
+}
+
+
+# --------------------------------------------------
+# ASGI APP
+# --------------------------------------------------
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+
+    if scope["type"] == "websocket":
+        # WebSocket streaming needs the WSGI server (flask-sock);
+        # closing makes disease.js fall back to HTTP polling
+        await receive()
+        return await send({"type": "websocket.close"})
+
+    route = ROUTES.get((scope["method"], scope["path"]))
+    if route is None or (route[1] and not route[1](scope)):
+        return await wsgi_app(scope, receive, send)
+
+    handler = route[0]
+    t0 = time.perf_counter()
+    try:
+        status, payload = await handler(scope, receive)
+    except PayloadTooLarge:
+        status, payload = 413, {"error": "Request body too large"}
+    except Exception as e:
+        # Same JSON envelope as the Flask views
+        print(f"[ASGI] {scope['method']} {scope['path']} failed:", e)
+        status, payload = 500, {"error": "Internal server error"}
+
+    await _send_json(send, status, payload)
+
+    # Same series as the Flask request hook (endpoint = view name)
+    if metrics.enabled():
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - t0,
+            f"api.{handler.__name__}",
+            scope["method"],
+            str(status)
+        )
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            gateway.shutdown()
+            services["sensor"].stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utilities.localization import localize_alerts, name_crops
+
+
+# Max concurrent calls per service. The sensor is ONE serial bus;
+# crop scoring is CPU-bound; translation is network-bound.
+# "disease" defaults to what the InferenceEngine can batch
+# (max_batch_size x interpreters, read once the model is loaded),
+# so micro-batches can fill up.
+DEFAULT_LIMITS = {
+    "sensor": 1,
+    "crop": 4,
+    "translation": 16,
+}
+
+# Services whose calls are blocking I/O rather than CPU work
+IO_SERVICES = ("sensor", "translation")
+
+
+class AsyncServiceGateway:
+    """
+    Awaitable facade over the synchronous services.
+
+    Blocking calls run on bounded thread pools (one for CPU-bound
+    inference, one for serial / network I/O), and each service has
+    its own concurrency limit, so slow sensor or translation calls
+    queue on the event loop instead of holding worker threads.
+
+    Services may be ModelProxy objects: even attribute access can
+    wait for a model to load, so it also happens off the loop.
+    """
+
+    def __init__(self, services, limits=None, cpu_workers=None, io_workers=32):
+        self.services = services
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=cpu_workers or os.cpu_count() or 2,
+            thread_name_prefix="async-cpu"
+        )
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=io_workers,
+            thread_name_prefix="async-io"
+        )
+
+        # Disease calls mostly wait on the engine's batches: they get
+        # their own pool, sized to the disease limit (on first use)
+        self.disease_executor = None
+        self._disease_lock = asyncio.Lock()
+
+        # Semaphores belong to an event loop: created on first use
+        self._semaphores = {}
+
+    # --------------------------------------------------
+    # GENERIC DISPATCH
+    # --------------------------------------------------
+    async def call(self, service, method, *args, **kwargs):
+        """Runs services[service].method(*args, **kwargs) off the loop."""
+        target = self.services[service]
+        return await self.run(
+            service, lambda: getattr(target, method)(*args, **kwargs)
+        )
+
+    async def run(self, service, fn, *args, **kwargs):
+        """Runs fn off the loop under the limits of `service`."""
+        if service == "disease" and self.disease_executor is None:
+            await self._start_disease_pool()
+
+        executor = self._executor(service)
+
+        async with self._semaphore(service):
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(fn, *args, **kwargs)
+            )
+
+    async def _start_disease_pool(self):
+        """
+        Sizes the disease limit and pool from the engine (first call).
+        Reading the engine waits for the model, so it runs on an I/O
+        thread; other requests keep being served meanwhile.
+        """
+        async with self._disease_lock:
+            if self.disease_executor is not None:
+                return
+
+            if "disease" not in self.limits:
+                self.limits["disease"] = await asyncio.get_running_loop().run_in_executor(
+                    self.io_executor, self._disease_capacity
+                )
+
+            self.disease_executor = ThreadPoolExecutor(
+                max_workers=self.limits["disease"],
+                thread_name_prefix="async-disease"
+            )
+
+    def _disease_capacity(self):
+        engine = self.services["disease"].engine
+        return engine.max_batch_size * engine.num_interpreters
+
+    def _limit(self, service):
+        return self.limits.get(service) or 4
+
+    def _executor(self, service):
+        if service in IO_SERVICES:
+            return self.io_executor
+        if service == "disease":
+            return self.disease_executor
+        return self.cpu_executor
+
+    def _semaphore(self, service):
+        sem = self._semaphores.get(service)
+        if sem is None:
+            sem = asyncio.Semaphore(self._limit(service))
+            self._semaphores[service] = sem
+        return sem
+
+    # --------------------------------------------------
+    # SERVICE SHORTCUTS (used by asgi.py)
+    # --------------------------------------------------
+    async def read_soil_with_meta(self, fresh=False):
+        return await self.call("sensor", "read_soil_with_meta", fresh=fresh)
+
+    async def recommend_crops(self, soil, top_k=3):
+        return await self.call("crop", "recommend_crops", soil, top_k)
+
+    async def fertilizer_alerts(self, crop_name, soil_data):
+        return await self.call("crop", "fertilizer_alerts", crop_name, soil_data)
+
+    async def translate_list(self, texts, lang):
+        return await self.call("translation", "translate_list", texts, lang)
+
+    async def localize_alerts(self, alerts, lang):
+        return await self.run(
+            "translation", localize_alerts,
+            alerts, lang, self.services["translation"]
+        )
+
+    async def name_crops(self, recommendations, lang):
+        return await self.run(
+            "translation", name_crops,
+            recommendations, lang, self.services["translation"]
+        )
+
+    async def decode_frame(self, buf):
+        return await self.call("disease", "decode_frame", buf)
+
+    async def detect_disease(self, frame, crop="TOMATO", session=None, top_k=1):
+        if session is None:
+            return await self.call(
+                "disease", "detect_disease",
+                frame=frame, crop=crop, top_k=top_k
+            )
+        return await self.call(
+            "disease", "detect_disease_streaming",
+            frame=frame, session=session, crop=crop, top_k=top_k
+        )
+
+    def shutdown(self):
+        self.cpu_executor.shutdown(wait=False)
+        self.io_executor.shutdown(wait=False)
+        if self.disease_executor is not None:
+            self.disease_executor.shutdown(wait=False)
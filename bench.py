@@ -0,0 +1,320 @@
+"""
+End-to-end benchmark for the API.
+
+    python bench.py                               # in-process, default levels
+    python bench.py --mode http --concurrency 1 8 32
+    python bench.py --out after.json --compare before.json
+
+Drives create_app() with the real models, a fake SensorService
+(configurable latency) and a stub TranslationService, so runs are
+repeatable without hardware or network. Results are JSON; --compare
+prints per-endpoint deltas and exits 1 on a p95 / throughput regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from app import build_services, create_app
+
+
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+
+
+# --------------------------------------------------
+# FAKES
+# --------------------------------------------------
+class FakeSensorService:
+    """SensorService stand-in: cycles a few readings after `latency_s`."""
+
+    READINGS = [
+        {"N": 40.0, "P": 35.0, "K": 30.0, "temperature": 25.0, "humidity": 55.0, "ph": 6.5, "rainfall": 100.0},
+        {"N": 90.0, "P": 45.0, "K": 50.0, "temperature": 28.4, "humidity": 82.0, "ph": 6.1, "rainfall": 100.0},
+        {"N": 75.0, "P": 38.0, "K": 42.0, "temperature": 22.7, "humidity": 63.0, "ph": 7.2, "rainfall": 100.0},
+    ]
+
+    def __init__(self, latency_s=0.0):
+        self.latency_s = latency_s
+        self._i = 0
+        self._lock = threading.Lock()
+
+    def read_soil(self, fresh=False):
+        return self.read_soil_with_meta(fresh)[0]
+
+    def read_soil_with_meta(self, fresh=False):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        with self._lock:
+            soil = self.READINGS[self._i % len(self.READINGS)]
+            self._i += 1
+        now = time.time()
+        return dict(soil), {"source": "fake", "timestamp": now, "age_s": 0.0, "stale": False}
+
+    def stop(self):
+        pass
+
+
+class StubTranslationService:
+    """TranslationService stand-in: tags text, never hits the network."""
+
+    def __init__(self, latency_s=0.0):
+        self.latency_s = latency_s
+
+    def translate_text(self, text, target_lang):
+        return self.translate_list([text], target_lang)[0]
+
+    def translate_list(self, texts, target_lang):
+        if target_lang == "en":
+            return list(texts)
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return [f"[{target_lang}] {t}" if t else t for t in texts]
+
+
+# --------------------------------------------------
+# SYNTHETIC FRAMES
+# --------------------------------------------------
+def leaf_frame(width, height, seed=0):
+    """JPEG of a textured green leaf with brown lesions on soil."""
+    rng = np.random.default_rng(seed)
+
+    img = np.empty((height, width, 3), np.uint8)
+    img[:] = (40, 70, 110)  # soil (BGR)
+    img = cv2.add(img, rng.integers(0, 40, img.shape, dtype=np.uint8))
+
+    center = (width // 2, height // 2)
+    axes = (int(width * 0.30), int(height * 0.38))
+    cv2.ellipse(img, center, axes, 30, 0, 360, (45, 150, 60), -1)
+    cv2.line(img, (center[0] - axes[0], center[1]), (center[0] + axes[0], center[1]), (90, 190, 120), max(1, width // 200))
+
+    for _ in range(12):
+        x = int(center[0] + rng.normal(0, axes[0] / 3))
+        y = int(center[1] + rng.normal(0, axes[1] / 3))
+        cv2.circle(img, (x, y), int(rng.integers(3, max(4, width // 60))), (30, 60, 100), -1)
+
+    img = cv2.GaussianBlur(img, (3, 3), 0)
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buf.tobytes()
+
+
+# --------------------------------------------------
+# CLIENTS
+# --------------------------------------------------
+class InProcessClient:
+    """Flask test client per thread (no sockets)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def post(self, path, body, content_type, headers):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        resp = client.post(path, data=body, content_type=content_type, headers=headers)
+        return resp.status_code
+
+    def close(self):
+        pass
+
+
+class HttpClient:
+    """Real HTTP against a threaded werkzeug server on localhost."""
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def post(self, path, body, content_type, headers):
+        req = urllib.request.Request(
+            self.base + path,
+            data=body,
+            headers={"Content-Type": content_type, **headers},
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(req) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def close(self):
+        self.server.shutdown()
+
+
+# --------------------------------------------------
+# SCENARIOS
+# --------------------------------------------------
+def scenarios(frames):
+    """name -> (path, body, content type, headers)"""
+    cases = {}
+    for (w, h), frame in frames.items():
+        cases[f"detect-disease@{w}x{h}"] = (
+            "/api/detect-disease", frame, "application/octet-stream", {}
+        )
+    cases["recommend-crops"] = (
+        "/api/recommend-crops", b"{}", "application/json", {"X-Language": "hi"}
+    )
+    cases["fertilizer-advice"] = (
+        "/api/fertilizer-advice", json.dumps({"crop": "rice"}).encode(),
+        "application/json", {"X-Language": "hi"}
+    )
+    cases["full-check"] = (
+        "/api/full-check", frames.get((640, 480), next(iter(frames.values()))),
+        "application/octet-stream", {"X-Language": "hi"}
+    )
+    return cases
+
+
+def run_case(client, case, concurrency, n_requests, warmup):
+    path, body, content_type, headers = case
+
+    for _ in range(warmup):
+        client.post(path, body, content_type, headers)
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        t0 = time.perf_counter()
+        status = client.post(path, body, content_type, headers)
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(one, range(n_requests)))
+    wall = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": n_requests,
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+        "throughput_rps": round(n_requests / wall, 1)
+    }
+
+
+# --------------------------------------------------
+# COMPARE
+# --------------------------------------------------
+def compare(baseline, current, tolerance):
+    """Prints deltas; returns True if any case regressed."""
+    before = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    regressed = False
+
+    print(f"\n{'endpoint':<28}{'conc':>5}{'p95 ms':>20}{'rps':>20}")
+    for r in current["results"]:
+        old = before.get((r["endpoint"], r["concurrency"]))
+        if old is None:
+            continue
+
+        d_p95 = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] if old["p95_ms"] else 0.0
+        d_rps = (r["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"] if old["throughput_rps"] else 0.0
+        bad = d_p95 > tolerance or d_rps < -tolerance
+        regressed |= bad
+
+        print(
+            f"{r['endpoint']:<28}{r['concurrency']:>5}"
+            f"{old['p95_ms']:>9.1f} -> {r['p95_ms']:<8.1f}"
+            f"{old['throughput_rps']:>9.1f} -> {r['throughput_rps']:<8.1f}"
+            f"{'  REGRESSION' if bad else ''}"
+        )
+
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KrishiDhan API benchmark")
+    parser.add_argument("--mode", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200, help="requests per case and level")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--resolutions", nargs="+", default=[f"{w}x{h}" for w, h in RESOLUTIONS])
+    parser.add_argument("--only", nargs="+", help="endpoint name prefixes to run")
+    parser.add_argument("--sensor-latency-ms", type=float, default=50.0)
+    parser.add_argument("--translate-latency-ms", type=float, default=0.0)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    services = build_services(
+        model_loading="eager",
+        sensor_service=FakeSensorService(args.sensor_latency_ms / 1000),
+        translation_service=StubTranslationService(args.translate_latency_ms / 1000)
+    )
+    app = create_app(services)
+
+    frames = {}
+    for i, res in enumerate(args.resolutions):
+        w, h = (int(v) for v in res.lower().split("x"))
+        frames[(w, h)] = leaf_frame(w, h, seed=i)
+
+    client = HttpClient(app) if args.mode == "http" else InProcessClient(app)
+    cases = scenarios(frames)
+    if args.only:
+        cases = {k: v for k, v in cases.items() if any(k.startswith(p) for p in args.only)}
+
+    results = []
+    try:
+        for name, case in cases.items():
+            for concurrency in args.concurrency:
+                stats = run_case(client, case, concurrency, args.requests, args.warmup)
+                results.append({"endpoint": name, "concurrency": concurrency, **stats})
+                print(
+                    f"{name:<28} c={concurrency:<3} p50={stats['p50_ms']:>8.2f}ms "
+                    f"p95={stats['p95_ms']:>8.2f}ms p99={stats['p99_ms']:>8.2f}ms "
+                    f"{stats['throughput_rps']:>8.1f} req/s errors={stats['errors']}"
+                )
+    finally:
+        client.close()
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "mode": args.mode,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sensor_latency_ms": args.sensor_latency_ms,
+            "translate_latency_ms": args.translate_latency_ms,
+            "requests": args.requests
+        },
+        "results": results
+    }
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
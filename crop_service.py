@@ -1,19 +1,86 @@
+import math
 import os
-import joblib
+import threading
 import numpy as np
 import warnings
 
 # External helpers (from your project)
-from utilities.utils import check_parameters
+from utilities.utils import evaluate_parameters
+from utilities.localization import render_alert
 from utilities.parameters import thresholds, fertilizers
+from utilities.cache import LRUCache
+from utilities import metrics
+
+from services.forest_engine import CompiledForest
+from services.feature_scaler import FeatureScaler
+
+# Column order expected by the scaler / RandomForest
+FEATURE_ORDER = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+
+# Max allowed |compiled - sklearn| probability at startup
+PARITY_TOLERANCE = 1e-9
+
+FERTILIZER_FEATURES = ['N', 'P', 'K', 'ph', 'temperature', 'humidity']
+
+# predict (scale + forest) / rank (top-K) / fertilizer_rules
+STAGE_SECONDS = metrics.histogram(
+    "krishidhan_crop_stage_seconds",
+    "Crop service time per stage",
+    ("stage",)
+)
+
+
+def soil_key(soil_data, features):
+    """
+    Cache key for soil readings: the exact float values, so a cached
+    result is only ever served for the reading it was computed on.
+    (Single-probe npk7 readings are already on the sensor grid:
+    whole mg/kg, 0.1 steps, so repeated readings still hit.)
+    Returns (key, values) with values = {feature: float}.
+    Raises ValueError for missing-as-NaN or infinite values.
+    """
+    values = {f: float(soil_data[f]) for f in features}
+
+    for f, v in values.items():
+        if not math.isfinite(v):
+            raise ValueError(f"{f} must be a finite number, got {v}")
+
+    return tuple(values[f] for f in features), values
+
 
 class CropService:
     """
     Crop recommendation service.
     Uses RandomForest + scaler + domain rules.
+
+    inference_engine:
+    - "sklearn"  : model.predict_proba (default)
+    - "compiled" : flat NumPy forest (CompiledForest), checked
+                   against sklearn at startup, falls back if not equal
+
+    Scaler parameters are extracted once at load time. With the
+    compiled engine they are folded into the split thresholds, so
+    requests skip scaling altogether; otherwise they are applied
+    as one preallocated NumPy op.
+
+    Single-sample results (recommendations, fertilizer advice) are
+    cached on the exact reading, so repeated requests for the same
+    soil skip the model and the rules.
+
+    shared_memory=True moves the compiled forest into a shared,
+    read-only mapping (for services built before a fork).
     """
 
-    def __init__(self, model_path, scaler_path, targets_path):
+    def __init__(
+        self,
+        model_path,
+        scaler_path,
+        targets_path,
+        inference_engine="sklearn",
+        cache_size=512,
+        cache_ttl_s=300,
+        shared_memory=False
+    ):
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Crop model not found: {model_path}")
         if not os.path.exists(scaler_path):
@@ -21,11 +88,96 @@ class CropService:
         if not os.path.exists(targets_path):
             raise FileNotFoundError(f"Targets not found: {targets_path}")
 
+        import joblib  # heavy: imported when the model loads, not at app boot
+
         # Load models ONCE
         self.model = joblib.load(model_path)
         self.scaler = joblib.load(scaler_path)
         self.targets = joblib.load(targets_path)
 
+        # Crop name for every predict_proba column
+        self.class_names = [
+            self.targets.get(c, self.targets.get(str(c), "Unknown"))
+            for c in self.model.classes_
+        ]
+
+        # None -> unsupported scaler type, use scaler.transform
+        self.feature_scaler = FeatureScaler.from_sklearn(self.scaler)
+        self._local = threading.local()
+
+        self.inference_engine = "sklearn"
+        self.compiled = None
+        self.scaler_folded = False
+
+        # Shared by all endpoints / languages (results are English)
+        self.cache = LRUCache(maxsize=cache_size, ttl_s=cache_ttl_s)
+        metrics.register_cache("crop", self.cache)
+        if inference_engine == "compiled":
+            self._compile_model()
+            if shared_memory and self.compiled is not None:
+                self.compiled = self.compiled.to_shared_memory()
+        elif inference_engine != "sklearn":
+            raise ValueError(f"Unknown inference engine: {inference_engine}")
+
+    def _compile_model(self):
+        """Build the flat forest once and verify parity with sklearn."""
+        try:
+            compiled = CompiledForest.from_sklearn(self.model)
+
+            # Probe rows in scaled space (deterministic)
+            n_features = len(FEATURE_ORDER)
+            probe = np.random.default_rng(0).normal(0.0, 2.0, size=(256, n_features))
+            error = compiled.parity_error(self.model, probe)
+
+            # Scaler folded into thresholds: forest takes raw features
+            folded = None
+            if self.feature_scaler is not None:
+                folded = compiled.fold_scaler(self.feature_scaler)
+            if folded is not None:
+                raw = self.scaler.inverse_transform(probe)
+                expected = self.model.predict_proba(self._scale(raw))
+                folded_error = float(np.max(np.abs(folded.predict_proba(raw) - expected)))
+        except Exception as e:
+            print("[CropService] Compiled forest unavailable:", e)
+            return
+
+        if error > PARITY_TOLERANCE:
+            print(f"[CropService] Compiled forest parity error {error}, using sklearn")
+            return
+
+        self.compiled = compiled
+        self.inference_engine = "compiled"
+
+        if folded is not None and folded_error <= PARITY_TOLERANCE:
+            self.compiled = folded
+            self.scaler_folded = True
+
+    def _scale(self, X):
+        if self.feature_scaler is not None:
+            return self.feature_scaler.transform(X)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return self.scaler.transform(X)
+
+    def _predict_proba(self, X):
+        """X: raw features (N x 7, FEATURE_ORDER)"""
+        if self.scaler_folded:
+            return self.compiled.predict_proba(X)
+
+        scaled = self._scale(X)
+        if self.compiled is not None:
+            return self.compiled.predict_proba(scaled)
+        return self.model.predict_proba(scaled)
+
+    def _row_buffer(self):
+        """Preallocated 1 x 7 feature row (per thread)."""
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.empty((1, len(FEATURE_ORDER)), dtype=np.float64)
+            self._local.row = row
+        return row
+
     # --------------------------------------------------
     # MAIN ENTRY: Recommend crops from soil parameters
     # --------------------------------------------------
@@ -42,61 +194,103 @@ class CropService:
         }
         """
 
-        feature_order = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
-        feature_vector = [[soil_data[f] for f in feature_order]]
+        key, values = soil_key(soil_data, FEATURE_ORDER)
+        cache_key = ("recommend", top_k) + key
 
-        # Scale
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            scaled = self.scaler.transform(feature_vector)
+        results = self.cache.get(cache_key)
+        if results is None:
+            row = self._row_buffer()
+            for i, f in enumerate(FEATURE_ORDER):
+                row[0, i] = values[f]
 
-        # Predict probabilities
-        probs = self.model.predict_proba(scaled)[0]
-        class_ids = self.model.classes_
+            results = self.recommend_crops_batch(row, top_k=top_k)[0]
+            self.cache.put(cache_key, results)
 
-        results = []
-        for idx, prob in enumerate(probs):
-            if prob <= 0:
-                continue
+        # Copies: callers translate / mutate the dicts in place
+        return [dict(rec) for rec in results]
 
-            class_id = class_ids[idx]
-            crop_name = self.targets.get(
-                class_id,
-                self.targets.get(str(class_id), "Unknown")
+    # --------------------------------------------------
+    # BATCH ENTRY: many soil samples in one vectorized call
+    # --------------------------------------------------
+    def recommend_crops_batch(self, features, top_k=3):
+        """
+        features: N x 7 array-like, columns in FEATURE_ORDER
+        Returns one top-K recommendation list per row.
+        """
+
+        X = np.asarray(features, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        if X.ndim != 2 or X.shape[1] != len(FEATURE_ORDER):
+            raise ValueError(
+                f"Expected N x {len(FEATURE_ORDER)} features ({', '.join(FEATURE_ORDER)})"
             )
 
-            results.append({
-                "crop": crop_name,
-                "confidence": round(float(prob), 3)
-            })
+        if X.shape[0] == 0:
+            return []
+
+        # Scale (or not, if folded) + predict ALL rows at once
+        with STAGE_SECONDS.time("predict"):
+            probs = self._predict_proba(X)
+
+        # Top K per row without sorting every column
+        with STAGE_SECONDS.time("rank"):
+            k = max(1, min(top_k, probs.shape[1]))
+            top = np.argpartition(-probs, k - 1, axis=1)[:, :k]
+            top_probs = np.take_along_axis(probs, top, axis=1)
 
-        # Sort and return top K
-        results.sort(key=lambda x: x["confidence"], reverse=True)
-        return results[:top_k]
+            order = np.argsort(-top_probs, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_probs = np.take_along_axis(top_probs, order, axis=1)
+
+        return [
+            [
+                {
+                    "crop": self.class_names[idx],
+                    "confidence": round(float(prob), 3)
+                }
+                for idx, prob in zip(row_idx, row_probs)
+                if prob > 0
+            ]
+            for row_idx, row_probs in zip(top, top_probs)
+        ]
 
     # --------------------------------------------------
     # OPTIONAL: Fertilizer advice for selected crop
     # --------------------------------------------------
-    def fertilizer_advice(self, crop_name, soil_data):
+    def fertilizer_alerts(self, crop_name, soil_data):
         """
         crop_name: string
         soil_data: same dict as above
+        Returns structured alert records (see utils.evaluate_parameters),
+        rendered per language by utilities.localization.
         """
 
-        soil_params = {
-            'N': soil_data['N'],
-            'P': soil_data['P'],
-            'K': soil_data['K'],
-            'ph': soil_data['ph'],
-            'temperature': soil_data['temperature'],
-            'humidity': soil_data['humidity']
-        }
+        crop_name = crop_name.lower()
+        key, soil_params = soil_key(soil_data, FERTILIZER_FEATURES)
+        cache_key = ("fertilizer", crop_name) + key
 
-        recs = check_parameters(
-            crop_name.lower(),
-            soil_params,
-            thresholds,
-            fertilizers
-        )
+        alerts = self.cache.get(cache_key)
+        if alerts is None:
+            with STAGE_SECONDS.time("fertilizer_rules"):
+                alerts = evaluate_parameters(
+                    crop_name,
+                    soil_params,
+                    thresholds,
+                    fertilizers
+                ) or []
+            self.cache.put(cache_key, alerts)
+
+        return [dict(a) for a in alerts]
+
+    def fertilizer_advice(self, crop_name, soil_data):
+        """Same as fertilizer_alerts, rendered as English text."""
+        return [
+            render_alert(a)
+            for a in self.fertilizer_alerts(crop_name, soil_data)
+        ]
 
-        return recs or []
+    def cache_stats(self):
+        """Hit / miss counters of the soil result cache."""
+        return self.cache.stats()
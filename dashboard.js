@@ -91,7 +91,7 @@ function checkSoil() {
         crops.forEach(crop => {
             const row = document.createElement("tr");
             row.innerHTML = `
-                <td>${capitalize(crop.crop)}</td>
+                <td>${capitalize(crop.name || crop.crop)}</td>
                 <td>Suitable</td>
                 <td>Seasonal</td>
                 <td>${scoreToLabel(crop.confidence)}</td>
@@ -1,5 +1,13 @@
 let videoStream = null;
 let captureInterval = null;
+let scanSessionId = null;
+
+// Live scan channel: WebSocket when available, HTTP polling otherwise
+let scanSocket = null;
+let frameInFlight = false;
+
+const SOCKET_INTERVAL_MS = 300;
+const HTTP_INTERVAL_MS = 1500;
 
 let videoDevices = [];
 let currentCameraIndex = 0;
@@ -80,6 +88,7 @@ function stopCamera() {
     }
 
     clearInterval(captureInterval);
+    endScanSession();
 
     document.getElementById("startCamBtn").disabled = false;
     document.getElementById("stopCamBtn").disabled = true;
@@ -98,29 +107,109 @@ function switchCamera() {
 
 /* ---------------- FRAME SENDER ---------------- */
 
+function newScanSessionId() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+function endScanSession() {
+    if (scanSocket) {
+        // Closing the socket ends its server-side session
+        scanSocket.onclose = null;
+        scanSocket.close();
+        scanSocket = null;
+        scanSessionId = null;
+        return;
+    }
+
+    if (!scanSessionId) return;
+
+    fetch(`/api/detect-disease/session/${scanSessionId}`, { method: "DELETE" })
+        .catch(() => {});
+    scanSessionId = null;
+}
+
 function startSendingFrames() {
-    const ctx = canvas.getContext("2d");
+    // One server-side session per camera run: results are smoothed
+    // across frames and we stop sending once the verdict is stable
+    scanSessionId = newScanSessionId();
+    frameInFlight = false;
+
+    if (!window.WebSocket) {
+        startHttpFrames();
+        return;
+    }
+
+    const scheme = location.protocol === "https:" ? "wss" : "ws";
+    const socket = new WebSocket(
+        `${scheme}://${location.host}/api/detect-disease/stream?session=${scanSessionId}`
+    );
+    socket.binaryType = "arraybuffer";
+    scanSocket = socket;
+
+    socket.onopen = () => {
+        captureInterval = setInterval(() => {
+            // One frame in flight: the server always answers the newest
+            if (frameInFlight) return;
+
+            captureFrame(blob => {
+                frameInFlight = true;
+                socket.send(blob);
+            });
+        }, SOCKET_INTERVAL_MS);
+    };
+
+    socket.onmessage = event => {
+        frameInFlight = false;
+        showResult(JSON.parse(event.data));
+    };
+
+    // No streaming endpoint (or connection lost): fall back to HTTP
+    socket.onclose = () => {
+        clearInterval(captureInterval);
+        scanSocket = null;
+        if (videoStream && scanSessionId) startHttpFrames();
+    };
+}
 
+function startHttpFrames() {
     captureInterval = setInterval(() => {
-        if (!video.videoWidth) return;
-
-        canvas.width = video.videoWidth;
-        canvas.height = video.videoHeight;
-        ctx.drawImage(video, 0, 0);
-
-        const imageData = canvas.toDataURL("image/jpeg");
-
-        fetch("/api/detect-disease", {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ frame: imageData })
-        })
-        .then(res => res.json())
-        .then(data => {
-            resultBox.classList.remove("hidden");
-            resultText.textContent =
-                `${data.status || "Analyzing"}`
-        })
-        .catch(() => {});
-    }, 1500);
+        // Send raw JPEG bytes (no base64 / JSON wrapping)
+        captureFrame(blob => {
+            fetch("/api/detect-disease", {
+                method: "POST",
+                headers: {
+                    "Content-Type": "application/octet-stream",
+                    "X-Scan-Session": scanSessionId
+                },
+                body: blob
+            })
+            .then(res => res.json())
+            .then(showResult)
+            .catch(() => {});
+        });
+    }, HTTP_INTERVAL_MS);
+}
+
+function captureFrame(send) {
+    if (!video.videoWidth) return;
+
+    canvas.width = video.videoWidth;
+    canvas.height = video.videoHeight;
+    canvas.getContext("2d").drawImage(video, 0, 0);
+
+    canvas.toBlob(blob => {
+        if (!blob || !scanSessionId) return;
+        send(blob);
+    }, "image/jpeg");
+}
+
+function showResult(data) {
+    resultBox.classList.remove("hidden");
+    resultText.textContent =
+        `${data.status || "Analyzing"}`
+
+    if (data.session && data.session.stable) {
+        clearInterval(captureInterval);
+    }
 }
@@ -2,19 +2,54 @@ import cv2
 import numpy as np
 import os
 
+from services.inference_engine import InferenceEngine
+from services.frame_preprocessor import FramePreprocessor, decode_frame
+from services.label_index import LabelIndex
+from services.scan_session import frame_hash, hamming
+from utilities import metrics
 
 # GLOBAL THRESHOLDS
 DISEASE_THRESHOLD = 0.40
 HEALTHY_THRESHOLD = 0.15
 
+# decode / preprocess / infer (queue + invoke) / postprocess / ...
+STAGE_SECONDS = metrics.histogram(
+    "krishidhan_disease_stage_seconds",
+    "Disease detection time per stage",
+    ("stage",)
+)
+RESULTS = metrics.counter(
+    "krishidhan_disease_results_total",
+    "Disease detection verdicts, by status",
+    ("status",)
+)
+
 
 class DiseaseService:
     """
     Stateless disease detection service.
     Accepts ONE frame and returns diagnosis.
+    Live scans may pass a ScanSession to smooth results
+    across frames (the state lives in the session).
+    Inference runs on a pooled, micro-batching engine
+    so concurrent requests do not share one interpreter.
+    An optional LeafGate rejects empty / blurry / dark frames
+    before they reach the model.
     """
 
-    def __init__(self, model_path, labels_path, tflite):
+    def __init__(
+        self,
+        model_path,
+        labels_path,
+        tflite,
+        num_interpreters=None,
+        num_threads=1,
+        max_batch_size=8,
+        batch_window_ms=5,
+        xnnpack=True,
+        model_content=None,
+        leaf_gate=None
+    ):
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model not found: {model_path}")
 
@@ -25,14 +60,60 @@ class DiseaseService:
         with open(labels_path, "r") as f:
             self.labels = [line.strip() for line in f.readlines()]
 
-        # Load TFLite model
-        self.interpreter = tflite.Interpreter(model_path=model_path)
-        self.interpreter.allocate_tensors()
+        # Per-crop relevance masks + display labels (built once)
+        self.label_index = LabelIndex(self.labels)
+
+        # Load TFLite model (one interpreter per worker)
+        self.engine = InferenceEngine(
+            model_path=model_path,
+            tflite=tflite,
+            num_interpreters=num_interpreters,
+            num_threads=num_threads,
+            max_batch_size=max_batch_size,
+            batch_window_ms=batch_window_ms,
+            xnnpack=xnnpack,
+            model_content=model_content
+        )
+
+        self.input_details = self.engine.input_details
+        self.output_details = self.engine.output_details
+        self.input_type = self.engine.input_type
+
+        # Preallocated resize / colour buffers (per thread)
+        self.preprocessor = FramePreprocessor(self.engine.input_shape)
+
+        # None -> every frame goes to the model
+        self.leaf_gate = leaf_gate
+
+    # DECODE: reduced-resolution JPEG decode for model input
+    def decode_frame(self, buf):
+        """
+        buf: uint8 numpy array with encoded JPEG/PNG bytes
+        Returns an OpenCV BGR image (possibly downscaled 2/4/8x)
+        or None if decoding failed.
+        """
+        with STAGE_SECONDS.time("decode"):
+            return decode_frame(buf, self.preprocessor.target_size)
+
+
+    # PRE-INFERENCE GATE
+    def _gate(self, frame):
+        """Returns the SCANNING result if no leaf is in view, else None."""
+        if self.leaf_gate is None:
+            return None
 
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-        self.input_type = self.input_details[0]["dtype"]
+        with STAGE_SECONDS.time("gate"):
+            passed, reason, _ = self.leaf_gate.check(frame)
 
+        if passed:
+            return None
+
+        return {
+            "status": "SCANNING",
+            "label": "Place leaf in center",
+            "confidence": 0.0,
+            "gate": reason
+        }
 
     # GREEN DOMINANCE CHECK (UNCHANGED)
     def _is_green_dominant(self, frame):
@@ -50,89 +131,172 @@ class DiseaseService:
 
    
     # MAIN ENTRY: Detect disease from frame
-    def detect_disease(self, frame, crop="TOMATO"):
+    def detect_disease(self, frame, crop="TOMATO", top_k=1):
         """
         frame: OpenCV BGR image
         crop: TOMATO / POTATO / PEPPER (context)
+        top_k: if > 1, also return the k best relevant diagnoses
         """
 
-        # Crop relevance mapping
-        crop_map = {
-            "TOMATO": ["tomato"],
-            "POTATO": ["potato", "tomato"],
-            "PEPPER": ["pepper", "bell"]
-        }
+        gated = self._gate(frame)
+        if gated is not None:
+            RESULTS.inc("GATED")
+            return gated
 
-        compatible_crops = crop_map.get(crop.upper(), ["tomato"])
+        # PREPROCESS: resize + BGR->RGB into preallocated buffer,
+        # normalization is fused into the engine's tensor write
+        with STAGE_SECONDS.time("preprocess"):
+            img = self.preprocessor.prepare(frame)
 
-        # PREPROCESS (from your code)
-        img = cv2.resize(frame, (224, 224))
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # -------------------------------
+        # RUN MODEL (batched + dequantized by the engine)
+        with STAGE_SECONDS.time("infer"):
+            output = self.engine.infer(img)
 
-        if self.input_type == np.float32:
-            img = img.astype(np.float32) / 255.0
-        else:
-            img = img.astype(np.uint8)
+        with STAGE_SECONDS.time("postprocess"):
+            result = self._decide(output, crop, frame)
 
-        img = np.expand_dims(img, axis=0)
+            if top_k > 1:
+                result["top"] = [
+                    {
+                        "label": self.label_index.clean_labels[i],
+                        "confidence": round(score, 2)
+                    }
+                    for i, score in self.label_index.top_k(output, crop, top_k)
+                ]
 
-        # -------------------------------
-        # RUN MODEL
-        self.interpreter.set_tensor(self.input_details[0]["index"], img)
-        self.interpreter.invoke()
-        output = self.interpreter.get_tensor(self.output_details[0]["index"])[0]
-
-        # DEQUANTIZE (if needed)
-        if output.dtype == np.uint8:
-            scale, zero_point = self.output_details[0]["quantization"]
-            if scale == 0:
-                scale = 1
-            output = (output.astype(np.float32) - zero_point) * scale
+        RESULTS.inc(result["status"])
+        return result
 
-        # -------------------------------
-        # FIND BEST RELEVANT LABEL
-        # -------------------------------
-        best_score = 0.0
-        best_label = ""
+    # STREAMING ENTRY: one frame of a live scan session
+    def detect_disease_streaming(self, frame, session, crop="TOMATO", top_k=1):
+        """
+        frame: OpenCV BGR image
+        session: ScanSession (from ScanSessionStore)
+
+        - near-duplicate frames reuse the last verdict, no inference
+        - class scores are smoothed with an EMA across frames
+        - session.stable turns True once the same verdict has held
+          at high confidence for several INFERRED frames (duplicates
+          reuse the verdict but add no evidence); clients can stop
+        """
+        config = session.store
+        crop = crop.upper()
+        with STAGE_SECONDS.time("hash"):
+            current_hash = frame_hash(frame)
+
+        with session.lock:
+            if session.crop != crop:
+                session.reset(crop)
+
+            session.frames += 1
+
+            if (
+                session.last_result is not None
+                and hamming(current_hash, session.last_hash) <= config.duplicate_distance
+            ):
+                result = dict(session.last_result)
+                result["session"] = session.summary(skipped=True)
+                RESULTS.inc("SKIPPED")
+                return result
+
+            # No leaf: answer without inference, keep the EMA untouched
+            gated = self._gate(frame)
+            if gated is not None:
+                RESULTS.inc("GATED")
+                self._update_stability(session, gated)
+                session.last_hash = current_hash
+                session.last_result = gated
+
+                result = dict(gated)
+                result["session"] = session.summary(skipped=False)
+                return result
 
-        for i, score in enumerate(output):
-            label = self.labels[i].lower()
+            with STAGE_SECONDS.time("preprocess"):
+                img = self.preprocessor.prepare(frame)
+            with STAGE_SECONDS.time("infer"):
+                output = self.engine.infer(img)
+            session.inferences += 1
+            session.last_hash = current_hash
 
-            is_relevant = (
-                any(c in label for c in compatible_crops)
-                or "healthy" in label
-            )
+            # EMA over per-class scores
+            if session.scores is None:
+                session.scores = output
+            else:
+                session.scores = (
+                    config.alpha * output + (1.0 - config.alpha) * session.scores
+                )
 
-            if is_relevant and score > best_score:
-                best_score = score
-                best_label = label
+            with STAGE_SECONDS.time("postprocess"):
+                result = self._decide(session.scores, crop, frame)
 
+                if top_k > 1:
+                    result["top"] = [
+                        {
+                            "label": self.label_index.clean_labels[i],
+                            "confidence": round(score, 2)
+                        }
+                        for i, score in self.label_index.top_k(session.scores, crop, top_k)
+                    ]
+
+            RESULTS.inc(result["status"])
+            self._update_stability(session, result)
+            session.last_result = result
+
+            result = dict(result)
+            result["session"] = session.summary(skipped=False)
+            return result
+
+    def _update_stability(self, session, result):
+        """Same confident verdict for N consecutive inferred frames -> stable."""
+        config = session.store
+        confident = (
+            result["status"] in ("DISEASED", "HEALTHY")
+            and result["confidence"] >= config.stable_confidence
+        )
+        previous = session.last_result
+
+        if confident and previous and previous["label"] == result["label"]:
+            session.stable_count += 1
+        elif confident:
+            session.stable_count = 1
+        else:
+            session.stable_count = 0
+
+        session.stable = session.stable_count >= config.stable_frames
+
+    # DECISION LOGIC (UNCHANGED)
+    def _decide(self, output, crop, frame):
         # -------------------------------
-        # CLEAN LABEL TEXT (same idea)
+        # FIND BEST RELEVANT LABEL (masked argmax)
         # -------------------------------
-        clean_label = best_label.upper()
-        for word in ["TOMATO", "POTATO", "PEPPER", "BELL", "PLANT", "LEAF", "_"]:
-            clean_label = clean_label.replace(word, " ")
+        best = self.label_index.top_k(output, crop, 1)
 
-        clean_label = " ".join(clean_label.split())
+        if best:
+            index, best_score = best[0]
+            clean_label = self.label_index.clean_labels[index]
+            is_healthy = bool(self.label_index.healthy[index])
+        else:
+            best_score, clean_label, is_healthy = 0.0, "", False
 
-     
-        # DECISION LOGIC (UNCHANGED)
-        if best_score > DISEASE_THRESHOLD and "HEALTHY" not in clean_label:
+        if best_score > DISEASE_THRESHOLD and not is_healthy:
             return {
                 "status": "DISEASED",
                 "label": clean_label,
                 "confidence": round(float(best_score), 2)
             }
 
-        if best_score > HEALTHY_THRESHOLD and "HEALTHY" in clean_label:
+        if best_score > HEALTHY_THRESHOLD and is_healthy:
             return {
                 "status": "HEALTHY",
                 "label": "HEALTHY",
                 "confidence": round(float(best_score), 2)
             }
 
-        if self._is_green_dominant(frame):
+        with STAGE_SECONDS.time("green_check"):
+            green = self._is_green_dominant(frame)
+
+        if green:
             return {
                 "status": "HEALTHY",
                 "label": "HEALTHY (Color Verified)",
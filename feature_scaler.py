@@ -0,0 +1,115 @@
+import threading
+
+import numpy as np
+
+
+class FeatureScaler:
+    """
+    NumPy replacement for a fitted sklearn StandardScaler / MinMaxScaler.
+
+    Parameters are pulled out ONCE at load time, so a request no
+    longer needs scaler.transform (and its feature-name warning).
+    The same parameters can be folded into tree split thresholds,
+    which removes the per-request transform entirely.
+    """
+
+    def __init__(self, kind, offset, scale):
+        # standard: (x - offset) / scale
+        # minmax  :  x * scale + offset
+        self.kind = kind
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self._local = threading.local()
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        """Returns a FeatureScaler, or None if the scaler is not supported."""
+        name = type(scaler).__name__
+        n = getattr(scaler, "n_features_in_", None)
+        if n is None:
+            return None
+
+        if name == "StandardScaler":
+            with_mean = getattr(scaler, "with_mean", True)
+            with_std = getattr(scaler, "with_std", True)
+            return cls(
+                "standard",
+                scaler.mean_ if with_mean else np.zeros(n),
+                scaler.scale_ if with_std else np.ones(n)
+            )
+
+        if name == "MinMaxScaler" and not getattr(scaler, "clip", False):
+            return cls("minmax", scaler.min_, scaler.scale_)
+
+        return None
+
+    def transform(self, X):
+        """
+        X: N x n_features float64 array
+        Single rows reuse a per-thread preallocated buffer,
+        so the result is only valid until the next call.
+        """
+        if X.shape[0] == 1:
+            out = getattr(self._local, "out", None)
+            if out is None or out.shape != X.shape:
+                out = np.empty(X.shape, dtype=np.float64)
+                self._local.out = out
+        else:
+            out = np.empty(X.shape, dtype=np.float64)
+
+        return self._apply(X, self.offset, self.scale, out)
+
+    def _apply(self, x, offset, scale, out=None):
+        # Same operation order as sklearn, so results round identically
+        if self.kind == "standard":
+            out = np.subtract(x, offset, out=out)
+            return np.divide(out, scale, out=out)
+
+        out = np.multiply(x, scale, out=out)
+        return np.add(out, offset, out=out)
+
+    def fold_thresholds(self, feature, threshold):
+        """
+        Maps split thresholds from scaled space to raw feature space.
+
+        sklearn trees test float32(transform(x)) <= t. For every split
+        this finds the largest float64 x that still passes, so
+        `x <= folded` gives exactly the same decision without scaling.
+        Returns None if the transform is not strictly increasing.
+        """
+        if np.any(self.scale <= 0):
+            return None
+
+        offset = self.offset[feature]
+        scale = self.scale[feature]
+
+        def passes(x):
+            return self._apply(x, offset, scale).astype(np.float32) <= threshold
+
+        if self.kind == "standard":
+            guess = threshold * scale + offset
+        else:
+            guess = (threshold - offset) / scale
+
+        # Bracket: passes(lo) and not passes(hi)
+        width = np.maximum(np.abs(guess), 1.0) * 1e-6
+        lo, hi = guess - width, guess + width
+        for _ in range(8):
+            bad_lo = ~passes(lo)
+            bad_hi = passes(hi)
+            if not (bad_lo.any() or bad_hi.any()):
+                break
+            width = width * 16
+            lo = np.where(bad_lo, guess - width, lo)
+            hi = np.where(bad_hi, guess + width, hi)
+        else:
+            return None
+
+        # Bisect down to adjacent doubles
+        for _ in range(64):
+            mid = lo + (hi - lo) / 2
+            ok = passes(mid)
+            lo = np.where(ok, mid, lo)
+            hi = np.where(ok, hi, mid)
+
+        return lo
@@ -0,0 +1,167 @@
+import mmap
+
+import numpy as np
+
+
+class CompiledForest:
+    """
+    Flat NumPy copy of a fitted sklearn forest classifier.
+
+    Every tree is appended into ONE set of node arrays
+    (feature, threshold, left, right, leaf value). Leaves point
+    to themselves, so all trees and all rows are traversed
+    together for max_depth vectorized steps with no Python
+    per-tree dispatch.
+
+    input_dtype is float32 for a plain copy (sklearn casts inputs to
+    float32). A forest with a scaler folded into its thresholds
+    compares raw float64 features instead.
+    """
+
+    def __init__(
+        self,
+        feature,
+        threshold,
+        left,
+        right,
+        value,
+        roots,
+        max_depth,
+        classes,
+        input_dtype=np.float32
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.input_dtype = input_dtype
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        model: fitted RandomForestClassifier / ExtraTreesClassifier
+        (single output). Raises ValueError for anything else.
+        """
+        estimators = getattr(model, "estimators_", None)
+        if not estimators or getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output tree ensembles can be compiled")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for est in estimators:
+            tree = est.tree_
+            n = tree.node_count
+            node_ids = np.arange(n, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int64)
+            threshold = tree.threshold.astype(np.float64)
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            # Per-tree class fractions, as DecisionTree.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            value = value / totals
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int64),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_)
+        )
+
+    def fold_scaler(self, scaler):
+        """
+        scaler: FeatureScaler used on the training inputs
+        Returns a new forest that takes RAW features, or None
+        if the scaler cannot be folded.
+        """
+        threshold = scaler.fold_thresholds(self.feature, self.threshold)
+        if threshold is None:
+            return None
+
+        return CompiledForest(
+            feature=self.feature,
+            threshold=threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            classes=self.classes_,
+            input_dtype=np.float64
+        )
+
+    def to_shared_memory(self):
+        """
+        Returns a copy whose node arrays live in ONE anonymous
+        shared mapping, as read-only views. Built before fork
+        (gunicorn preload), every worker maps the same pages
+        instead of a copy-on-write duplicate per process.
+        """
+        arrays = [self.feature, self.threshold, self.left, self.right, self.value, self.roots]
+
+        # 64-byte aligned offsets
+        offsets, size = [], 0
+        for array in arrays:
+            offsets.append(size)
+            size += -(-array.nbytes // 64) * 64
+
+        buf = mmap.mmap(-1, max(size, 1))
+        shared = []
+        for array, offset in zip(arrays, offsets):
+            view = np.frombuffer(buf, dtype=array.dtype, count=array.size, offset=offset)
+            view = view.reshape(array.shape)
+            view[...] = array
+            view.flags.writeable = False
+            shared.append(view)
+
+        return CompiledForest(
+            *shared,
+            max_depth=self.max_depth,
+            classes=self.classes_,
+            input_dtype=self.input_dtype
+        )
+
+    def predict_proba(self, X):
+        """
+        X: N x n_features (scaled like sklearn input, or raw
+        features for a forest returned by fold_scaler)
+        Returns N x n_classes probabilities.
+        """
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=self.input_dtype)
+        rows = np.arange(X.shape[0])[:, None]
+
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.value[node].mean(axis=1)
+
+    def parity_error(self, model, X):
+        """Max abs difference vs the sklearn model on X."""
+        return float(np.max(np.abs(self.predict_proba(X) - model.predict_proba(X))))
@@ -0,0 +1,123 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+# JPEG start-of-frame markers carry the image size.
+# C4 (DHT), C8 (JPG) and CC (DAC) share the range but are not SOF.
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Largest reduction first
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def jpeg_dimensions(buf):
+    """
+    Reads (width, height) from the JPEG SOF header
+    without decoding any pixels.
+    Returns None if buf is not a parsable JPEG.
+    """
+    data = memoryview(buf).cast("B")
+    n = len(data)
+
+    if n < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i = 2
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+
+        marker = data[i + 1]
+
+        # Fill bytes / standalone markers have no length field
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+
+        if marker in _SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+
+        if marker == 0xDA:  # start of scan, no SOF before it
+            return None
+
+        seg_len = (data[i + 2] << 8) | data[i + 3]
+        i += 2 + seg_len
+
+    return None
+
+
+def decode_flag(buf, target_size):
+    """
+    Picks the cheapest IMREAD_* flag that still yields an image
+    at least as large as target_size (width, height).
+    """
+    dims = jpeg_dimensions(buf)
+    if dims is None:
+        return cv2.IMREAD_COLOR
+
+    width, height = dims
+    target_w, target_h = target_size
+
+    for factor, flag in _REDUCED_FLAGS:
+        if width // factor >= target_w and height // factor >= target_h:
+            return flag
+
+    return cv2.IMREAD_COLOR
+
+
+def decode_frame(buf, target_size):
+    """
+    buf: uint8 numpy array holding an encoded image
+    Decodes at a reduced scale when the frame is much larger
+    than the model input. Returns a BGR image or None.
+    """
+    return cv2.imdecode(buf, decode_flag(buf, target_size))
+
+
+class FramePreprocessor:
+    """
+    Resize + BGR->RGB into preallocated, per-thread buffers.
+
+    Normalization is NOT done here: the inference engine fuses it
+    with the copy into the interpreter's input tensor, so a frame
+    is written exactly twice (resize, colour swap in place) before
+    the model sees it.
+    """
+
+    def __init__(self, input_shape):
+        # input_shape: (height, width, channels)
+        self.height, self.width, self.channels = input_shape
+        self._local = threading.local()
+
+    @property
+    def target_size(self):
+        return self.width, self.height
+
+    def _buffer(self):
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = np.empty((self.height, self.width, self.channels), np.uint8)
+            self._local.buf = buf
+        return buf
+
+    def prepare(self, frame):
+        """
+        frame: OpenCV BGR image (any size)
+        Returns this thread's RGB uint8 buffer at model size.
+        The buffer is reused by the next call on the same thread.
+        """
+        buf = self._buffer()
+        cv2.resize(frame, (self.width, self.height), dst=buf)
+        cv2.cvtColor(buf, cv2.COLOR_BGR2RGB, dst=buf)
+        return buf
@@ -1,9 +1,13 @@
 let videoStream = null;
 let captureInterval = null;
+let scanSessionId = null;
 
 let videoDevices = [];
 let currentCameraIndex = 0;
 
+// Fertilizer advice per crop, returned by /api/full-check
+let fullCheckAdvice = {};
+
 const video = document.getElementById("video");
 const canvas = document.getElementById("canvas");
 const diseaseStatus = document.getElementById("diseaseStatus");
@@ -25,30 +29,41 @@ function startFullCheck() {
 
     loaderText.textContent = "Reading soil sensors & recommending crops…";
 
-    fetch("/api/recommend-crops", {
+    // ONE call: soil, crops, fertilizer advice (+ disease if the camera is on)
+    captureFrame()
+    .then(frame => fetch("/api/full-check", {
         method: "POST",
         headers: {
-            "Content-Type": "application/json",
+            "Content-Type": frame ? "application/octet-stream" : "application/json",
             "X-Language": getLanguage()
-        }
-    })
+        },
+        body: frame || "{}"
+    }))
     .then(res => res.json())
     .then(data => {
-        data.recommendations.forEach(crop => {
+        fullCheckAdvice = data.fertilizer_advice || {};
+
+        data.recommended_crops.forEach(crop => {
             const row = document.createElement("tr");
             row.innerHTML = `
-                <td>${capitalize(crop.crop)}</td>
+                <td>${capitalize(crop.name || crop.crop)}</td>
                 <td>${scoreToLabel(crop.confidence)}</td>
             `;
             row.style.cursor = "pointer";
-            row.onclick = () => showFullCropDetails(crop.crop);
+            row.onclick = () => showFullCropDetails(crop.crop, crop.name);
             cropTable.appendChild(row);
         });
 
+        if (data.disease) {
+            showDiseaseResult(data.disease);
+        }
+
         result.classList.remove("hidden");
 
-        loaderText.textContent = "Starting camera for disease detection…";
-        startCamera();
+        if (!videoStream) {
+            loaderText.textContent = "Starting camera for disease detection…";
+            startCamera();
+        }
 
         loader.classList.add("hidden");
         btn.disabled = false;
@@ -61,6 +76,17 @@ function startFullCheck() {
     });
 }
 
+function captureFrame() {
+    // Resolves to a JPEG blob of the live camera, or null
+    if (!videoStream || !video.videoWidth) return Promise.resolve(null);
+
+    canvas.width = video.videoWidth;
+    canvas.height = video.videoHeight;
+    canvas.getContext("2d").drawImage(video, 0, 0);
+
+    return new Promise(resolve => canvas.toBlob(resolve, "image/jpeg"));
+}
+
 /* ================== CAMERA HANDLING ================== */
 
 async function loadVideoDevices() {
@@ -125,13 +151,31 @@ function stopCamera() {
         videoStream = null;
     }
     clearInterval(captureInterval);
+    endScanSession();
 }
 
 /* ================== FRAME SENDER ================== */
 
+function newScanSessionId() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+function endScanSession() {
+    if (!scanSessionId) return;
+
+    fetch(`/api/detect-disease/session/${scanSessionId}`, { method: "DELETE" })
+        .catch(() => {});
+    scanSessionId = null;
+}
+
 function startSendingFrames() {
     const ctx = canvas.getContext("2d");
 
+    // One server-side session per camera run: results are smoothed
+    // across frames and we stop sending once the verdict is stable
+    scanSessionId = newScanSessionId();
+
     captureInterval = setInterval(() => {
         if (!video.videoWidth) return;
 
@@ -139,32 +183,53 @@ function startSendingFrames() {
         canvas.height = video.videoHeight;
         ctx.drawImage(video, 0, 0);
 
-        const imageData = canvas.toDataURL("image/jpeg");
-
-        fetch("/api/detect-disease", {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ frame: imageData })
-        })
-        .then(res => res.json())
-        .then(data => {
-            diseaseStatus.textContent =
-                `${data.status} || ${data.label || ""} || ${Math.round((data.confidence || 0) * 100)}%`;
-        })
-        .catch(() => {});
+        // Send raw JPEG bytes (no base64 / JSON wrapping)
+        canvas.toBlob(blob => {
+            if (!blob || !scanSessionId) return;
+
+            fetch("/api/detect-disease", {
+                method: "POST",
+                headers: {
+                    "Content-Type": "application/octet-stream",
+                    "X-Scan-Session": scanSessionId
+                },
+                body: blob
+            })
+            .then(res => res.json())
+            .then(data => {
+                showDiseaseResult(data);
+
+                if (data.session && data.session.stable) {
+                    clearInterval(captureInterval);
+                }
+            })
+            .catch(() => {});
+        }, "image/jpeg");
     }, 1500);
 }
 
+function showDiseaseResult(data) {
+    diseaseStatus.textContent =
+        `${data.status} || ${data.label || ""} || ${Math.round((data.confidence || 0) * 100)}%`;
+}
+
 /* ================== CROP DETAILS ================== */
 
-function showFullCropDetails(cropName) {
+function showFullCropDetails(cropName, displayName) {
     const box = document.getElementById("fullCropDetails");
     const title = document.getElementById("fullDetailTitle");
     const list = document.getElementById("fullDetailList");
 
-    title.textContent = `🌾 ${capitalize(cropName)} – Soil & Fertilizer Advice`;
+    title.textContent = `🌾 ${capitalize(displayName || cropName)} – Soil & Fertilizer Advice`;
     list.innerHTML = "";
 
+    // Already computed by the full check: no extra request / sensor read
+    const advice = fullCheckAdvice[cropName];
+    if (advice) {
+        renderAdvice(advice, list, box);
+        return;
+    }
+
     fetch("/api/fertilizer-advice", {
         method: "POST",
         headers: {
@@ -174,22 +239,24 @@ function showFullCropDetails(cropName) {
         body: JSON.stringify({ crop: cropName })
     })
     .then(res => res.json())
-    .then(data => {
-        data.fertilizer_advice.forEach(item => {
-            const li = document.createElement("li");
-            li.textContent = item;
-            list.appendChild(li);
-        });
-
-        box.classList.remove("hidden");
-        box.scrollIntoView({ behavior: "smooth" });
-    })
+    .then(data => renderAdvice(data.fertilizer_advice, list, box))
     .catch(err => {
         console.error(err);
         alert("Failed to load crop details");
     });
 }
 
+function renderAdvice(advice, list, box) {
+    advice.forEach(item => {
+        const li = document.createElement("li");
+        li.textContent = item;
+        list.appendChild(li);
+    });
+
+    box.classList.remove("hidden");
+    box.scrollIntoView({ behavior: "smooth" });
+}
+
 /* ================== UTILITIES ================== */
 
 function capitalize(t) {
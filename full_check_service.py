@@ -0,0 +1,113 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utilities.localization import localize_alerts, name_crops
+
+
+class FullCheckService:
+    """
+    One-shot field check: soil + crop ranking + fertilizer advice
+    (+ disease, when a frame is sent) in ONE call.
+
+    Independent stages run concurrently on a shared thread pool:
+    disease inference overlaps the sensor transaction, and crop
+    scoring overlaps the fertilizer rules once soil is known.
+    The sensor is read exactly once per check.
+    """
+
+    def __init__(
+        self,
+        sensor_service,
+        crop_service,
+        disease_service,
+        translation_service=None,
+        max_workers=4
+    ):
+        self.sensor_service = sensor_service
+        self.crop_service = crop_service
+        self.disease_service = disease_service
+        self.translation_service = translation_service
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="full-check"
+        )
+
+    # --------------------------------------------------
+    # MAIN ENTRY
+    # --------------------------------------------------
+    def run(self, frame_buf=None, leaf_crop="TOMATO", lang="en", fresh=False, top_k=3):
+        """
+        frame_buf: encoded JPEG bytes (uint8 array) or None
+        leaf_crop: crop context for disease detection
+        Returns the combined response dict.
+        """
+        started = time.perf_counter()
+        timings = {}
+
+        disease = None
+        if frame_buf is not None:
+            disease = self.executor.submit(
+                self._timed, timings, "disease",
+                self._detect, frame_buf, leaf_crop
+            )
+
+        soil, meta = self._timed(
+            timings, "sensor",
+            self.sensor_service.read_soil_with_meta, fresh=fresh
+        )
+
+        crops = self.crop_service.class_names
+        ranking = self.executor.submit(
+            self._timed, timings, "recommend",
+            self.crop_service.recommend_crops, soil, top_k
+        )
+        alerts = self.executor.submit(
+            self._timed, timings, "fertilizer",
+            lambda: {c: self.crop_service.fertilizer_alerts(c, soil) for c in crops}
+        )
+
+        recommendations = ranking.result()
+        advice = {
+            crop: localize_alerts(crop_alerts, lang, self.translation_service)
+            for crop, crop_alerts in alerts.result().items()
+        }
+        name_crops(recommendations, lang, self.translation_service)
+
+        response = {
+            "soil": soil,
+            "soil_meta": meta,
+            "recommended_crops": recommendations,
+            "fertilizer_advice": advice,
+            "language": lang
+        }
+
+        if disease is None:
+            response["disease_status"] = "Camera required"
+        else:
+            response["disease"] = disease.result()
+            response["disease_status"] = (
+                response["disease"].get("status") if response["disease"] else "Invalid image"
+            )
+
+        timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+        response["timings_ms"] = timings
+        return response
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    # --------------------------------------------------
+    # STAGES
+    # --------------------------------------------------
+    def _detect(self, frame_buf, leaf_crop):
+        frame = self.disease_service.decode_frame(frame_buf)
+        if frame is None:
+            return None
+        return self.disease_service.detect_disease(frame=frame, crop=leaf_crop)
+
+    def _timed(self, timings, name, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings[name] = round((time.perf_counter() - t0) * 1000, 1)
@@ -0,0 +1,70 @@
+"""
+Pre-forked serving:
+
+    gunicorn -c gunicorn.conf.py
+
+The master tunes the disease model ONCE (app.prepare_prefork)
+before forking, so workers never calibrate concurrently and split
+the cores between their interpreter pools. It also starts the
+SensorDaemon: one process polls the sensor and writes soil history,
+workers read from it. Scan sessions live in SQLite so the frames of
+one scan may hit any worker. preload_app stays off:
+the app itself starts threads (inference pool, sensor polling) and
+opens SQLite / serial handles, none of which survive a fork, so each
+worker runs create_app() itself.
+
+Live scans: a WebSocket stream holds one worker thread for as long as
+it is open. A worker accepts at most threads // 2 streams (8 with the
+16 threads below, 32 across 4 workers); the next phone's socket is
+closed with 1013 and it scans over HTTP polling instead, so the other
+half of every worker's threads always serves HTTP.
+
+Model preload (opt-in):
+
+    KRISHIDHAN_PRELOAD_MODELS=1 gunicorn -c gunicorn.conf.py
+
+also loads the TFLite flatbuffer bytes and the CropService (compiled
+forest in a shared read-only mapping) in the master, then freezes the
+GC so collections in the workers never write to those objects' pages.
+Workers still build their own interpreters. Check what it saves on
+the target with `python memory_report.py <master pid>` (RSS / PSS of
+the master, sensor daemon and workers), with and without the variable.
+"""
+
+import gc
+import multiprocessing
+import os
+
+wsgi_app = "app:create_app()"
+bind = "0.0.0.0:5000"
+
+workers = min(4, multiprocessing.cpu_count())
+worker_class = "gthread"
+threads = 16
+timeout = 60
+
+
+def on_starting(server):
+    from app import prepare_prefork
+
+    preload_models = os.environ.get("KRISHIDHAN_PRELOAD_MODELS") == "1"
+    prepare_prefork(
+        workers=server.cfg.workers,
+        threads=server.cfg.threads,
+        preload_models=preload_models
+    )
+
+    if preload_models:
+        # Move everything loaded so far out of the GC's reach: collections in
+        # the workers would otherwise write to these objects' headers and
+        # un-share their pages
+        gc.freeze()
+        server.log.info("Models preloaded in master (pid %s)", server.pid)
+    else:
+        server.log.info("Disease model tuned in master (pid %s)", server.pid)
+
+
+def on_exit(server):
+    from app import shutdown_prefork
+
+    shutdown_prefork()
@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify
+
+health_bp = Blueprint("health", __name__)
+
+model_registry = None
+
+
+def init_health_controller(registry):
+    """
+    Inject ModelRegistry instance.
+    Called once from app.py
+    """
+    global model_registry
+    model_registry = registry
+
+@health_bp.route("/healthz")
+def healthz():
+    """Liveness: the process serves requests (models may still load)."""
+    return jsonify({
+        "status": "ok",
+        "models": model_registry.status() if model_registry else {}
+    })
+
+@health_bp.route("/readyz")
+def readyz():
+    """Readiness: 200 once every critical model is loaded, else 503."""
+    ready = bool(model_registry) and model_registry.ready()
+    return jsonify({
+        "ready": ready,
+        "models": model_registry.status() if model_registry else {}
+    }), 200 if ready else 503
@@ -0,0 +1,245 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from utilities import metrics
+
+INVOKE_SECONDS = metrics.histogram(
+    "krishidhan_tflite_invoke_seconds",
+    "interpreter.invoke() time, by batch size",
+    ("batch",)
+)
+
+
+def op_resolver_type(tflite):
+    """OpResolverType enum of tflite_runtime / ai_edge_litert / tf.lite"""
+    resolver = getattr(tflite, "OpResolverType", None)
+    if resolver is None:
+        resolver = tflite.experimental.OpResolverType
+    return resolver
+
+
+class InferenceEngine:
+    """
+    Pool of TFLite interpreters with micro-batching.
+
+    Every worker thread owns ONE interpreter, so set_tensor/invoke
+    never race. Frames that arrive within `batch_window_ms` of each
+    other are written into a single input tensor and run with one
+    invoke; each caller gets back its own output row.
+
+    Submitted images are RGB uint8 at model size. For float models
+    the /255 normalization is fused with the write into the
+    interpreter's own input buffer (no intermediate float copy);
+    int8 models get the same [0, 1] input through a lookup table.
+
+    xnnpack=False builds interpreters without the default XNNPACK
+    delegate (see ModelTuner: it is not always the faster option).
+
+    model_content: the flatbuffer as bytes (read once in the gunicorn
+    master, see app.prepare_prefork); every interpreter then reads
+    the same buffer in place instead of opening model_path itself.
+    The runtime takes bytes only, not an mmap.
+    """
+
+    def __init__(
+        self,
+        model_path,
+        tflite,
+        num_interpreters=None,
+        num_threads=1,
+        max_batch_size=8,
+        batch_window_ms=5,
+        xnnpack=True,
+        model_content=None
+    ):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found: {model_path}")
+
+        self.model_path = model_path
+        self.model_content = model_content
+        self.tflite = tflite
+        self.num_threads = num_threads
+        self.xnnpack = xnnpack
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.batch_window = max(0.0, batch_window_ms / 1000.0)
+
+        if num_interpreters is None:
+            num_interpreters = os.cpu_count() or 1
+        num_interpreters = max(1, int(num_interpreters))
+        self.num_interpreters = num_interpreters
+
+        # Build interpreters up front so a broken model fails at startup,
+        # not on the first request
+        interpreters = [self._create_interpreter() for _ in range(num_interpreters)]
+
+        first = interpreters[0]
+        self.input_details = first.get_input_details()
+        self.output_details = first.get_output_details()
+        self.input_type = self.input_details[0]["dtype"]
+        self.input_shape = tuple(int(d) for d in self.input_details[0]["shape"][1:])
+        self._input_scale = (
+            np.float32(1.0 / 255.0) if self.input_type == np.float32 else None
+        )
+        self._input_lut = (
+            self._int8_lut(self.input_details[0]["quantization"])
+            if self.input_type == np.int8 else None
+        )
+
+        scale, zero_point = self.output_details[0]["quantization"]
+        self._output_quantized = self.output_details[0]["dtype"] in (np.uint8, np.int8)
+        self._output_scale = scale or 1
+        self._output_zero_point = zero_point
+
+        self._queue = queue.Queue()
+        self._workers = []
+        for i, interpreter in enumerate(interpreters):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                args=(interpreter,),
+                name=f"inference-worker-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    # --------------------------------------------------
+    # PUBLIC API
+    # --------------------------------------------------
+    def submit(self, image):
+        """
+        image: RGB uint8 input, shape == input_shape
+        Returns a Future resolving to the float32 output row.
+        The image is read by a worker thread, so the caller must
+        not reuse its buffer until the Future is done.
+        """
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def infer(self, image, timeout=None):
+        """Blocking helper around submit()."""
+        return self.submit(image).result(timeout=timeout)
+
+    def close(self):
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+    def _create_interpreter(self):
+        options = {}
+        if not self.xnnpack:
+            options["experimental_op_resolver_type"] = op_resolver_type(
+                self.tflite
+            ).BUILTIN_WITHOUT_DEFAULT_DELEGATES
+
+        if self.model_content is not None:
+            options["model_content"] = self.model_content
+        else:
+            options["model_path"] = self.model_path
+
+        interpreter = self.tflite.Interpreter(
+            num_threads=self.num_threads,
+            **options
+        )
+        interpreter.allocate_tensors()
+        return interpreter
+
+    def _int8_lut(self, quantization):
+        """pixel (0..255) -> quantized int8 value of pixel / 255"""
+        scale, zero_point = quantization
+        pixels = np.arange(256, dtype=np.float32) / 255.0
+        return np.clip(
+            np.round(pixels / (scale or 1.0 / 255.0) + zero_point), -128, 127
+        ).astype(np.int8)
+
+    def _write_input(self, dst, image):
+        """Fused normalize + copy into the input tensor view."""
+        if self._input_scale is not None:
+            np.multiply(image, self._input_scale, out=dst)
+        elif self._input_lut is not None:
+            np.take(self._input_lut, image, out=dst)
+        else:
+            np.copyto(dst, image, casting="unsafe")
+
+    def _collect_batch(self, first):
+        """Gather more requests that arrive within the batch window."""
+        batch = [first]
+        stop = False
+        deadline = time.monotonic() + self.batch_window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+
+        return batch, stop
+
+    def _worker_loop(self, interpreter):
+        input_index = self.input_details[0]["index"]
+        output_index = self.output_details[0]["index"]
+        batch_capacity = 1
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch, stop = self._collect_batch(item)
+            futures = [f for _, f in batch]
+
+            try:
+                n = len(batch)
+                if n != batch_capacity:
+                    interpreter.resize_tensor_input(
+                        input_index, [n, *self.input_shape]
+                    )
+                    interpreter.allocate_tensors()
+                    batch_capacity = n
+
+                # Write straight into the interpreter's input buffer.
+                # The view must be released before invoke().
+                tensor = interpreter.tensor(input_index)()
+                for i, (image, _) in enumerate(batch):
+                    self._write_input(tensor[i], image)
+                del tensor
+
+                with INVOKE_SECONDS.time(str(n)):
+                    interpreter.invoke()
+                output = interpreter.get_tensor(output_index)
+
+                # DEQUANTIZE (if needed) once for the whole batch
+                if self._output_quantized:
+                    output = (
+                        output.astype(np.float32) - self._output_zero_point
+                    ) * self._output_scale
+
+                for i, future in enumerate(futures):
+                    future.set_result(np.array(output[i], copy=True))
+
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+            if stop:
+                return
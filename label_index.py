@@ -0,0 +1,76 @@
+import numpy as np
+
+
+# Crop relevance mapping (crop context -> label substrings)
+CROP_MAP = {
+    "TOMATO": ["tomato"],
+    "POTATO": ["potato", "tomato"],
+    "PEPPER": ["pepper", "bell"]
+}
+
+DEFAULT_CROP = "TOMATO"
+
+# Words stripped from raw class names for display
+LABEL_NOISE = ["TOMATO", "POTATO", "PEPPER", "BELL", "PLANT", "LEAF", "_"]
+
+
+def clean_label(label):
+    """'Tomato___Leaf_Mold' -> 'MOLD'"""
+    clean = label.upper()
+    for word in LABEL_NOISE:
+        clean = clean.replace(word, " ")
+
+    return " ".join(clean.split())
+
+
+class LabelIndex:
+    """
+    Label lookups precomputed ONCE from class_names.txt:
+    - display label for every class
+    - healthy flag for every class
+    - boolean relevance mask for every crop context
+    Post-processing is then a masked argmax over the model output.
+    """
+
+    def __init__(self, labels, crop_map=CROP_MAP):
+        self.labels = list(labels)
+        lowered = [label.lower() for label in self.labels]
+
+        self.clean_labels = [clean_label(label) for label in self.labels]
+        self.healthy = np.array(
+            ["HEALTHY" in label for label in self.clean_labels], dtype=bool
+        )
+
+        self.masks = {
+            crop: np.array(
+                [
+                    any(c in label for c in compatible) or "healthy" in label
+                    for label in lowered
+                ],
+                dtype=bool
+            )
+            for crop, compatible in crop_map.items()
+        }
+
+    def mask_for(self, crop):
+        return self.masks.get(crop.upper(), self.masks[DEFAULT_CROP])
+
+    def top_k(self, scores, crop, k=1):
+        """
+        scores: model output row (float)
+        Returns up to k (class_index, score) pairs, best first,
+        restricted to classes relevant for the crop context and
+        with a strictly positive score.
+        """
+        n = min(len(scores), len(self.labels))
+        masked = np.where(self.mask_for(crop)[:n], scores[:n], 0.0)
+
+        if k == 1:
+            best = int(np.argmax(masked))
+            return [(best, float(masked[best]))] if masked[best] > 0 else []
+
+        k = min(k, n)
+        top = np.argpartition(-masked, k - 1)[:k]
+        top = top[np.argsort(-masked[top], kind="stable")]
+
+        return [(int(i), float(masked[i])) for i in top if masked[i] > 0]
@@ -0,0 +1,98 @@
+import cv2
+import numpy as np
+
+from utilities import metrics
+
+
+GATE_RESULTS = metrics.counter(
+    "krishidhan_leaf_gate_total",
+    "Pre-inference leaf gate outcomes",
+    ("outcome",)
+)
+
+# Leaf-like colours, healthy OR diseased: hue 5-95 spans the
+# brown / orange of necrotic tissue, the yellow of chlorosis and
+# green. Only grey, blue / purple and washed-out pixels are left out.
+# Soil is brown too and passes: the gate only has to reject frames
+# that are certainly NOT a leaf, the model decides the rest.
+LEAF_HSV_LOW = np.array([5, 40, 30])
+LEAF_HSV_HIGH = np.array([95, 255, 255])
+
+
+class LeafGate:
+    """
+    Cheap leaf-presence check run BEFORE the TFLite model.
+
+    Works on a small copy of the frame (width `size`):
+    - brightness : mean gray level within [min, max]
+    - sharpness  : variance of the Laplacian (motion / focus blur)
+    - leaf ratio : share of leaf-coloured pixels (LEAF_HSV_*, which
+                   includes brown / yellow diseased tissue)
+    Frames that fail skip inference entirely.
+
+    Defaults are deliberately lenient (a wrongly gated diseased leaf
+    costs more than one wasted inference). They were set on synthetic
+    128 px frames: green / yellow / brown / dark-brown leaves on grey
+    and on soil must pass, while black, white, fully defocused,
+    grey-wall and blue-sky frames must fail; each threshold sits well
+    inside that margin (e.g. leaves measured >= 0.3 leaf ratio vs 0.0
+    for the non-leaf scenes). They are not tuned on field photos:
+    lower them if real leaves show up as gated.
+    """
+
+    def __init__(
+        self,
+        size=128,
+        min_brightness=35.0,
+        max_brightness=235.0,
+        min_sharpness=10.0,
+        min_leaf_ratio=0.08
+    ):
+        self.size = size
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.min_sharpness = min_sharpness
+        self.min_leaf_ratio = min_leaf_ratio
+
+    def check(self, frame):
+        """
+        frame: OpenCV BGR image
+        Returns (passed, reason, stats); reason is None when passed,
+        else too_dark | too_bright | blurry | no_leaf.
+        """
+        h, w = frame.shape[:2]
+        if w > self.size:
+            small = cv2.resize(
+                frame,
+                (self.size, max(1, h * self.size // w)),
+                interpolation=cv2.INTER_AREA
+            )
+        else:
+            small = frame
+
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        brightness = float(gray.mean())
+        stats = {"brightness": round(brightness, 1)}
+
+        if brightness < self.min_brightness:
+            return self._result(False, "too_dark", stats)
+        if brightness > self.max_brightness:
+            return self._result(False, "too_bright", stats)
+
+        sharpness = float(cv2.Laplacian(gray, cv2.CV_32F).var())
+        stats["sharpness"] = round(sharpness, 1)
+        if sharpness < self.min_sharpness:
+            return self._result(False, "blurry", stats)
+
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, LEAF_HSV_LOW, LEAF_HSV_HIGH)
+        leaf_ratio = float(np.count_nonzero(mask) / mask.size)
+        stats["leaf_ratio"] = round(leaf_ratio, 3)
+        if leaf_ratio < self.min_leaf_ratio:
+            return self._result(False, "no_leaf", stats)
+
+        return self._result(True, None, stats)
+
+    def _result(self, passed, reason, stats):
+        GATE_RESULTS.inc(reason or "passed")
+        return passed, reason, stats
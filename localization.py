@@ -0,0 +1,100 @@
+# Message templates per alert code (see utils.evaluate_parameters).
+# "en" reproduces the original check_parameters strings exactly.
+TEMPLATES = {
+    'en': {
+        'low': "{param} is LOW ({value}) → Recommended ≥ {bound} → Suggest: {fertilizer}",
+        'high': "{param} is HIGH ({value}) → Recommended ≤ {bound}",
+        'ph_acidic': "pH is too acidic ({value}) → Suggest: {fertilizer}",
+        'ph_alkaline': "pH is too alkaline ({value}) → Suggest: {fertilizer}",
+        'ph_ideal': "pH is ideal for most crops.",
+        'all_healthy': "All parameters are healthy.",
+        'unsupported_crop': "Crop '{crop}' is not supported."
+    },
+    'hi': {
+        'low': "{param} कम है ({value}) → अनुशंसित ≥ {bound} → सुझाव: {fertilizer}",
+        'high': "{param} अधिक है ({value}) → अनुशंसित ≤ {bound}",
+        'ph_acidic': "pH बहुत अम्लीय है ({value}) → सुझाव: {fertilizer}",
+        'ph_alkaline': "pH बहुत क्षारीय है ({value}) → सुझाव: {fertilizer}",
+        'ph_ideal': "pH अधिकांश फसलों के लिए आदर्श है।",
+        'all_healthy': "सभी मानक स्वस्थ हैं।",
+        'unsupported_crop': "फसल '{crop}' समर्थित नहीं है।"
+    },
+    'bn': {
+        'low': "{param} কম ({value}) → প্রস্তাবিত ≥ {bound} → পরামর্শ: {fertilizer}",
+        'high': "{param} বেশি ({value}) → প্রস্তাবিত ≤ {bound}",
+        'ph_acidic': "pH অত্যধিক অম্লীয় ({value}) → পরামর্শ: {fertilizer}",
+        'ph_alkaline': "pH অত্যধিক ক্ষারীয় ({value}) → পরামর্শ: {fertilizer}",
+        'ph_ideal': "pH বেশিরভাগ ফসলের জন্য আদর্শ।",
+        'all_healthy': "সমস্ত মান স্বাস্থ্যকর।",
+        'unsupported_crop': "ফসল '{crop}' সমর্থিত নয়।"
+    }
+}
+
+# Display names of soil parameters (English uses param.upper())
+PARAM_NAMES = {
+    'hi': {
+        'N': 'नाइट्रोजन (N)', 'P': 'फॉस्फोरस (P)', 'K': 'पोटैशियम (K)',
+        'temperature': 'तापमान', 'humidity': 'आर्द्रता',
+        'ph': 'pH', 'rainfall': 'वर्षा'
+    },
+    'bn': {
+        'N': 'নাইট্রোজেন (N)', 'P': 'ফসফরাস (P)', 'K': 'পটাসিয়াম (K)',
+        'temperature': 'তাপমাত্রা', 'humidity': 'আর্দ্রতা',
+        'ph': 'pH', 'rainfall': 'বৃষ্টিপাত'
+    }
+}
+
+
+def render_alert(alert, lang='en', terms=None):
+    """
+    Formats ONE alert record with the template of `lang`.
+    terms: {english term: localized term} for fertilizer / crop names
+    """
+    terms = terms or {}
+    fields = dict(alert)
+
+    param = alert.get('param')
+    if param is not None:
+        fields['param'] = PARAM_NAMES.get(lang, {}).get(param, param.upper())
+    for key in ('fertilizer', 'crop'):
+        if key in fields:
+            fields[key] = terms.get(fields[key], fields[key])
+
+    return TEMPLATES[lang][alert['code']].format(**fields)
+
+
+def name_crops(recommendations, lang, translator=None):
+    """
+    Adds the display name ("name") to recommendation dicts, in place.
+    "crop" stays the English id (what /fertilizer-advice expects);
+    every distinct crop goes out in ONE lookup.
+    """
+    crops = list(dict.fromkeys(rec['crop'] for rec in recommendations))
+    names = {c: c for c in crops}
+    if lang != 'en' and translator and crops:
+        names = dict(zip(crops, translator.translate_list(crops, lang)))
+
+    for rec in recommendations:
+        rec['name'] = names[rec['crop']]
+    return recommendations
+
+
+def localize_alerts(alerts, lang, translator=None):
+    """
+    Renders alert records for `lang`.
+    Template languages only look up fertilizer / crop names
+    (a small, cached vocabulary). Other languages fall back to
+    translating the rendered English strings.
+    """
+    if lang not in TEMPLATES:
+        rendered = [render_alert(a) for a in alerts]
+        return translator.translate_list(rendered, lang) if translator else rendered
+
+    terms = {}
+    if lang != 'en' and translator:
+        names = list({
+            a[key] for a in alerts for key in ('fertilizer', 'crop') if key in a
+        })
+        terms = dict(zip(names, translator.translate_list(names, lang)))
+
+    return [render_alert(a, lang, terms) for a in alerts]
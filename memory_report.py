@@ -0,0 +1,118 @@
+"""
+Memory of a running gunicorn server, per process (Linux only).
+
+    python memory_report.py <master pid>
+    python memory_report.py <master pid> --json
+
+Reads /proc/<pid>/smaps_rollup of the master and of every process
+it forked (workers and the sensor daemon tree). Pss splits shared
+pages between the processes mapping them, so the Pss total is what
+the server really costs; compare it with and without
+KRISHIDHAN_PRELOAD_MODELS=1 (see gunicorn.conf.py).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+# smaps_rollup fields reported
+MEMORY_FIELDS = [
+    "Rss", "Pss", "Shared_Clean", "Shared_Dirty",
+    "Private_Clean", "Private_Dirty", "Anonymous"
+]
+
+
+def process_memory(pid):
+    """{field: bytes} from /proc/<pid>/smaps_rollup, or None."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    memory = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[0].rstrip(":") in MEMORY_FIELDS:
+            memory[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return memory
+
+
+def process_name(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace").strip()
+    except OSError:
+        return "?"
+
+
+def descendants(pid):
+    """Every process below pid, parents before children."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # "pid (comm) state ppid ..." - comm may contain spaces
+        parents.setdefault(int(stat.rsplit(")", 1)[1].split()[1]), []).append(int(entry))
+
+    found = []
+    queue = [pid]
+    while queue:
+        children = sorted(parents.get(queue.pop(0), []))
+        found.extend(children)
+        queue.extend(children)
+    return found
+
+
+def report(master):
+    processes = []
+    for pid in [master] + descendants(master):
+        memory = process_memory(pid)
+        if memory is not None:
+            processes.append({"pid": pid, "cmd": process_name(pid), **memory})
+
+    return {
+        "processes": processes,
+        "total_rss": sum(p.get("Rss", 0) for p in processes),
+        "total_pss": sum(p.get("Pss", 0) for p in processes)
+    }
+
+
+def mib(n):
+    return f"{n / 2**20:8.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("pid", type=int, help="gunicorn master pid")
+    parser.add_argument("--json", action="store_true", help="print JSON (bytes)")
+    args = parser.parse_args()
+
+    if process_memory(args.pid) is None:
+        sys.exit(f"No smaps_rollup for pid {args.pid} (not running, or not Linux)")
+
+    result = report(args.pid)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"{'pid':>7} {'RSS MiB':>8} {'PSS MiB':>8} {'shared':>8} {'private':>8}  cmd")
+    for p in result["processes"]:
+        shared = p.get("Shared_Clean", 0) + p.get("Shared_Dirty", 0)
+        private = p.get("Private_Clean", 0) + p.get("Private_Dirty", 0)
+        print(
+            f"{p['pid']:>7} {mib(p.get('Rss', 0))} {mib(p.get('Pss', 0))} "
+            f"{mib(shared)} {mib(private)}  {p['cmd'][:60]}"
+        )
+    print(f"{'total':>7} {mib(result['total_rss'])} {mib(result['total_pss'])}")
+
+
+if __name__ == "__main__":
+    main()
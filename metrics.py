@@ -0,0 +1,221 @@
+import threading
+import time
+
+
+# Seconds; covers sub-ms cache hits up to slow serial / network calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_enabled = False
+_metrics = {}
+_lock = threading.Lock()
+
+
+def enable(on=True):
+    """Turns recording on/off (off: every call returns immediately)."""
+    global _enabled
+    _enabled = on
+
+def enabled():
+    return _enabled
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("hist", "labels", "t0")
+
+    def __init__(self, hist, labels):
+        self.hist = hist
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0, *self.labels)
+        return False
+
+
+class Counter:
+    """Monotonic counter; label values are passed positionally."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, v) for labels, v in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, Prometheus style."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        if not _enabled:
+            return
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *labels):
+        """with hist.time("stage"): ...  (no-op while disabled)"""
+        if not _enabled:
+            return _NOOP_TIMER
+        return _Timer(self, labels)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for labels, series in self._series.items():
+                for bound, n in zip(self.buckets, series):
+                    out.append((self.name + "_bucket", labels + (_fmt(bound),), n, "le"))
+                out.append((self.name + "_bucket", labels + ("+Inf",), series[-1], "le"))
+                out.append((self.name + "_sum", labels, series[-2]))
+                out.append((self.name + "_count", labels, series[-1]))
+        return out
+
+
+class CallbackMetric:
+    """Values read at scrape time from fn() -> [(labels tuple, value)]."""
+
+    def __init__(self, name, help, kind, labelnames, fn):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = labelnames
+        self.fn = fn
+
+    def samples(self):
+        return [(self.name, labels, v) for labels, v in self.fn()]
+
+
+class ProxyMetric:
+    """A metric recorded in another process; fn() returns its samples()."""
+
+    def __init__(self, metric, fn):
+        self.name = metric.name
+        self.help = metric.help
+        self.kind = metric.kind
+        self.labelnames = metric.labelnames
+        self.fn = fn
+
+    def samples(self):
+        return [tuple(s) for s in self.fn()]
+
+
+# --------------------------------------------------
+# REGISTRY
+# --------------------------------------------------
+def _register(metric):
+    # Same name -> same object (modules may be imported twice)
+    with _lock:
+        return _metrics.setdefault(metric.name, metric)
+
+def counter(name, help, labelnames=()):
+    return _register(Counter(name, help, labelnames))
+
+def histogram(name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, help, labelnames, buckets))
+
+def callback(name, help, kind, labelnames, fn):
+    with _lock:
+        _metrics[name] = CallbackMetric(name, help, kind, labelnames, fn)
+
+def proxy(name, fn):
+    """Serves the registered metric `name` from fn() instead (no-op if unknown)."""
+    with _lock:
+        if name in _metrics:
+            _metrics[name] = ProxyMetric(_metrics[name], fn)
+
+def collect(names):
+    """{name: samples} of the registered metrics among names."""
+    with _lock:
+        metrics = [_metrics[name] for name in names if name in _metrics]
+    return {metric.name: metric.samples() for metric in metrics}
+
+
+_caches = {}
+
+def register_cache(name, cache):
+    """Exports hits / misses / size of an LRUCache under cache="<name>"."""
+    _caches[name] = cache
+
+def _cache_samples(field):
+    def fn():
+        return [((name,), cache.stats()[field]) for name, cache in list(_caches.items())]
+    return fn
+
+callback("krishidhan_cache_hits_total", "Cache hits", "counter", ("cache",), _cache_samples("hits"))
+callback("krishidhan_cache_misses_total", "Cache misses", "counter", ("cache",), _cache_samples("misses"))
+callback("krishidhan_cache_entries", "Cached entries", "gauge", ("cache",), _cache_samples("size"))
+callback("krishidhan_cache_hit_ratio", "Cache hit ratio", "gauge", ("cache",), _cache_samples("hit_rate"))
+
+
+# --------------------------------------------------
+# PROMETHEUS TEXT FORMAT
+# --------------------------------------------------
+def _fmt(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render():
+    lines = []
+    with _lock:
+        metrics = list(_metrics.values())
+
+    for metric in metrics:
+        samples = metric.samples()
+        if not samples:
+            continue
+
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for sample in samples:
+            name, labels, value = sample[:3]
+            names = metric.labelnames + ((sample[3],) if len(sample) > 3 else ())
+            label_str = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, labels))
+            lines.append(f"{name}{{{label_str}}} {_fmt(value)}" if label_str else f"{name} {_fmt(value)}")
+
+    return "\n".join(lines) + "\n"
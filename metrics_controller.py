@@ -0,0 +1,41 @@
+from flask import Blueprint, Response, g, request
+import time
+
+from utilities import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+REQUEST_SECONDS = metrics.histogram(
+    "krishidhan_http_request_seconds",
+    "HTTP request latency, by endpoint and status",
+    ("endpoint", "method", "status")
+)
+
+
+@metrics_bp.before_app_request
+def _start_timer():
+    if metrics.enabled():
+        g.metrics_t0 = time.perf_counter()
+
+@metrics_bp.after_app_request
+def _observe_request(response):
+    t0 = g.pop("metrics_t0", None)
+    if t0 is not None:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - t0,
+            request.endpoint or "unknown",
+            request.method,
+            str(response.status_code)
+        )
+    return response
+
+@metrics_bp.route("/metrics")
+def prometheus_metrics():
+    """Prometheus text exposition format."""
+    if not metrics.enabled():
+        return Response("Metrics disabled\n", status=404, mimetype="text/plain")
+
+    return Response(
+        metrics.render(),
+        mimetype="text/plain; version=0.0.4"
+    )
@@ -1,27 +1,49 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 import base64
-import cv2
+import csv
+import io
+import time
 import numpy as np
 import random
 
 from services.model_service import get_data
+from services.scan_session import ScanSessionStore
+from services.crop_service import FEATURE_ORDER
+from utilities.localization import localize_alerts, name_crops
+from utilities import metrics
 
 api_bp = Blueprint("api", __name__)
 
 disease_service = None
+scan_sessions = None
 crop_service=None
 sensor_service=None
 translator_service=None
+soil_history=None
+full_check_service=None
 
+# Upper bound on rows per /recommend-crops/batch call
+MAX_BATCH_ROWS = 10000
 
+# Same histogram as DiseaseService (request-side stages)
+DISEASE_STAGES = metrics.histogram(
+    "krishidhan_disease_stage_seconds",
+    "Disease detection time per stage",
+    ("stage",)
+)
 
-def init_disease_controller(service):
+
+
+def init_disease_controller(service, sessions=None):
     """
     Dependency injection.
     Called once from app.py to attach the service.
+    sessions: ScanSessionStore for streaming scans (optional)
     """
-    global disease_service
+    global disease_service, scan_sessions
     disease_service = service
+    scan_sessions = sessions or ScanSessionStore()
 
 def init_crop_controller(crop_srv, sensor_srv):
     """
@@ -39,9 +61,177 @@ def init_crop_controller_with_translator(crop_srv, sensor_srv,translate_srv):
     sensor_service = sensor_srv
     translation_service = translate_srv
 
+def init_history_controller(history):
+    """
+    Inject SoilHistory instance.
+    Called once from app.py
+    """
+    global soil_history
+    soil_history = history
+
+def init_full_check_controller(service):
+    """
+    Inject FullCheckService instance.
+    Called once from app.py
+    """
+    global full_check_service
+    full_check_service = service
+
 def get_lang(request):
     return request.headers.get("X-Language", "en")
 
+def wants_fresh(request):
+    """?fresh=1 forces a new sensor transaction instead of the polled reading."""
+    return request.args.get("fresh", "").lower() in ("1", "true", "yes")
+
+def _read_binary_frame(request):
+    """
+    Reads raw JPEG bytes for the binary ingestion path.
+    application/octet-stream (or image/*) -> request body
+    multipart/form-data                  -> "frame" file field
+    The body is read straight from the stream into ONE buffer
+    and handed to OpenCV without further copies.
+    Returns a uint8 numpy view, or None if nothing was sent.
+    Raises RequestEntityTooLarge BEFORE allocating when the declared
+    length exceeds MAX_CONTENT_LENGTH.
+    """
+    limit = current_app.config.get("MAX_CONTENT_LENGTH")
+    if limit is not None and (request.content_length or 0) > limit:
+        raise RequestEntityTooLarge()
+
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("frame")
+        if upload is None:
+            return None
+        stream = upload.stream
+        if hasattr(stream, "getbuffer"):
+            return np.frombuffer(stream.getbuffer(), np.uint8)
+        return np.frombuffer(stream.read(), np.uint8)
+
+    stream = request.stream
+    length = request.content_length
+    if not length or not hasattr(stream, "readinto"):
+        # gunicorn hands over its own Body (no readinto)
+        data = stream.read(length) if length else stream.read()
+        return np.frombuffer(data, np.uint8) if data else None
+
+    buf = bytearray(length)
+    view = memoryview(buf)
+    read = 0
+    while read < length:
+        n = stream.readinto(view[read:])
+        if not n:
+            break
+        read += n
+
+    return np.frombuffer(buf, np.uint8, count=read) if read else None
+
+def _read_json_frame(data):
+    """Decodes the legacy base64 data URL sent inside JSON."""
+    frame_data = data["frame"]
+
+    # Remove data:image/jpeg;base64,
+    header, encoded = frame_data.split(",", 1)
+
+    image_bytes = base64.b64decode(encoded)
+    return np.frombuffer(image_bytes, np.uint8)
+
+
+
+def _parse_csv_samples(text):
+    """
+    CSV rows of the 7 soil features.
+    A header row (N,P,K,temperature,humidity,ph,rainfall in any
+    order) is optional; without one, columns are in FEATURE_ORDER.
+    Every row must have as many cells as the header (7 without one).
+    """
+    # (line number, cells), blank lines skipped
+    rows = [
+        (i, r) for i, r in enumerate(csv.reader(io.StringIO(text)), start=1)
+        if r and any(c.strip() for c in r)
+    ]
+    if not rows:
+        return np.empty((0, len(FEATURE_ORDER)))
+
+    columns = list(range(len(FEATURE_ORDER)))
+    width = len(FEATURE_ORDER)
+    header = [c.strip() for c in rows[0][1]]
+    if not all(_is_number(c) for c in header):
+        lookup = {name.lower(): i for i, name in enumerate(header)}
+        missing = [f for f in FEATURE_ORDER if f.lower() not in lookup]
+        if missing:
+            raise ValueError(f"CSV header missing: {', '.join(missing)}")
+        columns = [lookup[f.lower()] for f in FEATURE_ORDER]
+        width = len(header)
+        rows = rows[1:]
+
+    samples = []
+    for line, row in rows:
+        if len(row) != width:
+            raise ValueError(f"row {line}: expected {width} values, got {len(row)}")
+        try:
+            samples.append([float(row[c]) for c in columns])
+        except (ValueError, IndexError) as e:
+            raise ValueError(f"row {line}: {e}")
+
+    return _check_samples(samples)
+
+def _check_samples(rows):
+    """rows -> N x 7 float array; anything else is a ValueError."""
+    features = np.array(rows, dtype=np.float64)
+    if features.size == 0:
+        return np.empty((0, len(FEATURE_ORDER)))
+
+    if features.ndim != 2 or features.shape[1] != len(FEATURE_ORDER):
+        raise ValueError(
+            f"expected N x {len(FEATURE_ORDER)} values, got shape {features.shape}"
+        )
+
+    bad = np.flatnonzero(~np.isfinite(features).all(axis=1))
+    if bad.size:
+        raise ValueError(f"sample {int(bad[0])}: values must be finite")
+
+    return features
+
+def _is_number(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+def _parse_batch_samples(request):
+    """
+    Returns (N x 7 features, top_k) from:
+    - JSON list of soil dicts or 7-value lists, either bare or
+      as { "samples": [...], "top_k": 3 }
+    - text/csv body
+    - multipart/form-data with a "file" CSV upload
+    """
+    top_k = request.args.get("top_k", 3, type=int)
+
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("file")
+        if upload is None:
+            raise ValueError("No CSV file received")
+        return _parse_csv_samples(upload.read().decode("utf-8-sig")), top_k
+
+    if request.mimetype == "text/csv":
+        return _parse_csv_samples(request.get_data(as_text=True)), top_k
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        top_k = int(data.get("top_k", top_k))
+        data = data.get("samples")
+
+    if not isinstance(data, list):
+        raise ValueError("Expected a list of soil samples")
+
+    rows = [
+        [sample[f] for f in FEATURE_ORDER] if isinstance(sample, dict) else sample
+        for sample in data
+    ]
+    return _check_samples(rows), top_k
 
 
 @api_bp.route("/data")
@@ -54,8 +244,40 @@ def read_soil():
     if not sensor_service:
         return jsonify({"error": "Sensor service not initialized"}), 500
 
-    soil = sensor_service.read_soil()
-    return jsonify(soil)
+    soil, meta = sensor_service.read_soil_with_meta(fresh=wants_fresh(request))
+    return jsonify({**soil, "meta": meta})
+
+@api_bp.route("/soil/history", methods=["GET"])
+def soil_history_range():
+    """
+    ?start=&end=   epoch seconds (default: last 24 hours)
+    ?resolution=   minute | hour | day | auto (default)
+    """
+    if not soil_history:
+        return jsonify({"error": "Soil history not initialized"}), 500
+
+    try:
+        end = float(request.args.get("end", time.time()))
+        start = float(request.args.get("start", end - 86400))
+    except ValueError:
+        return jsonify({"error": "start and end must be epoch seconds"}), 400
+
+    if start > end:
+        return jsonify({"error": "start must be before end"}), 400
+
+    try:
+        history = soil_history.query(
+            start, end,
+            resolution=request.args.get("resolution", "auto")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        # e.g. the sensor daemon holding the history is restarting
+        print("Soil history error:", e)
+        return jsonify({"error": "Soil history unavailable"}), 503
+
+    return jsonify({"start": start, "end": end, **history})
 
 @api_bp.route("/detect-disease", methods=["POST"])
 def detect_disease():
@@ -63,28 +285,48 @@ def detect_disease():
     Receives one frame from frontend,
     sends it to DiseaseService,
     returns ML result as JSON.
-    """
 
-    # 1. Read request JSON
-    data = request.get_json()
+    Accepts either:
+    - raw JPEG bytes (application/octet-stream or image/jpeg),
+      crop context in ?crop=
+    - multipart/form-data with a "frame" file (+ optional "crop" field)
+    - legacy JSON { "frame": "data:image/jpeg;base64,...", "crop": ... }
+    ?top_k= (or "top_k" in JSON / form) > 1 adds the k best
+    relevant diagnoses as "top".
+
+    Streaming mode: pass a scan session id (X-Scan-Session header,
+    ?session= or "session" in JSON). Results are then smoothed across
+    frames and carry a "session" block; stop once session.stable.
+    """
 
-    if not data or "frame" not in data:
-        return jsonify({
-            "error": "No frame received"
-        }), 400
+    binary = request.mimetype in (
+        "application/octet-stream", "multipart/form-data"
+    ) or request.mimetype.startswith("image/")
 
     try:
-        # 2. Decode base64 image
-        frame_data = data["frame"]
-
-        # Remove data:image/jpeg;base64,
-        header, encoded = frame_data.split(",", 1)
-
-        image_bytes = base64.b64decode(encoded)
-
-    
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        # 1. Read request body
+        if binary:
+            data = {}
+            with DISEASE_STAGES.time("read_body"):
+                np_arr = _read_binary_frame(request)
+            if np_arr is None:
+                return jsonify({
+                    "error": "No frame received"
+                }), 400
+        else:
+            data = request.get_json(silent=True)
+
+            if not data or "frame" not in data:
+                return jsonify({
+                    "error": "No frame received"
+                }), 400
+
+        # 2. Decode image
+        if not binary:
+            with DISEASE_STAGES.time("base64"):
+                np_arr = _read_json_frame(data)
+
+        frame = disease_service.decode_frame(np_arr)
 
         if frame is None:
             return jsonify({
@@ -92,25 +334,71 @@ def detect_disease():
             }), 400
 
         # 3. Read crop context (optional)
-        crop = data.get("crop", "TOMATO")
+        crop = (
+            data.get("crop")
+            or request.args.get("crop")
+            or request.form.get("crop")
+            or "TOMATO"
+        )
+        if not isinstance(crop, str):
+            return jsonify({"error": "crop must be a string"}), 400
+
+        try:
+            top_k = max(1, int(
+                request.args.get("top_k")
+                or data.get("top_k")
+                or request.form.get("top_k")
+                or 1
+            ))
+        except (TypeError, ValueError):
+            return jsonify({"error": "top_k must be an integer"}), 400
 
       
-        # 4. Call ML service
-        result = disease_service.detect_disease(
-            frame=frame,
-            crop=crop
+        session_id = (
+            request.headers.get("X-Scan-Session")
+            or request.args.get("session")
+            or data.get("session")
         )
 
+        # 4. Call ML service
+        if session_id:
+            result = disease_service.detect_disease_streaming(
+                frame=frame,
+                session=scan_sessions.get(session_id),
+                crop=crop,
+                top_k=top_k
+            )
+        else:
+            result = disease_service.detect_disease(
+                frame=frame,
+                crop=crop,
+                top_k=top_k
+            )
+
       
         # 5. Return JSON response
         return jsonify(result)
 
+    except HTTPException:
+        raise  # 413 etc. (see request_too_large)
     except Exception as e:
         print("Disease detection error:", e)
         return jsonify({
             "error": "Processing failed"
         }), 500
     
+@api_bp.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    """Bodies over MAX_CONTENT_LENGTH (see app.create_app)."""
+    return jsonify({"error": "Request body too large"}), 413
+
+@api_bp.route("/detect-disease/session/<session_id>", methods=["DELETE"])
+def end_scan_session(session_id):
+    """Drops a streaming scan session (client stopped scanning)."""
+    return jsonify({
+        "ended": scan_sessions.end(session_id)
+    })
+
 @api_bp.route("/recommend-crops", methods=["POST"])
 def recommend_crops():
     """
@@ -130,25 +418,16 @@ def recommend_crops():
         return jsonify({"error": "Services not initialized"}), 500
 
     #Read real sensor data here
-    soil_data = sensor_service.read_soil()
+    soil_data = sensor_service.read_soil(fresh=wants_fresh(request))
 
     lang = get_lang(request)
-    recommendations = crop_service.recommend_crops(soil_data)
-
-    if lang != "en":
-        for rec in recommendations:
-            if "crop" in rec:
-                rec["crop"] = translation_service.translate_text(
-                    rec["crop"],
-                    lang
-                )
-
-            # OPTIONAL: if you add text labels later
-            if "label" in rec:
-                rec["label"] = translation_service.translate_text(
-                    rec["label"],
-                    lang
-                )
+    try:
+        recommendations = crop_service.recommend_crops(soil_data)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid soil parameters: {e}"}), 400
+
+    # "crop": English id, "name": display name (same as /full-check)
+    name_crops(recommendations, lang, translation_service)
 
    
 
@@ -158,6 +437,42 @@ def recommend_crops():
         "language": lang
     })
 
+# --------------------------------------------------
+# POST /api/recommend-crops/batch
+# --------------------------------------------------
+@api_bp.route("/recommend-crops/batch", methods=["POST"])
+def recommend_crops_batch():
+    """
+    Scores many field samples in one vectorized call.
+    Body: JSON array (or { "samples": [...] }) or CSV upload,
+    see _parse_batch_samples. Returns one top-K list per sample.
+    """
+
+    if not crop_service:
+        return jsonify({"error": "Crop service not initialized"}), 500
+
+    try:
+        features, top_k = _parse_batch_samples(request)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid samples: {e}"}), 400
+
+    if len(features) > MAX_BATCH_ROWS:
+        return jsonify({
+            "error": f"Too many samples (max {MAX_BATCH_ROWS})"
+        }), 413
+
+    lang = get_lang(request)
+    results = crop_service.recommend_crops_batch(features, top_k=top_k)
+
+    # Each distinct crop is translated once, not once per row
+    name_crops([rec for recs in results for rec in recs], lang, translation_service)
+
+    return jsonify({
+        "count": len(results),
+        "results": results,
+        "language": lang
+    })
+
 # --------------------------------------------------
 # POST /api/fertilizer-advice
 # --------------------------------------------------
@@ -178,7 +493,7 @@ def fertilizer_advice():
         return jsonify({"error": "Invalid or missing JSON"}), 400
 
     crop = data.get("crop")
-    soil = sensor_service.read_soil()
+    soil = sensor_service.read_soil(fresh=wants_fresh(request))
 
     lang = get_lang(request)
 
@@ -196,31 +511,68 @@ def fertilizer_advice():
     except Exception:
         return jsonify({"error": "Invalid soil parameters"}), 400
 
-    advice = crop_service.fertilizer_advice(
-        crop_name=crop,
-        soil_data=soil_data
-    )
+    try:
+        alerts = crop_service.fertilizer_alerts(
+            crop_name=crop,
+            soil_data=soil_data
+        )
+    except ValueError as e:
+        return jsonify({"error": f"Invalid soil parameters: {e}"}), 400
 
-    translated_advice = translation_service.translate_list(advice, lang)
+    # Rendered from per-language templates, no per-value translation
+    advice = localize_alerts(alerts, lang, translation_service)
 
     return jsonify({
         "crop": crop,
-        "fertilizer_advice": translated_advice
+        "fertilizer_advice": advice,
+        "alerts": alerts
     })
 
 @api_bp.route("/full-check", methods=["POST"])
 def run_full_check():
     """
-    Performs:
+    Performs, concurrently and with ONE sensor read:
     1. Sensor read
     2. Crop recommendation
+    3. Fertilizer advice for every supported crop
+    4. Disease detection, if a frame is sent
+
+    Frame (optional): raw JPEG body, multipart "frame" file,
+    or legacy JSON { "frame": "data:image/jpeg;base64,..." }.
+    Leaf crop context in "crop" / ?crop=.
     """
 
-    soil = sensor_service.read_soil()
-    crops = crop_service.recommend_crops(soil)
+    if not full_check_service:
+        return jsonify({"error": "Full check service not initialized"}), 500
 
-    return jsonify({
-        "soil": soil,
-        "recommended_crops": crops,
-        "disease_status": "Camera required"
-    })
\ No newline at end of file
+    binary = request.mimetype in (
+        "application/octet-stream", "multipart/form-data"
+    ) or request.mimetype.startswith("image/")
+
+    data = {} if binary else (request.get_json(silent=True) or {})
+
+    try:
+        if binary:
+            frame_buf = _read_binary_frame(request)
+        elif data.get("frame"):
+            frame_buf = _read_json_frame(data)
+        else:
+            frame_buf = None
+    except Exception:
+        return jsonify({"error": "Invalid image"}), 400
+
+    leaf_crop = (
+        data.get("crop")
+        or request.args.get("crop")
+        or request.form.get("crop")
+        or "TOMATO"
+    )
+
+    result = full_check_service.run(
+        frame_buf=frame_buf,
+        leaf_crop=leaf_crop,
+        lang=get_lang(request),
+        fresh=wants_fresh(request),
+        top_k=request.args.get("top_k", 3, type=int)
+    )
+    return jsonify(result)
\ No newline at end of file
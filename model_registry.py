@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def import_tflite():
+    """
+    Returns the lightest TFLite interpreter module available:
+    tflite_runtime -> ai_edge_litert -> full TensorFlow (last resort).
+    """
+    try:
+        import tflite_runtime.interpreter as tflite
+    except ImportError:
+        try:
+            from ai_edge_litert import interpreter as tflite
+        except ImportError:
+            import tensorflow.lite as tflite
+    return tflite
+
+
+class ModelEntry:
+    """Load state of ONE registered model."""
+
+    def __init__(self, name, loader, critical=True):
+        self.name = name
+        self.loader = loader
+        self.critical = critical
+        self.state = "pending"
+        self.value = None
+        self.error = None
+        self.load_s = None
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def load(self):
+        # Only the first caller loads; everyone else waits on `done`
+        with self.lock:
+            if self.state != "pending":
+                return
+            self.state = "loading"
+
+        started = time.perf_counter()
+        try:
+            self.value = self.loader()
+            self.state = "ready"
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+            print(f"[ModelRegistry] Failed to load {self.name}: {e}")
+        finally:
+            self.load_s = round(time.perf_counter() - started, 3)
+            self.done.set()
+
+    def status(self):
+        status = {"state": self.state, "critical": self.critical}
+        if self.load_s is not None:
+            status["load_s"] = self.load_s
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+class ModelRegistry:
+    """
+    Central place where heavy models are constructed.
+
+    mode:
+    - "eager"      load everything now, in parallel, and wait
+    - "background" start parallel loads now, return immediately
+    - "lazy"       load each model on first use
+
+    Controllers get a ModelProxy, so they never wait for a model
+    they do not use. Readiness is reported per model.
+    """
+
+    def __init__(self, mode="background"):
+        self.mode = mode
+        self._entries = OrderedDict()
+
+    def register(self, name, loader, critical=True):
+        self._entries[name] = ModelEntry(name, loader, critical)
+        return ModelProxy(self, name)
+
+    def start(self):
+        if self.mode == "lazy":
+            return
+
+        threads = [
+            threading.Thread(target=entry.load, name=f"load-{name}", daemon=True)
+            for name, entry in self._entries.items()
+        ]
+        for t in threads:
+            t.start()
+
+        if self.mode == "eager":
+            for t in threads:
+                t.join()
+
+    def get(self, name, timeout=None):
+        """Returns the loaded model, loading it now if needed."""
+        entry = self._entries[name]
+        entry.load()  # no-op unless still pending
+
+        if not entry.done.wait(timeout):
+            raise TimeoutError(f"Model '{name}' is still loading")
+        if entry.state != "ready":
+            raise RuntimeError(f"Model '{name}' failed to load: {entry.error}")
+        return entry.value
+
+    def ready(self):
+        return all(
+            entry.state == "ready"
+            for entry in self._entries.values()
+            if entry.critical
+        )
+
+    def status(self):
+        return {name: entry.status() for name, entry in self._entries.items()}
+
+
+class ModelProxy:
+    """
+    Stands in for a registered service: attribute access
+    resolves (and, if needed, waits for) the real object.
+    """
+
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        return f"<ModelProxy {self._name}>"
@@ -0,0 +1,199 @@
+import json
+import os
+import platform
+import statistics
+import time
+
+import numpy as np
+
+from services.inference_engine import InferenceEngine
+
+
+class ModelTuner:
+    """
+    Picks the fastest (num_threads, XNNPACK) for THIS host.
+
+    The disease model is timed on a short single-frame benchmark for
+    each thread count, with and without the XNNPACK delegate. Only the
+    shipped float32 build is tuned: there are no quantized builds or
+    labelled validation images in the repository to choose between
+    variants or to check their accuracy.
+
+    The result is cached as JSON, keyed by host + model file, so
+    calibration only reruns when either changes.
+    """
+
+    def __init__(
+        self,
+        model_path,
+        tflite,
+        cache_path=None,
+        thread_options=None,
+        runs=20,
+        warmup=3
+    ):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found: {model_path}")
+
+        self.model_path = model_path
+        self.tflite = tflite
+        self.cache_path = cache_path
+        self.runs = runs
+        self.warmup = warmup
+
+        cpus = os.cpu_count() or 1
+        if thread_options is None:
+            thread_options = [1, 2, 4, cpus]
+        self.thread_options = sorted({t for t in thread_options if 1 <= t <= cpus}) or [1]
+
+    # --------------------------------------------------
+    # PUBLIC API
+    # --------------------------------------------------
+    def tune(self, force=False):
+        """
+        Returns the chosen configuration:
+        { model_path, num_threads, xnnpack, num_interpreters,
+          latency_ms, candidates: [...] }
+        """
+        key = self._cache_key()
+
+        if not force:
+            cached = self._load_cache(key)
+            if cached is not None:
+                print(f"[ModelTuner] Using cached tuning: {self._describe(cached)}")
+                return cached
+
+        started = time.perf_counter()
+
+        candidates = [
+            self._benchmark(num_threads, xnnpack)
+            for num_threads in self.thread_options
+            for xnnpack in (True, False)
+        ]
+
+        result = self._choose(candidates)
+        result["candidates"] = candidates
+        result["tuning_s"] = round(time.perf_counter() - started, 2)
+
+        print(f"[ModelTuner] Tuned in {result['tuning_s']}s: {self._describe(result)}")
+        self._save_cache(key, result)
+        return result
+
+    # --------------------------------------------------
+    # CALIBRATION
+    # --------------------------------------------------
+    def _engine(self, num_threads, xnnpack):
+        return InferenceEngine(
+            model_path=self.model_path,
+            tflite=self.tflite,
+            num_interpreters=1,
+            num_threads=num_threads,
+            max_batch_size=1,
+            batch_window_ms=0,
+            xnnpack=xnnpack
+        )
+
+    def _benchmark(self, num_threads, xnnpack):
+        candidate = {
+            "num_threads": num_threads,
+            "xnnpack": xnnpack
+        }
+
+        try:
+            engine = self._engine(num_threads, xnnpack)
+        except Exception as e:
+            # e.g. runtime without OpResolverType, or delegate refused the model
+            candidate["error"] = str(e)
+            return candidate
+
+        try:
+            rng = np.random.default_rng(0)
+            image = rng.integers(0, 256, engine.input_shape, dtype=np.uint8)
+
+            for _ in range(self.warmup):
+                engine.infer(image)
+
+            timings = []
+            for _ in range(self.runs):
+                t0 = time.perf_counter()
+                engine.infer(image)
+                timings.append(time.perf_counter() - t0)
+
+            candidate["latency_ms"] = round(statistics.median(timings) * 1000, 3)
+        except Exception as e:
+            candidate["error"] = str(e)
+        finally:
+            engine.close()
+
+        return candidate
+
+    def _choose(self, candidates):
+        ranked = sorted(
+            (c for c in candidates if "latency_ms" in c),
+            key=lambda c: c["latency_ms"]
+        )
+        if not ranked:
+            raise RuntimeError("Model tuning failed: no configuration could be run")
+
+        best = ranked[0]
+        return {
+            "model_path": self.model_path,
+            "num_threads": best["num_threads"],
+            "xnnpack": best["xnnpack"],
+            # Fill the cores without oversubscribing them
+            "num_interpreters": max(1, (os.cpu_count() or 1) // best["num_threads"]),
+            "latency_ms": best["latency_ms"]
+        }
+
+    # --------------------------------------------------
+    # CACHE
+    # --------------------------------------------------
+    def _cache_key(self):
+        def fingerprint(path):
+            stat = os.stat(path)
+            return [stat.st_size, int(stat.st_mtime)]
+
+        return {
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "runtime": getattr(self.tflite, "__name__", str(self.tflite)),
+            "model": fingerprint(self.model_path),
+            "thread_options": self.thread_options
+        }
+
+    def _load_cache(self, key):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "r") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if cached.get("key") != key:
+            return None
+        return cached.get("result")
+
+    def _save_cache(self, key, result):
+        if not self.cache_path:
+            return
+
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"key": key, "result": result}, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"[ModelTuner] Could not save tuning cache: {e}")
+
+    def _describe(self, result):
+        return (
+            f"threads={result['num_threads']} "
+            f"xnnpack={result['xnnpack']} interpreters={result['num_interpreters']} "
+            f"({result['latency_ms']} ms)"
+        )
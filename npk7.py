@@ -4,8 +4,18 @@
 # Notes:
 # - Default serial port: /dev/ttyUSB0 (change below if needed)
 # - Baud: 4800
+# - python3 npk7.py --fake  runs against a simulated probe (no hardware)
 
+import os
+import select
+import selectors
+import struct
+import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import serial
 
 SERIAL_PORT = "/dev/ttyUSB0"  # e.g., /dev/ttyUSB0, /dev/ttyUSB1, /dev/ttyAMA0
@@ -14,6 +24,15 @@ TIMEOUT = 0.3  # seconds
 POLL_MS = 5000
 
 SLAVE_ADDR = 0x01
+
+# Multi-probe layout: serial port -> slave addresses on that RS485 bus
+# e.g. {"/dev/ttyUSB0": [0x01, 0x02, 0x03], "/dev/ttyUSB1": [0x01, 0x02]}
+PROBES = {SERIAL_PORT: [SLAVE_ADDR]}
+
+# Modbus RTU needs >= 3.5 character times of silence between frames
+# (8N1 = 10 bits per character)
+FRAME_GAP_S = 3.5 * 10 / BAUD
+
 START_REG = 0x0000
 REG_COUNT = 0x0007  # 7 registers → 14 data bytes
 
@@ -25,65 +44,139 @@ EC_SCALE = 1.0  # some probes use 0.1 or 10.0
 
 RESP_LEN = 19  # [addr][func][byteCount=14][14 data][CRCLo][CRCHi]
 
+_REQUEST = struct.Struct(">BBHH")  # addr, func, start reg, reg count
+_REGS = struct.Struct(">7H")  # 7 big-endian registers after the header
+_CRC = struct.Struct("<H")  # CRC is sent low byte first
 
-def crc16_modbus(data: bytes) -> int:
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b
+
+def _crc_table():
+    table = []
+    for i in range(256):
+        crc = i
         for _ in range(8):
             if crc & 0x0001:
                 crc = (crc >> 1) ^ 0xA001
             else:
                 crc >>= 1
-    return crc & 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC_TABLE = _crc_table()
+
+# Bus health counters (read by SensorService for /metrics)
+STATS = {
+    "requests": 0,
+    "retries": 0,
+    "timeouts": 0,
+    "crc_errors": 0,
+    "bad_frames": 0,
+}
+
+
+def _count_failure(error):
+    if isinstance(error, TimeoutError):
+        STATS["timeouts"] += 1
+    elif "CRC" in str(error):
+        STATS["crc_errors"] += 1
+    else:
+        STATS["bad_frames"] += 1
+
+
+def crc16_modbus(data: bytes) -> int:
+    """Table-driven CRC16/Modbus (one lookup per byte)."""
+    crc = 0xFFFF
+    table = _CRC_TABLE
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
 
 
 def build_request(slave: int, start_reg: int, reg_count: int) -> bytes:
-    frame = bytearray(8)
-    frame[0] = slave
-    frame[1] = 0x03  # Read Holding Registers
-    frame[2] = (start_reg >> 8) & 0xFF
-    frame[3] = start_reg & 0xFF
-    frame[4] = (reg_count >> 8) & 0xFF
-    frame[5] = reg_count & 0xFF
-    crc = crc16_modbus(frame[:6])
-    frame[6] = crc & 0xFF  # CRC Lo
-    frame[7] = (crc >> 8) & 0xFF  # CRC Hi
-    return bytes(frame)
-
-
-def read_exact(ser: serial.Serial, n: int, timeout_s: float) -> bytes:
-    """Read exactly n bytes or return b'' on timeout."""
-    deadline = time.time() + timeout_s
-    out = bytearray()
-    while len(out) < n and time.time() < deadline:
-        chunk = ser.read(n - len(out))
-        if chunk:
-            out.extend(chunk)
+    # 0x03 = Read Holding Registers
+    frame = _REQUEST.pack(slave, 0x03, start_reg, reg_count)
+    return frame + _CRC.pack(crc16_modbus(frame))
+
+
+_rx = threading.local()
+
+
+def rx_buffer() -> memoryview:
+    """Preallocated RESP_LEN receive buffer (one per thread)."""
+    view = getattr(_rx, "view", None)
+    if view is None:
+        view = memoryview(bytearray(RESP_LEN))
+        _rx.view = view
+    return view
+
+
+def _fileno(ser):
+    """OS file descriptor of an open port, or None (e.g. on Windows)."""
+    try:
+        return ser.fileno()
+    except Exception:
+        return None
+
+
+def read_exact(ser: serial.Serial, n: int, timeout_s: float, out: memoryview = None):
+    """
+    Read exactly n bytes or return b'' on timeout.
+    With out (a writable memoryview of >= n bytes) the data is read
+    in place via readinto and out[:n] is returned, no new buffers.
+
+    Sleeps in select() on the port's fd until bytes arrive (monotonic
+    deadline), then reads only what is waiting, so it never spins and
+    never blocks past the deadline whatever ser.timeout is. Ports
+    without an fd fall back to short polling.
+    """
+    if out is None:
+        out = memoryview(bytearray(n))
+        copy = True
+    else:
+        copy = False
+
+    deadline = time.monotonic() + timeout_s
+    fd = _fileno(ser)
+    got = 0
+    while got < n:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        if fd is not None:
+            if not select.select([fd], [], [], remaining)[0]:
+                break
+            # >= 1 so a hung-up port raises inside pyserial
+            want = min(max(ser.in_waiting, 1), n - got)
+            read = ser.readinto(out[got:got + want])
         else:
-            time.sleep(0.001)
-    return bytes(out) if len(out) == n else b""
+            read = ser.readinto(out[got:n])
+            if not read:
+                time.sleep(0.001)
+
+        got += read or 0
+
+    if got != n:
+        return b""
+    return bytes(out[:n]) if copy else out[:n]
 
 
-def parse_payload(resp: bytes):
+def parse_payload(resp: bytes, slave: int = SLAVE_ADDR):
     if len(resp) != RESP_LEN:
         raise ValueError("Bad length")
 
     if resp[2] != 14:
         raise ValueError("Bad byteCount")
 
-    rx_crc = (resp[18] << 8) | resp[17]
+    (rx_crc,) = _CRC.unpack_from(resp, 17)
     calc_crc = crc16_modbus(resp[:-2])
     if rx_crc != calc_crc:
         raise ValueError("CRC mismatch")
 
-    if resp[0] != SLAVE_ADDR or resp[1] != 0x03:
+    if resp[0] != slave or resp[1] != 0x03:
         raise ValueError("Bad addr/func")
 
-    d = resp[3:17]
-    regs = []
-    for i in range(0, 14, 2):
-        regs.append((d[i] << 8) | d[i + 1])
+    regs = _REGS.unpack_from(resp, 3)
 
     soilHumidity = regs[0] * MOIST_SCALE
     soilTempC = regs[1] * TEMP_SCALE
@@ -102,30 +195,344 @@ def parse_payload(resp: bytes):
     }
 
 
-def read_once(ser: serial.Serial, retries: int = 3):
-    req = build_request(SLAVE_ADDR, START_REG, REG_COUNT)
+def read_once(ser: serial.Serial, retries: int = 3, slave: int = SLAVE_ADDR):
+    req = build_request(slave, START_REG, REG_COUNT)
+
+    buf = rx_buffer()
 
     for attempt in range(1, retries + 1):
+        STATS["requests"] += 1
+        if attempt > 1:
+            STATS["retries"] += 1
+
         ser.reset_input_buffer()
         ser.write(req)
-        resp = read_exact(ser, RESP_LEN, TIMEOUT)
+        resp = read_exact(ser, RESP_LEN, TIMEOUT, buf)
         if not resp:
+            STATS["timeouts"] += 1
             if attempt == retries:
                 raise TimeoutError("No/short response from sensor")
             continue
 
         try:
-            return parse_payload(resp)
-        except Exception:
+            return parse_payload(resp, slave)
+        except Exception as e:
+            _count_failure(e)
             if attempt == retries:
                 raise
             time.sleep(0.05)
     raise RuntimeError("Unexpected read error")
 
 
+def open_serial(port: str = SERIAL_PORT, timeout: float = TIMEOUT) -> serial.Serial:
+    return serial.Serial(
+        port,
+        BAUD,
+        timeout=timeout,
+        bytesize=8,
+        parity=serial.PARITY_NONE,
+        stopbits=1,
+    )
+
+
+def read_bus(ser: serial.Serial, slaves, retries: int = 3):
+    """
+    Reads every slave on ONE RS485 bus back to back.
+
+    RTU allows a single outstanding request per bus, so the schedule
+    keeps the line busy instead: the next request goes out as soon as
+    the 3.5-character gap after the last frame has passed (the CRC /
+    parse of that frame runs inside the gap), and a probe that fails
+    is retried after the others instead of stalling the round.
+
+    Returns {slave: reading dict | Exception}.
+    """
+    results = {}
+    attempts = {s: 0 for s in slaves}
+    requests = {s: build_request(s, START_REG, REG_COUNT) for s in slaves}
+    todo = deque(slaves)
+    last_rx = 0.0
+    buf = rx_buffer()
+
+    while todo:
+        slave = todo.popleft()
+        attempts[slave] += 1
+        STATS["requests"] += 1
+        if attempts[slave] > 1:
+            STATS["retries"] += 1
+
+        gap = FRAME_GAP_S - (time.monotonic() - last_rx)
+        if gap > 0:
+            time.sleep(gap)
+
+        ser.reset_input_buffer()
+        ser.write(requests[slave])
+        resp = read_exact(ser, RESP_LEN, TIMEOUT, buf)
+        last_rx = time.monotonic()
+
+        try:
+            if not resp:
+                raise TimeoutError("No/short response from sensor")
+            results[slave] = parse_payload(resp, slave)
+        except Exception as e:
+            _count_failure(e)
+            if attempts[slave] < retries:
+                todo.append(slave)
+            else:
+                results[slave] = e
+
+    return results
+
+
+class _BusRound:
+    """
+    One scan round on one RS485 bus, driven by poll_buses().
+    Same schedule as read_bus (frame gap, retries at the end of the
+    round) but as a state machine: send() writes a request,
+    on_readable() consumes whatever bytes are waiting, on_timer()
+    handles response timeouts and the delayed next send.
+    """
+
+    def __init__(self, ser, slaves, retries):
+        self.ser = ser
+        self.fd = ser.fileno()
+        self.retries = retries
+        self.attempts = {s: 0 for s in slaves}
+        self.requests = {s: build_request(s, START_REG, REG_COUNT) for s in slaves}
+        self.todo = deque(slaves)
+        self.results = {}
+
+        self.buf = memoryview(bytearray(RESP_LEN))
+        self.slave = None  # slave with a request in flight
+        self.got = 0
+        self.deadline = None
+        self.send_at = 0.0  # end of the inter-frame gap
+
+    @property
+    def done(self):
+        return self.slave is None and not self.todo
+
+    def next_timer(self):
+        if self.slave is not None:
+            return self.deadline
+        return self.send_at if self.todo else None
+
+    def send(self, now):
+        self.slave = self.todo.popleft()
+        self.attempts[self.slave] += 1
+        STATS["requests"] += 1
+        if self.attempts[self.slave] > 1:
+            STATS["retries"] += 1
+        self.got = 0
+        self.deadline = now + TIMEOUT
+
+        self.ser.reset_input_buffer()
+        self.ser.write(self.requests[self.slave])
+
+    def on_readable(self, now):
+        if self.slave is None:
+            self.ser.reset_input_buffer()  # stray bytes between frames
+            return
+
+        want = min(max(self.ser.in_waiting, 1), RESP_LEN - self.got)
+        self.got += self.ser.readinto(self.buf[self.got:self.got + want]) or 0
+        if self.got == RESP_LEN:
+            self._finish(now, self.buf)
+
+    def on_timer(self, now):
+        if self.slave is not None and now >= self.deadline:
+            self._finish(now, b"")
+        if self.slave is None and self.todo and now >= self.send_at:
+            self.send(now)
+
+    def fail(self, error):
+        """Port-level failure: every probe not read yet gets the error."""
+        for slave in self.attempts:
+            self.results.setdefault(slave, error)
+        self.slave = None
+        self.todo.clear()
+
+    def _finish(self, now, resp):
+        slave = self.slave
+        self.slave = None
+        self.send_at = now + FRAME_GAP_S
+
+        try:
+            if not resp:
+                raise TimeoutError("No/short response from sensor")
+            self.results[slave] = parse_payload(resp, slave)
+        except Exception as e:
+            _count_failure(e)
+            if self.attempts[slave] < self.retries:
+                self.todo.append(slave)
+            else:
+                self.results[slave] = e
+
+
+def poll_buses(buses):
+    """
+    Runs several _BusRound state machines in ONE thread: a selector
+    waits on every port's fd plus the nearest timer, so any number
+    of buses are scanned concurrently without a thread per port.
+    """
+    with selectors.DefaultSelector() as sel:
+        for bus in buses:
+            sel.register(bus.fd, selectors.EVENT_READ, bus)
+
+        while True:
+            now = time.monotonic()
+            for bus in buses:
+                try:
+                    bus.on_timer(now)
+                except Exception as e:
+                    bus.fail(e)
+
+            timers = [t for t in (b.next_timer() for b in buses if not b.done) if t is not None]
+            if not timers:
+                return
+
+            timeout = max(0.0, min(timers) - time.monotonic())
+            for key, _ in sel.select(timeout):
+                bus = key.data
+                try:
+                    bus.on_readable(time.monotonic())
+                except Exception as e:
+                    bus.fail(e)
+
+
+def read_probes(sers, probes=None, retries: int = 3):
+    """
+    sers: {port: open serial.Serial}
+    probes: {port: [slave, ...]} (defaults to PROBES)
+
+    Buses on different ports run concurrently: event-driven in one
+    thread when every port has an fd, one thread per port otherwise.
+    Returns a list of {"port", "slave", "reading" | "error"} where
+    "error" holds the exception.
+    """
+    probes = probes or PROBES
+
+    def scan(port):
+        slaves = probes[port]
+        try:
+            return port, read_bus(sers[port], slaves, retries)
+        except Exception as e:
+            return port, {s: e for s in slaves}
+
+    if len(probes) == 1:
+        scans = [scan(next(iter(probes)))]
+    elif all(_fileno(sers[port]) is not None for port in probes):
+        buses = {port: _BusRound(sers[port], probes[port], retries) for port in probes}
+        poll_buses(list(buses.values()))
+        scans = [(port, bus.results) for port, bus in buses.items()]
+    else:
+        with ThreadPoolExecutor(max_workers=len(probes)) as pool:
+            scans = list(pool.map(scan, probes))
+
+    out = []
+    for port, results in scans:
+        for slave in probes[port]:
+            result = results[slave]
+            entry = {"port": port, "slave": slave}
+            if isinstance(result, Exception):
+                entry["error"] = result
+            else:
+                entry["reading"] = result
+            out.append(entry)
+    return out
+
+
+def aggregate(readings):
+    """Field average of several probe readings (same keys as parse_payload)."""
+    if not readings:
+        raise ValueError("No readings to aggregate")
+
+    return {
+        key: sum(r[key] for r in readings) / len(readings)
+        for key in readings[0]
+    }
+
+
+class FakeSensor:
+    """
+    Pseudo-terminal stand-in for one RS485 bus (POSIX only), so the
+    reader, poller and services can run without hardware:
+
+        fake = FakeSensor({0x01: (550, 251, 120, 65, 40, 35, 30)})
+        with open_serial(fake.port) as ser:
+            read_once(ser)
+
+    registers: {slave: 7 raw register values}; other slaves stay
+    silent like a missing probe. delay_s simulates probe latency.
+    """
+
+    DEFAULT_REGISTERS = (550, 251, 120, 65, 40, 35, 30)
+
+    def __init__(self, registers=None, delay_s=0.0):
+        import tty
+
+        self.registers = registers or {SLAVE_ADDR: self.DEFAULT_REGISTERS}
+        self.delay_s = delay_s
+        self.requests = 0
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="fake-npk7", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._running = False
+        self._thread.join(timeout=1)
+        os.close(self._master)
+        os.close(self._slave)
+
+    def _serve(self):
+        pending = bytearray()
+        while self._running:
+            if not select.select([self._master], [], [], 0.1)[0]:
+                continue
+            try:
+                pending += os.read(self._master, 256)
+            except OSError:
+                return
+
+            while len(pending) >= 8:
+                frame = bytes(pending[:8])
+                (crc,) = _CRC.unpack_from(frame, 6)
+                if crc != crc16_modbus(frame[:6]):
+                    del pending[0]  # resync
+                    continue
+                del pending[:8]
+                self.requests += 1
+                self._answer(frame[0])
+
+    def _answer(self, slave):
+        regs = self.registers.get(slave)
+        if regs is None:
+            return
+        body = bytes([slave, 0x03, 14]) + _REGS.pack(*regs)
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        os.write(self._master, body + _CRC.pack(crc16_modbus(body)))
+
+
 def main():
+    global SERIAL_PORT, PROBES
+
+    # --fake: read from a built-in pseudo-terminal sensor (no hardware)
+    if "--fake" in sys.argv:
+        fake = FakeSensor()
+        SERIAL_PORT = fake.port
+        PROBES = {SERIAL_PORT: [SLAVE_ADDR]}
+
     print("Soil NPK Sensor - USB Serial Reader (Modbus RTU)")
     print(f"Port={SERIAL_PORT}, {BAUD} 8N1, slave=0x{SLAVE_ADDR:02X}")
+    if sum(len(s) for s in PROBES.values()) > 1:
+        return main_multi()
 
     while True:
         try:
@@ -159,5 +566,50 @@ def main():
             time.sleep(3)
 
 
+def main_multi():
+    """Polls every probe in PROBES and prints per-probe + field average."""
+    print("Probes: " + ", ".join(
+        f"{port}[{', '.join(f'0x{s:02X}' for s in slaves)}]"
+        for port, slaves in PROBES.items()
+    ))
+
+    while True:
+        sers = {}
+        try:
+            for port in PROBES:
+                sers[port] = open_serial(port)
+
+            while True:
+                results = read_probes(sers)
+                ok = []
+                print("---- Soil Sensor Readings ----")
+                for r in results:
+                    tag = f"{r['port']} 0x{r['slave']:02X}"
+                    if "error" in r:
+                        print(f"[WARN] {tag}: read failed: {r['error']}")
+                        continue
+                    ok.append(r["reading"])
+                    print(
+                        f"{tag}: pH {r['reading']['ph']:.1f}  N {r['reading']['nitrogen_mgkg']}  "
+                        f"P {r['reading']['phosphorus_mgkg']}  K {r['reading']['potassium_mgkg']}"
+                    )
+                if ok:
+                    avg = aggregate(ok)
+                    print(
+                        f"Field average ({len(ok)} probes): pH {avg['ph']:.1f}  N {avg['nitrogen_mgkg']:.1f}  "
+                        f"P {avg['phosphorus_mgkg']:.1f}  K {avg['potassium_mgkg']:.1f}"
+                    )
+                print("--------------------------------\n")
+                time.sleep(POLL_MS / 1000.0)
+
+        except serial.SerialException as e:
+            print(f"[ERROR] Serial open failed: {e}")
+            print("Retrying in 3s...")
+            time.sleep(3)
+        finally:
+            for ser in sers.values():
+                ser.close()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,16 @@
+# State prepared by the gunicorn master BEFORE it forks its workers
+# (see app.prepare_prefork / gunicorn.conf.py).
+# Forked workers inherit this module (and its contents) as is; in
+# any other process it stays empty and everything is built locally.
+_state = {}
+
+
+def prepare(name, loader):
+    """Runs loader() now (once) and keeps the result for get(name)."""
+    if name not in _state:
+        _state[name] = loader()
+    return _state[name]
+
+def get(name, default=None):
+    """Prepared value, or default when not running pre-forked."""
+    return _state.get(name, default)
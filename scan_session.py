@@ -0,0 +1,260 @@
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+def frame_hash(frame):
+    """
+    64-bit difference hash (dHash) of a BGR frame.
+    Cheap enough to run on every frame; near-identical
+    frames land within a few bits of each other.
+    """
+    import cv2  # heavy: imported on the first frame, not at app boot
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+# Session attributes persisted by SharedScanSessionStore
+STATE_FIELDS = [
+    "crop", "scores", "last_hash", "last_result",
+    "frames", "inferences", "stable_count", "stable"
+]
+
+
+class ScanSession:
+    """
+    State for ONE live leaf scan (one phone, one camera run).
+    Holds the smoothed class scores and the last frame hash.
+    """
+
+    def __init__(self, session_id, store):
+        self.id = session_id
+        self.store = store
+        self.lock = threading.Lock()
+        self.crop = None
+        self.scores = None
+        self.last_hash = None
+        self.last_result = None
+        self.frames = 0
+        self.inferences = 0
+        self.stable_count = 0
+        self.stable = False
+        self.updated_at = time.monotonic()
+
+    def reset(self, crop):
+        self.crop = crop
+        self.scores = None
+        self.last_hash = None
+        self.last_result = None
+        self.stable_count = 0
+        self.stable = False
+
+    def summary(self, skipped):
+        return {
+            "id": self.id,
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "skipped": skipped,
+            "stable": self.stable
+        }
+
+
+class ScanSessionStore:
+    """
+    Bounded, expiring registry of scan sessions.
+    Streaming parameters live here so every session
+    created by the store behaves the same way.
+    """
+
+    def __init__(
+        self,
+        alpha=0.5,
+        duplicate_distance=4,
+        stable_confidence=0.70,
+        stable_frames=3,
+        ttl_s=120,
+        max_sessions=1000
+    ):
+        self.alpha = alpha
+        self.duplicate_distance = duplicate_distance
+        self.stable_confidence = stable_confidence
+        self.stable_frames = stable_frames
+        self.ttl_s = ttl_s
+        self.max_sessions = max_sessions
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = ScanSession(session_id, self)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.updated_at = now
+            return session
+
+    def end(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self, now):
+        # Oldest first: stop at the first session still alive
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.updated_at <= self.ttl_s:
+                break
+            self._sessions.popitem(last=False)
+
+
+class SharedScanSessionStore(ScanSessionStore):
+    """
+    ScanSessionStore for pre-forked workers: session state lives in
+    SQLite (WAL), so consecutive frames of one scan may hit any worker.
+
+    session.lock serializes ONE session across threads AND processes
+    (a thread lock plus an fcntl lock on the session's slot of a lock
+    file); entering it loads the session state, leaving it saves it.
+    """
+
+    LOCK_SLOTS = 1024
+    EXPIRE_INTERVAL_S = 5
+
+    def __init__(self, db_path, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._slot_locks = [threading.Lock() for _ in range(self.LOCK_SLOTS)]
+        self._lock_fd = os.open(db_path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        self._last_expire = 0.0
+
+        self._db().execute(
+            "CREATE TABLE IF NOT EXISTS scan_sessions "
+            "(id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db().execute(
+            "CREATE INDEX IF NOT EXISTS scan_sessions_updated ON scan_sessions (updated_at)"
+        )
+
+    def get(self, session_id):
+        now = time.time()
+        if now - self._last_expire >= self.EXPIRE_INTERVAL_S:
+            self._last_expire = now
+            self._expire(now)
+
+        session = ScanSession(session_id, self)
+        session.lock = _SharedSessionLock(self, session)
+        return session
+
+    def end(self, session_id):
+        cursor = self._db().execute("DELETE FROM scan_sessions WHERE id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def _expire(self, now):
+        db = self._db()
+        db.execute("DELETE FROM scan_sessions WHERE updated_at < ?", (now - self.ttl_s,))
+        db.execute(
+            "DELETE FROM scan_sessions WHERE id IN (SELECT id FROM scan_sessions "
+            "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,)
+        )
+
+    # --------------------------------------------------
+    # STATE (inside session.lock)
+    # --------------------------------------------------
+    def _load(self, session):
+        row = self._db().execute(
+            "SELECT state FROM scan_sessions WHERE id = ?", (session.id,)
+        ).fetchone()
+        if row is None:
+            return
+
+        state = json.loads(row[0])
+        for field in STATE_FIELDS:
+            setattr(session, field, state[field])
+        if session.scores is not None:
+            session.scores = np.asarray(session.scores, dtype=np.float32)
+
+    def _save(self, session):
+        state = {field: getattr(session, field) for field in STATE_FIELDS}
+        if state["scores"] is not None:
+            state["scores"] = np.asarray(state["scores"]).tolist()
+
+        session.updated_at = time.time()
+        self._db().execute(
+            "INSERT OR REPLACE INTO scan_sessions (id, state, updated_at) VALUES (?, ?, ?)",
+            (session.id, json.dumps(state), session.updated_at)
+        )
+
+    def _db(self):
+        """One connection per thread (sqlite3 objects are not shared)."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _slot(self, session_id):
+        # crc32, not hash(): the slot must be the same in every process
+        return zlib.crc32(session_id.encode()) % self.LOCK_SLOTS
+
+
+class _SharedSessionLock:
+    """session.lock of SharedScanSessionStore sessions."""
+
+    def __init__(self, store, session):
+        self.store = store
+        self.session = session
+        self.slot = store._slot(session.id)
+
+    def __enter__(self):
+        # Thread lock first: fcntl locks are per process
+        self.store._slot_locks[self.slot].acquire()
+        try:
+            fcntl.lockf(self.store._lock_fd, fcntl.LOCK_EX, 1, self.slot)
+            try:
+                self.store._load(self.session)
+            except BaseException:
+                fcntl.lockf(self.store._lock_fd, fcntl.LOCK_UN, 1, self.slot)
+                raise
+        except BaseException:
+            self.store._slot_locks[self.slot].release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.store._save(self.session)
+        finally:
+            fcntl.lockf(self.store._lock_fd, fcntl.LOCK_UN, 1, self.slot)
+            self.store._slot_locks[self.slot].release()
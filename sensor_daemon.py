@@ -0,0 +1,359 @@
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from services.sensor_service import READINGS, SIMULATED_SOIL, WARN_INTERVAL_S
+from utilities import metrics
+
+# Recorded where the serial port is (the daemon), scraped by workers
+DAEMON_METRICS = ("krishidhan_sensor_read_seconds", "krishidhan_modbus_events_total")
+
+# Delay before restarting a dead daemon: doubles up to RESTART_MAX_S,
+# back to RESTART_MIN_S once a daemon has run for RESTART_RESET_S
+RESTART_MIN_S = 1
+RESTART_MAX_S = 30
+RESTART_RESET_S = 60
+
+# A daemon that does not answer within this is treated as down
+CALL_TIMEOUT_S = 30
+
+
+class SensorDaemonUnavailable(RuntimeError):
+    """The daemon could not be reached (restarting, crashed or hung)."""
+
+
+class SensorDaemon:
+    """
+    ONE process that owns the soil sensor for every pre-forked worker.
+
+    Workers polling on their own would be N Modbus masters on one
+    RS485 bus and N writers of the same history rollups. Instead the
+    gunicorn master forks this process before its workers (see
+    app.prepare_prefork): it runs the SensorService poller and the
+    SoilHistory writer, and workers reach it through
+    RemoteSensorService / RemoteSoilHistory over a Unix socket.
+
+    factory: () -> (SensorService, SoilHistory), called in the daemon
+
+    gunicorn reaps every child of its master, so the master cannot
+    wait on the daemon: start() forks a small supervisor that runs
+    the daemon as ITS child and restarts it when it dies (with
+    backoff). Both exit with their parent (SIGTERM or parent gone),
+    the daemon flushing history first.
+    """
+
+    def __init__(self, factory, address=None):
+        self.factory = factory
+        self.address = address or os.path.join(
+            tempfile.mkdtemp(prefix="krishidhan-"), "sensor.sock"
+        )
+        self.authkey = os.urandom(32)
+        self.pid = None
+
+    def start(self, timeout=10):
+        pid = _fork(self._supervise)
+
+        self.pid = pid
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(self.address):
+            if time.monotonic() > deadline or os.waitpid(pid, os.WNOHANG)[0]:
+                raise RuntimeError("Sensor daemon failed to start")
+            time.sleep(0.05)
+
+        print(f"[SensorDaemon] Serving on {self.address} (supervisor pid {pid})")
+        return self
+
+    def stop(self, timeout=5):
+        if self.pid is None:
+            return
+        pid, self.pid = self.pid, None
+
+        try:
+            os.kill(pid, signal.SIGTERM)
+            if not _wait(pid, timeout):
+                os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+        shutil.rmtree(os.path.dirname(self.address), ignore_errors=True)
+
+    def client(self):
+        return SensorDaemonClient(self.address, self.authkey)
+
+    # --------------------------------------------------
+    # SUPERVISOR PROCESS
+    # --------------------------------------------------
+    def _supervise(self):
+        stopping = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+        signal.signal(signal.SIGINT, lambda *_: stopping.set())
+
+        master = os.getppid()
+        delay = RESTART_MIN_S
+        while True:
+            started = time.monotonic()
+            pid = _fork(self._serve)
+
+            status = None
+            while status is None and not stopping.is_set() and os.getppid() == master:
+                done, code = os.waitpid(pid, os.WNOHANG)
+                if done:
+                    status = code
+                else:
+                    stopping.wait(0.2)
+
+            if status is None:
+                # Stopped, or the master is gone: the daemon goes too
+                os.kill(pid, signal.SIGTERM)
+                if not _wait(pid, 5):
+                    os.kill(pid, signal.SIGKILL)
+                    os.waitpid(pid, 0)
+                return
+
+            if time.monotonic() - started > RESTART_RESET_S:
+                delay = RESTART_MIN_S
+            print(f"[SensorDaemon] Daemon died ({_describe(status)}), restarting in {delay}s")
+            if stopping.wait(delay) or os.getppid() != master:
+                return
+            delay = min(delay * 2, RESTART_MAX_S)
+
+    # --------------------------------------------------
+    # DAEMON PROCESS
+    # --------------------------------------------------
+    def _serve(self):
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        signal.signal(signal.SIGINT, lambda *_: sys.exit(0))
+        threading.Thread(
+            target=self._watch_parent,
+            args=(os.getppid(),),
+            name="sensor-daemon-parent",
+            daemon=True
+        ).start()
+
+        # Workers scrape the serial metrics through the socket
+        metrics.enable()
+
+        sensor, history = self.factory()
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # left behind by a daemon that crashed
+        listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        try:
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, OSError) as e:
+                    print("[SensorDaemon] Rejected connection:", e)
+                    continue
+                threading.Thread(
+                    target=self._handle,
+                    args=(conn, sensor, history),
+                    daemon=True
+                ).start()
+        except SystemExit:
+            pass
+        finally:
+            listener.close()
+            sensor.stop()
+            history.close()
+
+    def _watch_parent(self, parent):
+        while os.getppid() == parent:
+            time.sleep(1)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    def _handle(self, conn, sensor, history):
+        """One worker connection: (op, args) in, (status, value) out."""
+        with conn:
+            while True:
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    if op == "read":
+                        reply = ("ok", sensor.read_soil_with_meta(*args))
+                    elif op == "history":
+                        reply = ("ok", history.query(*args))
+                    elif op == "metrics":
+                        reply = ("ok", metrics.collect(DAEMON_METRICS))
+                    else:
+                        raise ValueError(f"Unknown request: {op}")
+                except ValueError as e:
+                    reply = ("invalid", str(e))
+                except Exception as e:
+                    reply = ("error", str(e))
+
+                try:
+                    conn.send(reply)
+                except OSError:
+                    return
+
+
+class SensorDaemonClient:
+    """
+    Worker side of the daemon socket.
+    One connection per thread, reopened once on failure; raises
+    SensorDaemonUnavailable when the daemon cannot be reached.
+    """
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def call(self, op, *args):
+        for attempt in range(2):
+            try:
+                conn = getattr(self._local, "conn", None)
+                if conn is None:
+                    conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+                    self._local.conn = conn
+                conn.send((op, args))
+                if not conn.poll(CALL_TIMEOUT_S):
+                    self.close()
+                    raise SensorDaemonUnavailable(f"Sensor daemon did not answer within {CALL_TIMEOUT_S}s")
+                status, value = conn.recv()
+                break
+            except (EOFError, OSError) as e:
+                self.close()
+                if attempt:
+                    raise SensorDaemonUnavailable(f"Sensor daemon unavailable: {e}")
+
+        if status == "invalid":
+            raise ValueError(value)
+        if status == "error":
+            raise RuntimeError(value)
+        return value
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+
+class RemoteSensorService:
+    """
+    SensorService API of a pre-forked worker, served by the SensorDaemon.
+    While the daemon is unreachable (e.g. being restarted) readings
+    are simulated, like SensorService with simulate_on_fail.
+    """
+
+    def __init__(self, client, simulate_on_fail=True):
+        self.client = client
+        self.simulate_on_fail = simulate_on_fail
+        self._warned = None
+
+    def read_soil(self, fresh=False):
+        soil, _ = self.read_soil_with_meta(fresh=fresh)
+        return soil
+
+    def read_soil_with_meta(self, fresh=False):
+        try:
+            soil, meta = self.client.call("read", fresh)
+        except SensorDaemonUnavailable as e:
+            if not self.simulate_on_fail:
+                raise
+            self._warn(e)
+            soil = dict(SIMULATED_SOIL)
+            meta = {"source": "simulated", "timestamp": time.time(), "age_s": 0.0, "stale": False}
+
+        # Served readings are counted where they are served
+        READINGS.inc(meta["source"])
+        return soil, meta
+
+    def _warn(self, error):
+        """Printed at most once per WARN_INTERVAL_S."""
+        now = time.monotonic()
+        if self._warned is not None and now - self._warned < WARN_INTERVAL_S:
+            return
+        self._warned = now
+        print(f"[SensorDaemon] Using simulated soil data: {error}")
+
+    def stop(self):
+        self.client.close()
+
+
+class RemoteSoilHistory:
+    """SoilHistory.query of a pre-forked worker, served by the SensorDaemon."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def query(self, start, end, resolution="auto"):
+        return self.client.call("history", start, end, resolution)
+
+
+def proxy_metrics(client, ttl_s=1.0):
+    """
+    Serves DAEMON_METRICS on this worker's /metrics with the daemon's
+    values (fetched at most once per ttl_s, empty while it is down).
+    """
+    lock = threading.Lock()
+    cached = {"at": None, "samples": {}}
+
+    def fetch():
+        with lock:
+            now = time.monotonic()
+            if cached["at"] is None or now - cached["at"] > ttl_s:
+                try:
+                    cached["samples"] = client.call("metrics")
+                except SensorDaemonUnavailable:
+                    cached["samples"] = {}
+                cached["at"] = now
+            return cached["samples"]
+
+    for name in DAEMON_METRICS:
+        metrics.proxy(name, lambda name=name: fetch().get(name, []))
+
+
+# --------------------------------------------------
+# PROCESS HELPERS
+# --------------------------------------------------
+def _fork(target):
+    """Runs target() in a child process and returns its pid."""
+    # Unflushed output would be written twice after fork
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            target()
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    return pid
+
+def _wait(pid, timeout):
+    """True once pid has exited, whoever reaped it."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                return True
+        except ChildProcessError:
+            # Reaped elsewhere (gunicorn reaps every child of the master)
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return True
+        time.sleep(0.05)
+    return False
+
+def _describe(status):
+    code = os.waitstatus_to_exitcode(status)
+    return f"signal {-code}" if code < 0 else f"exit code {code}"
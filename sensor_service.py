@@ -1,4 +1,8 @@
+import threading
 import time
+from contextlib import ExitStack
+
+from utilities import metrics
 
 # Try importing real sensor dependencies
 try:
@@ -8,21 +12,88 @@ except ImportError:
     serial = None
     npk7 = None
 
+READ_SECONDS = metrics.histogram(
+    "krishidhan_sensor_read_seconds",
+    "Duration of one serial scan round over every probe"
+)
+# Request-path warnings are printed at most this often
+WARN_INTERVAL_S = 60
+
+# Served when no real reading is available (simulate_on_fail)
+SIMULATED_SOIL = {
+    "N": 40.0,
+    "P": 35.0,
+    "K": 30.0,
+    "temperature": 25.0,
+    "humidity": 55.0,
+    "ph": 6.5,
+    "rainfall": 100.0,
+}
+
+READINGS = metrics.counter(
+    "krishidhan_sensor_readings_total",
+    "Soil readings served, by source",
+    ("source",)
+)
+
+if npk7:
+    metrics.callback(
+        "krishidhan_modbus_events_total",
+        "Modbus requests, retries and failures (timeouts, CRC errors, bad frames)",
+        "counter",
+        ("event",),
+        lambda: [((event,), n) for event, n in npk7.STATS.items()]
+    )
+
 
 class SensorService:
     """
     Reads soil sensor data (NPK, moisture, temp, pH)
     using Modbus RTU via USB serial.
     Falls back to simulation if unavailable.
+
+    probes: {port: [slave, ...]} (npk7.PROBES by default). With more
+    than one probe, every port is scanned in parallel and read_soil
+    returns the field average; per-probe readings are in the meta.
+
+    background_poll=True: a SensorPoller thread keeps the port open
+    and polls every poll_interval_ms (npk7.POLL_MS by default).
+    Requests then read the latest published reading without any
+    serial I/O. The poller starts on the first read, so processes
+    that never serve requests (e.g. the reloader parent) never
+    grab the port.
     """
 
-    def __init__(self, simulate_on_fail=True):
+    def __init__(
+        self,
+        simulate_on_fail=True,
+        background_poll=False,
+        poll_interval_ms=None,
+        max_age_s=None,
+        probes=None,
+        history=None
+    ):
         self.simulate_on_fail = simulate_on_fail
+        # SoilHistory: records REAL readings only (never simulated ones)
+        self.history = history
+        self.probes = probes or (npk7.PROBES if npk7 else {})
+        self.background_poll = background_poll and bool(serial and npk7)
+
+        if poll_interval_ms is None:
+            poll_interval_ms = npk7.POLL_MS if npk7 else 5000
+        self.poll_interval = poll_interval_ms / 1000.0
+
+        # Older readings are treated as "sensor unavailable"
+        self.max_age_s = max_age_s if max_age_s is not None else 3 * self.poll_interval
+
+        self._poller = None
+        self._poller_lock = threading.Lock()
+        self._warned = {}
 
     # --------------------------------------------------
     # PUBLIC METHOD (used by controllers/services)
     # --------------------------------------------------
-    def read_soil(self):
+    def read_soil(self, fresh=False):
         """
         Returns normalized soil data:
         {
@@ -32,37 +103,153 @@ class SensorService:
             ph,
             rainfall
         }
+        fresh=True forces a new sensor transaction instead of
+        using the poller's latest reading.
         """
 
-        if serial and npk7:
+        soil, _ = self.read_soil_with_meta(fresh=fresh)
+        return soil
+
+    def read_soil_with_meta(self, fresh=False):
+        """
+        Same as read_soil, plus metadata:
+        { source: poller | sensor | simulated, timestamp, age_s, stale }
+        and "probes" (per-probe soil / error) when several are configured.
+
+        With the poller, the last real reading is served even when it
+        is older than max_age_s (stale: True, e.g. probe unplugged);
+        simulated data is only used before the first real reading.
+        """
+
+        if self.background_poll:
+            poller = self._ensure_poller()
+            reading = poller.fresh(timeout=self._fresh_timeout()) if fresh else None
+
+            if reading is None:
+                reading = poller.latest()
+
+            if reading is None:
+                # First request after start: wait for the first poll
+                reading = poller.wait_first(timeout=self._fresh_timeout())
+
+            if reading is not None:
+                soil, probes, timestamp = reading
+                return dict(soil), self._meta("poller", timestamp, probes)
+
+            self._warn("No reading from poller yet")
+
+        elif serial and npk7:
             try:
-                return self._read_from_sensor()
+                soil, probes = self._read_from_sensor()
+                return soil, self._meta("sensor", time.time(), probes)
             except Exception as e:
-                print("[SensorService] Sensor read failed:", e)
+                self._warn("Sensor read failed", e)
 
         if self.simulate_on_fail:
-            return self._simulate_data()
+            return self._simulate_data(), self._meta("simulated", time.time())
 
         raise RuntimeError("Soil sensor unavailable")
 
+    def stop(self):
+        """Stops the background poller (if running) and closes the port."""
+        with self._poller_lock:
+            if self._poller:
+                self._poller.stop()
+                self._poller = None
+
     # --------------------------------------------------
-    # REAL SENSOR READ (uses your npk7 code)
+    # BACKGROUND POLLER
     # --------------------------------------------------
-    def _read_from_sensor(self):
-        with serial.Serial(
-            port=npk7.SERIAL_PORT,
-            baudrate=npk7.BAUD,
-            timeout=npk7.TIMEOUT,
-            bytesize=8,
-            parity=serial.PARITY_NONE,
-            stopbits=1,
-        ) as ser:
-            raw = npk7.read_once(ser, retries=3)
+    def _ensure_poller(self):
+        with self._poller_lock:
+            if self._poller is None:
+                self._poller = SensorPoller(self, self.poll_interval)
+                self._poller.start()
+            return self._poller
+
+    def _warn(self, message, detail=None):
+        """Prints a request-path warning at most once per WARN_INTERVAL_S."""
+        now = time.monotonic()
+        last = self._warned.get(message)
+        if last is not None and now - last < WARN_INTERVAL_S:
+            return
+        self._warned[message] = now
+        print(f"[SensorService] {message}" + (f": {detail}" if detail is not None else ""))
+
+    def _fresh_timeout(self):
+        # Worst case: every retry of every probe on the busiest bus times out
+        busiest = max((len(s) for s in self.probes.values()), default=1)
+        return busiest * 3 * (npk7.TIMEOUT + npk7.FRAME_GAP_S) + 0.5
+
+    def _meta(self, source, timestamp, probes=None):
+        READINGS.inc(source)
+        age = max(0.0, time.time() - timestamp)
+        meta = {
+            "source": source,
+            "timestamp": timestamp,
+            "age_s": round(age, 3),
+            "stale": age > self.max_age_s
+        }
+        if probes and len(probes) > 1:
+            meta["probes"] = probes
+        return meta
+
+    def _open_ports(self, stack):
+        """Opens every configured port inside an ExitStack."""
+        return {
+            port: stack.enter_context(npk7.open_serial(port))
+            for port in self.probes
+        }
+
+    def _read_field(self, sers):
+        """
+        One round over every probe.
+        Returns (field average soil, per-probe list).
+        """
+        with READ_SECONDS.time():
+            results = npk7.read_probes(sers, self.probes, retries=3)
+
+        readings = []
+        probes = []
+        for r in results:
+            entry = {"port": r["port"], "slave": r["slave"]}
+            if "reading" in r:
+                readings.append(r["reading"])
+                entry["soil"] = self._normalize(dict(r["reading"], rainfall=100.0))
+            else:
+                # A dead adapter must reach the poller so it reopens ports
+                if isinstance(r["error"], serial.SerialException):
+                    raise r["error"]
+                entry["error"] = str(r["error"])
+            probes.append(entry)
+
+        if not readings:
+            raise RuntimeError(
+                "No probe answered: " + "; ".join(p["error"] for p in probes)
+            )
+
+        raw = npk7.aggregate(readings)
 
         # Inject rainfall (not provided by NPK sensor)
         raw["rainfall"] = 100.0
 
-        return self._normalize(raw)
+        soil = self._normalize(raw)
+
+        if self.history:
+            try:
+                self.history.record(soil)
+            except Exception as e:
+                # History must never break live readings
+                print(f"[SensorService] History write failed: {e}")
+
+        return soil, probes
+
+    # --------------------------------------------------
+    # REAL SENSOR READ (uses your npk7 code)
+    # --------------------------------------------------
+    def _read_from_sensor(self):
+        with ExitStack() as stack:
+            return self._read_field(self._open_ports(stack))
 
     # --------------------------------------------------
     # NORMALIZE RAW SENSOR OUTPUT
@@ -86,14 +273,105 @@ class SensorService:
     # FALLBACK SIMULATION
     # --------------------------------------------------
     def _simulate_data(self):
-        print("[SensorService] Using simulated soil data")
+        self._warn("Using simulated soil data")
 
-        return {
-            "N": 40.0,
-            "P": 35.0,
-            "K": 30.0,
-            "temperature": 25.0,
-            "humidity": 55.0,
-            "ph": 6.5,
-            "rainfall": 100.0,
-        }
+        return dict(SIMULATED_SOIL)
+
+
+class SensorPoller(threading.Thread):
+    """
+    Keeps the serial port open and polls the probe on a fixed
+    interval, publishing (soil, timestamp) for request handlers.
+    fresh() wakes the loop for an immediate transaction, so a
+    forced read never opens the port a second time.
+
+    Every transaction (or port open attempt) gets an attempt number
+    when it STARTS; fresh() waits for one that started after the call,
+    so a poll already in flight never counts as fresh.
+    """
+
+    def __init__(self, service, interval_s):
+        super().__init__(name="soil-sensor-poller", daemon=True)
+        self.service = service
+        self.interval_s = interval_s
+
+        self._latest = None
+        self._latest_attempt = 0
+        self._attempts = 0  # attempts begun
+        self._seq = 0      # attempts finished
+        self._running = True
+        self._wake = threading.Event()
+        self._cond = threading.Condition()
+
+    def latest(self):
+        with self._cond:
+            return self._latest
+
+    def wait_first(self, timeout):
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > 0, timeout=timeout)
+            return self._latest
+
+    def fresh(self, timeout):
+        """
+        Triggers a poll now and waits for its result.
+        None if that poll failed or did not finish in time.
+        """
+        with self._cond:
+            target = self._attempts + 1
+            self._wake.set()
+            if not self._cond.wait_for(lambda: self._seq >= target, timeout=timeout):
+                return None
+            if self._latest_attempt < target:
+                return None
+            return self._latest
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        self.join(timeout=5)
+
+    def run(self):
+        while self._running:
+            # Clear BEFORE the attempt starts: a fresh() call after
+            # this point is served by this attempt or wakes the next
+            self._wake.clear()
+            attempt = self._begin()
+            try:
+                with ExitStack() as stack:
+                    sers = self.service._open_ports(stack)
+                    while self._running:
+                        try:
+                            self._publish(self.service._read_field(sers), attempt)
+                        except serial.SerialException:
+                            raise
+                        except Exception as e:
+                            print("[SensorPoller] Read failed:", e)
+                            self._publish(None, attempt)
+
+                        self._wake.wait(self.interval_s)
+                        self._wake.clear()
+                        attempt = self._begin()
+
+            except Exception as e:
+                print(f"[SensorPoller] Serial open failed on {', '.join(self.service.probes)}:", e)
+                self._publish(None, attempt)
+                self._wake.wait(3)
+
+    def _begin(self):
+        with self._cond:
+            self._attempts += 1
+            return self._attempts
+
+    def _publish(self, result, attempt):
+        """
+        result: (soil, probes) or None for a failed poll.
+        Failed polls still finish their attempt so fresh() callers wake up.
+        """
+        with self._cond:
+            if result is not None:
+                soil, probes = result
+                self._latest = (soil, probes, time.time())
+                self._latest_attempt = attempt
+            self._seq = attempt
+            self._cond.notify_all()
@@ -0,0 +1,219 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+
+# Fields kept in history (rainfall is injected, not measured)
+HISTORY_FIELDS = ["N", "P", "K", "temperature", "humidity", "ph"]
+
+# Rollup table -> bucket width in seconds
+RESOLUTIONS = {
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# How long each table keeps data (None = forever)
+RETENTION_S = {
+    "readings": 7 * 86400,
+    "minute": 30 * 86400,
+    "hour": None,
+    "day": None,
+}
+
+
+class SoilHistory:
+    """
+    Append-only soil reading history on SQLite (WAL).
+
+    Readings are buffered in memory and written in ONE transaction
+    per flush; minute / hour / day rollups (count, sum, min, max per
+    field) are pre-aggregated in Python first, so a flush touches
+    only a handful of rows. Range queries are served from the
+    rollups, never by scanning raw readings.
+    """
+
+    def __init__(self, db_path, batch_size=60, flush_interval_s=60):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._last_prune = 0.0
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        atexit.register(self.close)
+
+    # --------------------------------------------------
+    # WRITE PATH
+    # --------------------------------------------------
+    def record(self, soil, timestamp=None):
+        """Buffers one normalized soil reading; flushes when due."""
+        row = (int(timestamp if timestamp is not None else time.time()),) + tuple(
+            float(soil[f]) for f in HISTORY_FIELDS
+        )
+
+        with self._lock:
+            self._pending.append(row)
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval_s
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return
+
+            cols = ", ".join(HISTORY_FIELDS)
+            marks = ", ".join("?" * (len(HISTORY_FIELDS) + 1))
+
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    f"INSERT OR REPLACE INTO readings (ts, {cols}) VALUES ({marks})",
+                    rows
+                )
+                for name, width in RESOLUTIONS.items():
+                    self._upsert_rollup(name, self._aggregate(rows, width))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+            self._prune()
+
+    def close(self):
+        try:
+            self.flush()
+        except sqlite3.ProgrammingError:
+            return  # already closed
+        with self._lock:
+            self._db.close()
+
+    # --------------------------------------------------
+    # READ PATH
+    # --------------------------------------------------
+    def query(self, start, end, resolution="auto"):
+        """
+        start, end: epoch seconds
+        resolution: minute | hour | day | auto
+        Returns [{ t, count, avg: {...}, min: {...}, max: {...} }]
+        """
+        if resolution == "auto":
+            span = end - start
+            if span <= 12 * 3600:
+                resolution = "minute"
+            elif span <= 30 * 86400:
+                resolution = "hour"
+            else:
+                resolution = "day"
+
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        # Make buffered readings visible
+        self.flush()
+
+        width = RESOLUTIONS[resolution]
+        sums = ", ".join(f"sum_{f}, min_{f}, max_{f}" for f in HISTORY_FIELDS)
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT bucket, n, {sums} FROM rollup_{resolution} "
+                "WHERE bucket >= ? AND bucket <= ? ORDER BY bucket",
+                (int(start) // width * width, int(end))
+            ).fetchall()
+
+        points = []
+        for row in rows:
+            bucket, n = row[0], row[1]
+            values = row[2:]
+            point = {"t": bucket, "count": n, "avg": {}, "min": {}, "max": {}}
+            for i, f in enumerate(HISTORY_FIELDS):
+                total, low, high = values[3 * i: 3 * i + 3]
+                point["avg"][f] = round(total / n, 2)
+                point["min"][f] = low
+                point["max"][f] = high
+            points.append(point)
+
+        return {"resolution": resolution, "points": points}
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+    def _create_tables(self):
+        cols = ", ".join(f"{f} REAL" for f in HISTORY_FIELDS)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS readings (ts INTEGER PRIMARY KEY, {cols})")
+
+        stats = ", ".join(f"sum_{f} REAL, min_{f} REAL, max_{f} REAL" for f in HISTORY_FIELDS)
+        for name in RESOLUTIONS:
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS rollup_{name} "
+                f"(bucket INTEGER PRIMARY KEY, n INTEGER, {stats})"
+            )
+
+    def _aggregate(self, rows, width):
+        """rows -> {bucket: [n, (sum, min, max) per field]}"""
+        buckets = {}
+        for row in rows:
+            bucket = row[0] // width * width
+            agg = buckets.get(bucket)
+            if agg is None:
+                buckets[bucket] = [1] + [[v, v, v] for v in row[1:]]
+                continue
+            agg[0] += 1
+            for stat, v in zip(agg[1:], row[1:]):
+                stat[0] += v
+                stat[1] = min(stat[1], v)
+                stat[2] = max(stat[2], v)
+        return buckets
+
+    def _upsert_rollup(self, name, buckets):
+        cols = ", ".join(f"sum_{f}, min_{f}, max_{f}" for f in HISTORY_FIELDS)
+        marks = ", ".join("?" * (2 + 3 * len(HISTORY_FIELDS)))
+        updates = ", ".join(
+            f"sum_{f} = sum_{f} + excluded.sum_{f}, "
+            f"min_{f} = min(min_{f}, excluded.min_{f}), "
+            f"max_{f} = max(max_{f}, excluded.max_{f})"
+            for f in HISTORY_FIELDS
+        )
+
+        self._db.executemany(
+            f"INSERT INTO rollup_{name} (bucket, n, {cols}) VALUES ({marks}) "
+            f"ON CONFLICT(bucket) DO UPDATE SET n = n + excluded.n, {updates}",
+            [
+                (bucket, agg[0], *(v for stat in agg[1:] for v in stat))
+                for bucket, agg in buckets.items()
+            ]
+        )
+
+    def _prune(self):
+        """Drops expired raw / minute data, at most once an hour."""
+        now = time.time()
+        if now - self._last_prune < 3600:
+            return
+        self._last_prune = now
+
+        for name, keep in RETENTION_S.items():
+            if keep is None:
+                continue
+            table, key = ("readings", "ts") if name == "readings" else (f"rollup_{name}", "bucket")
+            self._db.execute(f"DELETE FROM {table} WHERE {key} < ?", (int(now - keep),))
@@ -0,0 +1,145 @@
+from flask import Blueprint, request
+import json
+import threading
+import uuid
+
+import numpy as np
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None  # streaming disabled: clients fall back to HTTP polling
+
+from services.scan_session import ScanSessionStore
+from utilities import metrics
+
+stream_bp = Blueprint("stream", __name__)
+sock = Sock() if Sock else None
+
+# Close code "try again later": the client falls back to HTTP polling
+TRY_AGAIN_LATER = 1013
+
+STREAMS_REJECTED = metrics.counter(
+    "krishidhan_streams_rejected_total",
+    "WebSocket scans refused because every stream slot was taken"
+)
+
+disease_service = None
+scan_sessions = None
+stream_slots = None
+
+
+def init_stream_controller(service, sessions=None, max_streams=None):
+    """
+    Dependency injection.
+    Called once from app.py; share the ScanSessionStore
+    with the HTTP disease controller.
+    max_streams: open streams allowed at once (None: no limit).
+    Every open stream holds a server thread for its whole life.
+    """
+    global disease_service, scan_sessions, stream_slots
+    disease_service = service
+    scan_sessions = sessions or ScanSessionStore()
+    stream_slots = threading.BoundedSemaphore(max_streams) if max_streams else None
+
+
+def _latest_message(ws, message):
+    """
+    Server-side backpressure: frames that queued up while the last
+    one was being processed are stale, so only the NEWEST is kept.
+    Text (control) messages are never dropped.
+    Returns (latest frame or None, controls, dropped count).
+    """
+    frame = None
+    controls = []
+    dropped = 0
+
+    while message is not None:
+        if isinstance(message, str):
+            controls.append(message)
+        else:
+            if frame is not None:
+                dropped += 1
+            frame = message
+        message = ws.receive(timeout=0)
+
+    return frame, controls, dropped
+
+
+def _control_crop(control, crop):
+    """Crop from a text control message { "crop": "..." }; else `crop`."""
+    try:
+        value = json.loads(control).get("crop")
+    except (ValueError, AttributeError):
+        return crop
+    return value if isinstance(value, str) and value.strip() else crop
+
+
+def detect_disease_stream(ws):
+    """
+    WebSocket /api/detect-disease/stream?crop=&session=&top_k=
+
+    Client -> server: binary JPEG frames,
+                      or text JSON { "crop": "..." }
+    Server -> client: one JSON result per processed frame
+                      (streaming session result + "dropped"),
+                      or { "error": ... } for a frame that failed
+
+    With every stream slot taken the socket is closed with 1013
+    right away and the client scans over HTTP instead.
+    """
+    slots = stream_slots
+    if slots is not None and not slots.acquire(blocking=False):
+        STREAMS_REJECTED.inc()
+        ws.close(reason=TRY_AGAIN_LATER, message="Too many live scans, use HTTP")
+        return
+
+    try:
+        _stream(ws)
+    finally:
+        if slots is not None:
+            slots.release()
+
+
+def _stream(ws):
+    crop = request.args.get("crop", "TOMATO")
+    session_id = request.args.get("session") or uuid.uuid4().hex
+    top_k = max(1, request.args.get("top_k", 1, type=int))
+    dropped = 0
+
+    try:
+        while True:
+            frame_bytes, controls, skipped = _latest_message(ws, ws.receive())
+            dropped += skipped
+
+            for control in controls:
+                crop = _control_crop(control, crop)
+
+            if frame_bytes is None:
+                continue
+
+            # One bad frame must not close the stream
+            try:
+                frame = disease_service.decode_frame(np.frombuffer(frame_bytes, np.uint8))
+                if frame is None:
+                    ws.send(json.dumps({"error": "Invalid image"}))
+                    continue
+
+                result = disease_service.detect_disease_streaming(
+                    frame=frame,
+                    session=scan_sessions.get(session_id),
+                    crop=crop,
+                    top_k=top_k
+                )
+            except Exception as e:
+                print("Disease stream error:", e)
+                result = {"error": "Processing failed"}
+
+            result["dropped"] = dropped
+            ws.send(json.dumps(result))
+    finally:
+        scan_sessions.end(session_id)
+
+
+if sock:
+    sock.route("/detect-disease/stream", bp=stream_bp)(detect_disease_stream)
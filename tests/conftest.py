@@ -0,0 +1,82 @@
+"""
+The modules sit flat in the repository root but import each other
+as services.* / utilities.* / controllers.* (their deployed layout).
+Those packages are registered here with the root as their path.
+"""
+
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for package in ("services", "utilities", "controllers"):
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [ROOT]
+        sys.modules[package] = module
+
+
+def root_path(name):
+    return os.path.join(ROOT, name)
+
+
+@pytest.fixture(scope="session")
+def crop_models():
+    import joblib
+
+    return joblib.load(root_path("random_forest.pkl")), joblib.load(root_path("scaler.pkl"))
+
+
+@pytest.fixture(scope="session")
+def crop_service():
+    from services.crop_service import CropService
+
+    return CropService(
+        model_path=root_path("random_forest.pkl"),
+        scaler_path=root_path("scaler.pkl"),
+        targets_path=root_path("targets.pkl"),
+        inference_engine="compiled"
+    )
+
+
+@pytest.fixture(scope="session")
+def disease_service():
+    """Real TFLite model, no leaf gate: every frame is inferred."""
+    from services.disease_service import DiseaseService
+    from services.model_registry import import_tflite
+
+    return DiseaseService(
+        model_path=root_path("plant_disease_model.tflite"),
+        labels_path=root_path("class_names.txt"),
+        tflite=import_tflite(),
+        num_interpreters=1
+    )
+
+
+@pytest.fixture(scope="session")
+def leaf_jpeg():
+    """Encoded synthetic leaf frames; seed picks the texture."""
+    import cv2
+
+    def make(seed=0):
+        rng = np.random.default_rng(seed)
+        img = np.full((224, 224, 3), (60, 150, 60), np.uint8)
+        cv2.ellipse(img, (112, 112), (90, 60), 30, 0, 360, (40, 170, 70), -1)
+        img = cv2.add(img, rng.integers(0, 40, img.shape, dtype=np.uint8))
+        return cv2.imencode(".jpg", img)[1].tobytes()
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def soil_samples():
+    """Random readings over the ranges the sensor reports."""
+    rng = np.random.default_rng(7)
+    low = [0, 0, 0, 5, 10, 3.5, 20]
+    high = [140, 145, 205, 45, 100, 9.5, 300]
+    return rng.uniform(low, high, size=(500, 7))
+
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from services.async_gateway import AsyncServiceGateway
+from services.model_registry import ModelRegistry
+
+
+class SlowDisease:
+    """Engine-shaped stand-in that records peak concurrency."""
+
+    def __init__(self, work_s=0.05):
+        self.engine = SimpleNamespace(max_batch_size=2, num_interpreters=2)
+        self.work_s = work_s
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def detect_disease(self, frame, crop="TOMATO", top_k=1):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.work_s)
+        with self._lock:
+            self.active -= 1
+        return {"frame": frame, "crop": crop, "top_k": top_k}
+
+
+class Crops:
+    def recommend_crops(self, soil, top_k=3):
+        return [{"crop": "rice", "confidence": 1.0}][:top_k]
+
+
+def _loop_stall(coro_factory):
+    """Runs coro_factory() while measuring the longest loop stall."""
+
+    async def main():
+        stalls = []
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await asyncio.sleep(0.005)
+                stalls.append(time.perf_counter() - t0)
+
+        probe_task = asyncio.create_task(probe())
+        try:
+            return await coro_factory(), max(stalls)
+        finally:
+            done.set()
+            await probe_task
+
+    return asyncio.run(main())
+
+
+def test_model_load_does_not_block_the_loop():
+    registry = ModelRegistry(mode="lazy")
+    disease = registry.register("disease", lambda: time.sleep(1.0) or SlowDisease())
+    gateway = AsyncServiceGateway({"disease": disease, "crop": Crops()})
+
+    async def requests():
+        started = time.perf_counter()
+        slow = asyncio.create_task(gateway.detect_disease("f"))
+        recs = await gateway.recommend_crops({}, top_k=1)
+        fast_s = time.perf_counter() - started
+        return recs, fast_s, await slow
+
+    (recs, fast_s, result), stall = _loop_stall(requests)
+    gateway.shutdown()
+
+    assert recs[0]["crop"] == "rice"
+    assert fast_s < 0.5          # served while the model loads
+    assert result["frame"] == "f"
+    assert stall < 0.5
+
+
+def test_disease_concurrency_follows_the_engine():
+    service = SlowDisease()
+    gateway = AsyncServiceGateway({"disease": service})
+
+    async def burst():
+        return await asyncio.gather(*(gateway.detect_disease(i, top_k=2) for i in range(16)))
+
+    results = asyncio.run(burst())
+    gateway.shutdown()
+
+    assert gateway.limits["disease"] == 4  # max_batch_size x interpreters
+    assert service.peak == 4
+    assert [r["frame"] for r in results] == list(range(16))
+    assert all(r["top_k"] == 2 for r in results)
+
+
+def test_explicit_limit_wins():
+    service = SlowDisease()
+    gateway = AsyncServiceGateway({"disease": service}, limits={"disease": 1})
+
+    async def burst():
+        return await asyncio.gather(*(gateway.detect_disease(i) for i in range(4)))
+
+    asyncio.run(burst())
+    gateway.shutdown()
+
+    assert service.peak == 1
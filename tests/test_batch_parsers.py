@@ -0,0 +1,122 @@
+import math
+
+import pytest
+from flask import Flask
+
+from controllers import model_controller
+from controllers.model_controller import _check_samples, _parse_batch_samples, _parse_csv_samples
+from services.crop_service import FEATURE_ORDER
+
+SAMPLE = [90, 42, 43, 20.8, 82.0, 6.5, 202.9]
+
+
+@pytest.fixture(scope="module")
+def client(crop_service):
+    app = Flask(__name__)
+    app.register_blueprint(model_controller.api_bp, url_prefix="/api")
+    model_controller.init_crop_controller_with_translator(crop_service, None, None)
+    return app.test_client()
+
+
+# --------------------------------------------------
+# CSV
+# --------------------------------------------------
+def test_csv_without_header_uses_feature_order():
+    features = _parse_csv_samples("90,42,43,20.8,82,6.5,202.9\n\n1,2,3,4,5,6,7\n")
+
+    assert features.shape == (2, 7)
+    assert features[0].tolist() == SAMPLE
+
+
+def test_csv_header_in_any_order():
+    text = "rainfall,ph,humidity,temperature,K,P,N\n202.9,6.5,82,20.8,43,42,90\n"
+    assert _parse_csv_samples(text)[0].tolist() == SAMPLE
+
+
+def test_csv_empty():
+    assert _parse_csv_samples("\n\n").shape == (0, 7)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("1,2,3,4,5,6,7\n1,2,3\n", "row 2: expected 7 values, got 3"),
+    ("1,2,3,4,5,6,7\n1,2,3,4,5,6,7,8\n", "row 2: expected 7 values, got 8"),
+    ("N,P,K,temperature,humidity,ph,rainfall\n1,2,3,4,5,6\n", "row 2: expected 7 values, got 6"),
+    ("1,2,3,4,5,6,7\n\n1,2,x,4,5,6,7\n", "row 3: could not convert"),
+    ("N,P,K,temperature,humidity,ph\n1,2,3,4,5,6\n", "CSV header missing: rainfall"),
+    ("1,2,3,4,5,6,nan\n", "sample 0: values must be finite"),
+])
+def test_csv_malformed(text, message):
+    with pytest.raises(ValueError, match=message):
+        _parse_csv_samples(text)
+
+
+# --------------------------------------------------
+# JSON SAMPLES
+# --------------------------------------------------
+@pytest.mark.parametrize("rows", [
+    SAMPLE * 2,            # flat list of 14 numbers
+    [SAMPLE[:6]],          # short row
+    [SAMPLE, SAMPLE[:6]],  # ragged
+    [[SAMPLE]],            # one level too deep
+])
+def test_check_samples_rejects_wrong_shape(rows):
+    with pytest.raises(ValueError):
+        _check_samples(rows)
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_check_samples_rejects_non_finite(value):
+    with pytest.raises(ValueError, match="sample 1"):
+        _check_samples([SAMPLE, SAMPLE[:6] + [value]])
+
+
+def test_parse_batch_samples_json_forms():
+    soil = dict(zip(FEATURE_ORDER, SAMPLE))
+    app = Flask(__name__)
+
+    with app.test_request_context(json=[soil, SAMPLE]):
+        features, top_k = _parse_batch_samples(model_controller.request)
+    assert features.tolist() == [SAMPLE, SAMPLE] and top_k == 3
+
+    with app.test_request_context(json={"samples": [SAMPLE], "top_k": 1}):
+        features, top_k = _parse_batch_samples(model_controller.request)
+    assert features.shape == (1, 7) and top_k == 1
+
+
+# --------------------------------------------------
+# ROUTE
+# --------------------------------------------------
+def test_batch_route_scores_every_sample(client):
+    response = client.post("/api/recommend-crops/batch?top_k=2", json=[SAMPLE, SAMPLE])
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["count"] == 2
+    assert all(len(recs) == 2 for recs in body["results"])
+    assert body["results"][0][0]["name"] == body["results"][0][0]["crop"]
+
+
+def test_batch_route_accepts_csv(client):
+    response = client.post(
+        "/api/recommend-crops/batch",
+        data="90,42,43,20.8,82,6.5,202.9\n",
+        content_type="text/csv"
+    )
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 1
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"json": SAMPLE * 2},
+    {"json": [SAMPLE[:6]]},
+    {"json": [SAMPLE[:6] + [None]]},
+    {"json": [{"N": 1}]},
+    {"json": {"samples": "nope"}},
+    {"data": "1,2,3,4,5,6,7\n1,2\n", "content_type": "text/csv"},
+    {"data": "1,2,3,4,5,6,inf\n", "content_type": "text/csv"},
+])
+def test_batch_route_malformed_is_400(client, kwargs):
+    response = client.post("/api/recommend-crops/batch", **kwargs)
+
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Invalid samples")
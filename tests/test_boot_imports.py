@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("cv2", "sklearn", "joblib", "tensorflow", "ai_edge_litert", "tflite_runtime")
+
+
+def test_importing_the_app_defers_heavy_modules(tmp_path):
+    code = textwrap.dedent(f"""
+        import importlib.util, sys, types
+        for package in ("services", "utilities", "controllers"):
+            module = types.ModuleType(package)
+            module.__path__ = [{ROOT!r}]
+            sys.modules[package] = module
+        spec = importlib.util.spec_from_file_location("app", {os.path.join(ROOT, "app.py")!r})
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+        print(",".join(m for m in {HEAVY!r} if m in sys.modules))
+    """)
+
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True, cwd=tmp_path
+    )
+    assert out.stdout.strip() == ""
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from services.crop_service import FEATURE_ORDER
+
+SOIL = {"N": 79.6, "P": 50.0, "K": 60.0, "temperature": 25.0, "humidity": 80.0, "ph": 6.5, "rainfall": 200.0}
+
+
+def test_fertilizer_alerts_are_never_served_for_a_neighbouring_reading(crop_service):
+    crop_service.cache.clear()
+
+    low = crop_service.fertilizer_alerts("rice", SOIL)
+    assert [a["code"] for a in low][0] == "low" and low[0]["value"] == 79.6
+
+    alerts = crop_service.fertilizer_alerts("rice", dict(SOIL, N=80.4))
+    assert all(a.get("param") != "N" for a in alerts)
+
+
+def test_cached_recommendations_match_uncached(crop_service, soil_samples):
+    rng = np.random.default_rng(3)
+
+    for row in soil_samples[:200]:
+        soil = dict(zip(FEATURE_ORDER, row))
+        crop_service.recommend_crops(soil)
+
+        # A close neighbour must be computed, not served from the cache
+        nearby = {f: v + rng.uniform(-0.04, 0.04) for f, v in soil.items()}
+        cached = crop_service.recommend_crops(nearby)
+        crop_service.cache.clear()
+        assert cached == crop_service.recommend_crops(nearby)
+
+
+def test_repeated_reading_hits_the_cache(crop_service):
+    crop_service.cache.clear()
+    crop_service.recommend_crops(SOIL)
+    hits = crop_service.cache_stats()["hits"]
+
+    crop_service.recommend_crops(dict(SOIL))
+    assert crop_service.cache_stats()["hits"] == hits + 1
+
+
+def test_non_finite_reading_is_rejected(crop_service):
+    with pytest.raises(ValueError, match="ph must be a finite number"):
+        crop_service.fertilizer_alerts("rice", dict(SOIL, ph=float("inf")))
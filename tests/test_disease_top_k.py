@@ -0,0 +1,45 @@
+import base64
+
+import pytest
+from flask import Flask
+
+from controllers import model_controller
+from services.scan_session import ScanSessionStore
+
+
+@pytest.fixture(scope="module")
+def client(disease_service):
+    app = Flask(__name__)
+    app.register_blueprint(model_controller.api_bp, url_prefix="/api")
+    model_controller.init_disease_controller(disease_service, ScanSessionStore())
+    return app.test_client()
+
+
+def test_top_k_from_query(client, leaf_jpeg):
+    response = client.post("/api/detect-disease?top_k=3&crop=TOMATO", data=leaf_jpeg(), content_type="image/jpeg")
+
+    top = response.get_json()["top"]
+    assert 1 <= len(top) <= 3
+    assert [t["confidence"] for t in top] == sorted((t["confidence"] for t in top), reverse=True)
+
+
+def test_top_k_in_session_and_json(client, leaf_jpeg):
+    frame = "data:image/jpeg;base64," + base64.b64encode(leaf_jpeg(1)).decode()
+    response = client.post("/api/detect-disease", json={"frame": frame, "top_k": 2, "session": "k"})
+
+    body = response.get_json()
+    assert 1 <= len(body["top"]) <= 2
+    assert body["session"]["id"] == "k"
+
+
+def test_default_is_best_diagnosis_only(client, leaf_jpeg):
+    response = client.post("/api/detect-disease", data=leaf_jpeg(), content_type="image/jpeg")
+
+    assert response.status_code == 200
+    assert "top" not in response.get_json()
+
+
+def test_bad_top_k_is_400(client, leaf_jpeg):
+    response = client.post("/api/detect-disease?top_k=many", data=leaf_jpeg(), content_type="image/jpeg")
+
+    assert response.status_code == 400
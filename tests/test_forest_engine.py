@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from services.crop_service import FEATURE_ORDER
+from services.feature_scaler import FeatureScaler
+from services.forest_engine import CompiledForest
+
+
+def test_matches_sklearn_on_scaled_features(crop_models, soil_samples):
+    model, scaler = crop_models
+    X = scaler.transform(soil_samples)
+
+    forest = CompiledForest.from_sklearn(model)
+
+    assert forest.parity_error(model, X) < 1e-9
+    np.testing.assert_array_equal(
+        forest.predict_proba(X).argmax(axis=1),
+        model.predict_proba(X).argmax(axis=1)
+    )
+
+
+def test_folded_scaler_takes_raw_features(crop_models, soil_samples):
+    model, scaler = crop_models
+    folded = CompiledForest.from_sklearn(model).fold_scaler(FeatureScaler.from_sklearn(scaler))
+    assert folded is not None
+
+    expected = model.predict_proba(scaler.transform(soil_samples))
+    np.testing.assert_allclose(folded.predict_proba(soil_samples), expected, atol=1e-9)
+
+
+def test_single_row(crop_models, soil_samples):
+    model, scaler = crop_models
+    X = scaler.transform(soil_samples[:1])
+
+    assert CompiledForest.from_sklearn(model).predict_proba(X).shape == (1, len(model.classes_))
+
+
+def test_shared_memory_copy_is_read_only_and_identical(crop_models, soil_samples):
+    model, scaler = crop_models
+    X = scaler.transform(soil_samples)
+    forest = CompiledForest.from_sklearn(model)
+
+    shared = forest.to_shared_memory()
+
+    np.testing.assert_array_equal(shared.predict_proba(X), forest.predict_proba(X))
+    assert not shared.threshold.flags.writeable
+    with pytest.raises(ValueError):
+        shared.value[0] = 0
+
+
+def test_rejects_non_forest():
+    with pytest.raises(ValueError):
+        CompiledForest.from_sklearn(object())
+
+
+def test_crop_service_agrees_with_sklearn(crop_service, crop_models, soil_samples):
+    model, scaler = crop_models
+    assert crop_service.inference_engine == "compiled"
+
+    for row in soil_samples[:50]:
+        soil = dict(zip(FEATURE_ORDER, row))
+        best = crop_service.recommend_crops(soil, top_k=1)[0]["crop"]
+
+        proba = model.predict_proba(scaler.transform(row[None, :]))[0]
+        assert best == crop_service.class_names[int(proba.argmax())]
+
+
+def test_crop_service_rejects_non_finite(crop_service):
+    soil = {"N": 40, "P": 35, "K": 30, "temperature": 25, "humidity": 55, "ph": float("nan"), "rainfall": 100}
+    with pytest.raises(ValueError):
+        crop_service.recommend_crops(soil)
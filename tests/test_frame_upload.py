@@ -0,0 +1,43 @@
+import pytest
+from flask import Flask
+
+from controllers import model_controller
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config["MAX_CONTENT_LENGTH"] = 1024
+    app.register_blueprint(model_controller.api_bp, url_prefix="/api")
+    return app.test_client()
+
+
+def test_oversized_declared_length_is_rejected_before_reading(client):
+    # 102 bytes on the wire, 2 GiB declared
+    response = client.post(
+        "/api/detect-disease",
+        data=b"x" * 102,
+        content_type="application/octet-stream",
+        environ_overrides={"CONTENT_LENGTH": str(2 ** 31)}
+    )
+
+    assert response.status_code == 413
+    assert response.get_json() == {"error": "Request body too large"}
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"data": b"x" * 2048, "content_type": "image/jpeg"},
+    {"json": {"frame": "data:image/jpeg;base64," + "A" * 2048}},
+])
+def test_oversized_bodies_are_413_json(client, kwargs):
+    response = client.post("/api/detect-disease", **kwargs)
+
+    assert response.status_code == 413
+    assert "error" in response.get_json()
+
+
+def test_empty_binary_body_is_400(client):
+    response = client.post("/api/detect-disease", data=b"", content_type="image/jpeg")
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "No frame received"}
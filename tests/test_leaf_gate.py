@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+import pytest
+
+from services.leaf_gate import LeafGate
+
+
+def scene(background, leaf=None, seed=0):
+    """128 px frame: flat background, optional leaf ellipse, grey sensor grain."""
+    rng = np.random.default_rng(seed)
+    img = np.full((128, 128, 3), background, np.uint8)
+    if leaf is not None:
+        cv2.ellipse(img, (64, 64), (50, 32), 30, 0, 360, leaf, -1)
+    noise = rng.integers(-20, 20, img.shape[:2])[..., None]
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("leaf", [
+    (40, 160, 60),   # green
+    (40, 190, 210),  # yellow (chlorosis)
+    (30, 70, 120),   # brown (necrosis)
+])
+def test_leaves_pass(leaf):
+    passed, reason, stats = LeafGate().check(scene((120, 120, 120), leaf))
+
+    assert passed and reason is None
+    assert stats["leaf_ratio"] >= 0.08
+
+
+@pytest.mark.parametrize("frame, reason", [
+    (np.full((128, 128, 3), 8, np.uint8), "too_dark"),
+    (np.full((128, 128, 3), 250, np.uint8), "too_bright"),
+    (cv2.GaussianBlur(scene((120, 120, 120), (40, 160, 60)), (0, 0), 12), "blurry"),
+    (scene((130, 130, 130)), "no_leaf"),
+    (scene((220, 160, 90)), "no_leaf"),  # blue sky (BGR)
+])
+def test_non_leaf_frames_are_gated(frame, reason):
+    passed, got, _ = LeafGate().check(frame)
+
+    assert not passed
+    assert got == reason
+
+
+def test_large_frames_are_checked_downscaled():
+    frame = cv2.resize(scene((120, 120, 120), (40, 160, 60)), (1024, 1024), interpolation=cv2.INTER_NEAREST)
+
+    assert LeafGate().check(frame)[0]
+
+
+def test_gated_frame_skips_inference(disease_service, monkeypatch):
+    def infer(img):
+        raise AssertionError("gated frame reached the model")
+
+    monkeypatch.setattr(disease_service, "leaf_gate", LeafGate())
+    monkeypatch.setattr(disease_service.engine, "infer", infer)
+
+    result = disease_service.detect_disease(scene((130, 130, 130)))
+
+    assert result["status"] == "SCANNING"
+    assert result["gate"] == "no_leaf"
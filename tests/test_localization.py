@@ -0,0 +1,89 @@
+import pytest
+
+from utilities.localization import TEMPLATES, localize_alerts, name_crops, render_alert
+from utilities.parameters import fertilizers, thresholds
+from utilities.utils import check_parameters, evaluate_parameters
+
+# rice: N low, K high, pH acidic
+SOIL = {"N": 40, "P": 50, "K": 95, "ph": 5.0}
+
+
+class DictTranslator:
+    """translate_list() over a fixed vocabulary; records every call."""
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self.calls = []
+
+    def translate_list(self, texts, lang):
+        self.calls.append((list(texts), lang))
+        return [self.vocabulary.get(t, f"[{lang}] {t}") for t in texts]
+
+
+def test_every_language_has_every_template():
+    for lang, templates in TEMPLATES.items():
+        assert set(templates) == set(TEMPLATES["en"]), lang
+
+
+def test_english_matches_check_parameters():
+    alerts = evaluate_parameters("rice", SOIL, thresholds, fertilizers)
+
+    assert [a["code"] for a in alerts] == ["low", "high", "low", "ph_acidic"]
+    assert localize_alerts(alerts, "en") == check_parameters("rice", SOIL, thresholds, fertilizers)
+    assert render_alert(alerts[0]) == "N is LOW (40) → Recommended ≥ 80 → Suggest: Urea"
+    assert render_alert(alerts[1]) == "K is HIGH (95) → Recommended ≤ 80"
+
+
+@pytest.mark.parametrize("lang, expected", [
+    ("hi", "नाइट्रोजन (N) कम है (40) → अनुशंसित ≥ 80 → सुझाव: यूरिया"),
+    ("bn", "নাইট্রোজেন (N) কম (40) → প্রস্তাবিত ≥ 80 → পরামর্শ: ইউরিয়া"),
+])
+def test_template_languages_translate_terms_only(lang, expected):
+    translator = DictTranslator({"Urea": {"hi": "यूरिया", "bn": "ইউরিয়া"}[lang]})
+    alerts = evaluate_parameters("rice", SOIL, thresholds, fertilizers)
+
+    rendered = localize_alerts(alerts, lang, translator)
+
+    assert rendered[0] == expected
+    assert len(rendered) == len(alerts)
+    # ONE lookup, of fertilizer names only
+    assert len(translator.calls) == 1
+    assert set(translator.calls[0][0]) == {"Urea", "Consult agronomist", "Lime (Calcium Carbonate)"}
+
+
+@pytest.mark.parametrize("code, lang, expected", [
+    ("ph_ideal", "hi", "pH अधिकांश फसलों के लिए आदर्श है।"),
+    ("all_healthy", "bn", "সমস্ত মান স্বাস্থ্যকর।"),
+    ("all_healthy", "en", "All parameters are healthy."),
+])
+def test_fixed_messages(code, lang, expected):
+    assert render_alert({"code": code}, lang) == expected
+
+
+def test_unsupported_crop_name_is_translated():
+    translator = DictTranslator({"mango": "आम"})
+    alerts = evaluate_parameters("mango", SOIL, thresholds, fertilizers)
+
+    assert localize_alerts(alerts, "hi", translator) == ["फसल 'आम' समर्थित नहीं है।"]
+
+
+def test_other_languages_translate_english_text():
+    translator = DictTranslator({})
+    alerts = [{"code": "all_healthy"}]
+
+    assert localize_alerts(alerts, "ta", translator) == ["[ta] All parameters are healthy."]
+    assert localize_alerts(alerts, "ta") == ["All parameters are healthy."]
+
+
+def test_name_crops_keeps_english_id():
+    translator = DictTranslator({"rice": "चावल", "maize": "मक्का"})
+    recommendations = [{"crop": "rice"}, {"crop": "maize"}, {"crop": "rice"}]
+
+    name_crops(recommendations, "hi", translator)
+
+    assert [r["name"] for r in recommendations] == ["चावल", "मक्का", "चावल"]
+    assert [r["crop"] for r in recommendations] == ["rice", "maize", "rice"]
+    assert translator.calls == [(["rice", "maize"], "hi")]
+
+    assert name_crops([{"crop": "rice"}], "en", translator) == [{"crop": "rice", "name": "rice"}]
+    assert len(translator.calls) == 1
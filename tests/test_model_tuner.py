@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import root_path
+from services.model_registry import import_tflite
+from services.model_tuner import ModelTuner
+
+
+@pytest.fixture
+def tuner(tmp_path):
+    model = tmp_path / "plant_disease_model.tflite"
+    shutil.copy(root_path("plant_disease_model.tflite"), model)
+
+    def make():
+        return ModelTuner(
+            str(model),
+            import_tflite(),
+            cache_path=str(tmp_path / "tuning.json"),
+            thread_options=[1],
+            runs=2,
+            warmup=1
+        )
+
+    return make
+
+
+def test_tunes_threads_and_xnnpack(tuner):
+    result = tuner().tune()
+
+    assert result["num_threads"] == 1
+    assert result["num_interpreters"] == os.cpu_count()
+    assert {c["xnnpack"] for c in result["candidates"]} == {True, False}
+    assert result["latency_ms"] == min(c["latency_ms"] for c in result["candidates"] if "latency_ms" in c)
+
+
+def test_cached_until_the_model_changes(tuner, monkeypatch):
+    first = tuner().tune()
+
+    def benchmark(self, num_threads, xnnpack):
+        raise AssertionError("cached tuning was recalibrated")
+
+    with monkeypatch.context() as m:
+        m.setattr(ModelTuner, "_benchmark", benchmark)
+        assert tuner().tune() == first
+
+    # A rebuilt model (new size / mtime) is calibrated again
+    with open(first["model_path"], "ab") as f:
+        f.write(b"\0" * 16)
+    os.utime(first["model_path"], (0, 0))
+    with pytest.raises(AssertionError):
+        with monkeypatch.context() as m:
+            m.setattr(ModelTuner, "_benchmark", benchmark)
+            tuner().tune()
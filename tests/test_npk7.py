@@ -0,0 +1,86 @@
+import pytest
+
+from utilities import npk7
+
+
+def _response(slave, registers):
+    body = bytes([slave, 0x03, 14]) + npk7._REGS.pack(*registers)
+    return body + npk7._CRC.pack(npk7.crc16_modbus(body))
+
+
+@pytest.fixture
+def fake_sensor():
+    fake = npk7.FakeSensor()
+    yield fake
+    fake.close()
+
+
+def test_crc16_modbus_reference_frame():
+    # Read 1 holding register of slave 1: 01 03 00 00 00 01 | 84 0A
+    assert npk7.crc16_modbus(bytes.fromhex("010300000001")) == 0x0A84
+
+
+def test_build_request_appends_crc_low_byte_first():
+    assert npk7.build_request(0x01, 0x0000, 0x0001) == bytes.fromhex("010300000001840A")
+    assert len(npk7.build_request(0x01, npk7.START_REG, npk7.REG_COUNT)) == 8
+
+
+def test_parse_payload_scales_registers():
+    reading = npk7.parse_payload(_response(0x01, npk7.FakeSensor.DEFAULT_REGISTERS))
+
+    assert reading == {
+        "moisture_pct": pytest.approx(55.0),
+        "temperature_c": pytest.approx(25.1),
+        "ec_uScm": 120.0,
+        "ph": pytest.approx(6.5),
+        "nitrogen_mgkg": 40,
+        "phosphorus_mgkg": 35,
+        "potassium_mgkg": 30,
+    }
+
+
+@pytest.mark.parametrize("mangle, message", [
+    (lambda r: r[:-1], "Bad length"),
+    (lambda r: r[:2] + b"\x0c" + r[3:], "Bad byteCount"),
+    (lambda r: r[:5] + bytes([r[5] ^ 0xFF]) + r[6:], "CRC mismatch"),
+])
+def test_parse_payload_rejects_bad_frames(mangle, message):
+    with pytest.raises(ValueError, match=message):
+        npk7.parse_payload(mangle(_response(0x01, npk7.FakeSensor.DEFAULT_REGISTERS)))
+
+
+def test_parse_payload_rejects_other_slave():
+    with pytest.raises(ValueError, match="Bad addr/func"):
+        npk7.parse_payload(_response(0x02, npk7.FakeSensor.DEFAULT_REGISTERS), slave=0x01)
+
+
+def test_read_once_against_fake_sensor(fake_sensor):
+    with npk7.open_serial(fake_sensor.port) as ser:
+        reading = npk7.read_once(ser)
+
+    assert fake_sensor.requests == 1
+    assert reading["nitrogen_mgkg"] == 40
+    assert reading["ph"] == pytest.approx(6.5)
+
+
+def test_read_once_times_out_on_silent_slave(fake_sensor):
+    with npk7.open_serial(fake_sensor.port) as ser:
+        with pytest.raises(TimeoutError):
+            npk7.read_once(ser, retries=2, slave=0x07)
+
+    assert fake_sensor.requests == 2
+
+
+def test_read_probes_reports_each_probe(fake_sensor):
+    fake_sensor.registers[0x02] = (600, 240, 100, 70, 50, 45, 40)
+
+    with npk7.open_serial(fake_sensor.port) as ser:
+        results = npk7.read_probes({fake_sensor.port: ser}, {fake_sensor.port: [0x01, 0x02, 0x03]}, retries=1)
+
+    by_slave = {r["slave"]: r for r in results}
+    assert by_slave[0x01]["reading"]["nitrogen_mgkg"] == 40
+    assert by_slave[0x02]["reading"]["nitrogen_mgkg"] == 50
+    assert "error" in by_slave[0x03]
+
+    field = npk7.aggregate([by_slave[0x01]["reading"], by_slave[0x02]["reading"]])
+    assert field["nitrogen_mgkg"] == 45
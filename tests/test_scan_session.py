@@ -0,0 +1,147 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from services.scan_session import ScanSessionStore, SharedScanSessionStore, frame_hash, hamming
+
+
+def _decode(service, jpeg):
+    return service.decode_frame(np.frombuffer(jpeg, np.uint8))
+
+
+def _scores(service, frame):
+    return service.engine.infer(service.preprocessor.prepare(frame))
+
+
+def test_near_duplicate_frames_have_close_hashes(disease_service, leaf_jpeg):
+    a = _decode(disease_service, leaf_jpeg(0))
+    assert hamming(frame_hash(a), frame_hash(a.copy())) == 0
+    assert hamming(frame_hash(a), frame_hash(np.ascontiguousarray(a[:, ::-1]))) > 4
+
+
+def test_duplicates_skip_inference_and_add_no_evidence(disease_service, leaf_jpeg):
+    store = ScanSessionStore(stable_confidence=0.0, stable_frames=2)
+    frame = _decode(disease_service, leaf_jpeg(0))
+
+    results = [
+        disease_service.detect_disease_streaming(frame, store.get("dup"))
+        for _ in range(4)
+    ]
+
+    assert [r["session"]["skipped"] for r in results] == [False, True, True, True]
+    assert results[-1]["session"]["inferences"] == 1
+    assert results[-1]["session"]["frames"] == 4
+    assert not results[-1]["session"]["stable"]
+    assert store.get("dup").stable_count == 1
+
+
+def test_scores_are_an_exponential_moving_average(disease_service, leaf_jpeg):
+    store = ScanSessionStore(alpha=0.25, duplicate_distance=-1)
+    frames = [_decode(disease_service, leaf_jpeg(seed)) for seed in (0, 1)]
+
+    for frame in frames:
+        disease_service.detect_disease_streaming(frame, store.get("ema"))
+
+    first, second = (_scores(disease_service, f) for f in frames)
+    np.testing.assert_allclose(store.get("ema").scores, 0.25 * second + 0.75 * first, rtol=1e-5)
+
+
+def test_stable_after_consecutive_confident_inferences(disease_service, leaf_jpeg):
+    store = ScanSessionStore(stable_confidence=0.0, stable_frames=3, duplicate_distance=-1)
+
+    stable = [
+        disease_service.detect_disease_streaming(
+            _decode(disease_service, leaf_jpeg(seed)), store.get("s")
+        )["session"]["stable"]
+        for seed in range(4)
+    ]
+
+    assert stable == [False, False, True, True]
+
+
+def test_crop_change_resets_the_scan(disease_service, leaf_jpeg):
+    store = ScanSessionStore(stable_confidence=0.0, stable_frames=1)
+    frame = _decode(disease_service, leaf_jpeg(0))
+
+    assert disease_service.detect_disease_streaming(frame, store.get("c"), crop="TOMATO")["session"]["stable"]
+    result = disease_service.detect_disease_streaming(frame, store.get("c"), crop="POTATO")
+
+    # Same frame, new crop: inferred again (no duplicate skip)
+    assert not result["session"]["skipped"]
+    assert result["session"]["inferences"] == 2
+
+
+def test_store_expires_and_bounds_sessions(monkeypatch):
+    store = ScanSessionStore(ttl_s=10, max_sessions=2)
+    now = [1000.0]
+    monkeypatch.setattr("services.scan_session.time.monotonic", lambda: now[0])
+
+    a = store.get("a")
+    store.get("b")
+    store.get("c")
+    assert store.get("a") is not a  # evicted by max_sessions
+
+    b = store.get("b")
+    now[0] += 11
+    assert store.get("b") is not b  # expired
+    assert store.end("b") and not store.end("b")
+
+
+def _bump(db_path, session_id, times):
+    """A worker process: its own store, several request threads."""
+    import threading
+
+    from services.scan_session import SharedScanSessionStore
+
+    store = SharedScanSessionStore(db_path)
+
+    def frames():
+        for _ in range(times):
+            session = store.get(session_id)
+            with session.lock:
+                count = session.frames
+                time.sleep(0.0005)  # widen the read-modify-write window
+                session.frames = count + 1
+
+    threads = [threading.Thread(target=frames) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_shared_session_lock_serializes_processes(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    SharedScanSessionStore(db_path)
+
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_bump, args=(db_path, "scan", 20)) for _ in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+
+    assert [p.exitcode for p in workers] == [0, 0, 0, 0]
+
+    session = SharedScanSessionStore(db_path).get("scan")
+    with session.lock:
+        assert session.frames == 4 * 3 * 20
+
+
+def test_shared_session_state_survives_across_stores(tmp_path):
+    db_path = str(tmp_path / "sessions.db")
+    first, second = SharedScanSessionStore(db_path), SharedScanSessionStore(db_path)
+
+    session = first.get("s")
+    with session.lock:
+        session.scores = np.array([0.25, 0.75], dtype=np.float32)
+        session.crop = "POTATO"
+
+    other = second.get("s")
+    with other.lock:
+        np.testing.assert_allclose(other.scores, [0.25, 0.75])
+        assert other.crop == "POTATO"
+
+    assert second.end("s")
+    assert not first.end("s")
@@ -0,0 +1,138 @@
+import os
+import signal
+import time
+
+import pytest
+from flask import Flask
+
+from controllers import model_controller
+from services.sensor_daemon import (
+    DAEMON_METRICS,
+    RemoteSensorService,
+    RemoteSoilHistory,
+    SensorDaemon,
+    SensorDaemonClient,
+    SensorDaemonUnavailable,
+    proxy_metrics
+)
+from services.sensor_service import READ_SECONDS, SIMULATED_SOIL
+from utilities import metrics
+
+SOIL = {"N": 90.0, "P": 42.0, "K": 43.0, "temperature": 21.0, "humidity": 82.0, "ph": 6.5, "rainfall": 100.0}
+
+
+class StubSensor:
+    def read_soil_with_meta(self, fresh=False):
+        READ_SECONDS.observe(0.02)
+        return dict(SOIL), {"source": "poller", "timestamp": time.time(), "age_s": 0.0, "stale": False}
+
+    def stop(self):
+        pass
+
+
+class StubHistory:
+    def query(self, start, end, resolution="auto"):
+        if resolution not in ("auto", "minute"):
+            raise ValueError(f"Unknown resolution: {resolution}")
+        return {"resolution": "minute", "points": []}
+
+    def close(self):
+        pass
+
+
+def daemon_pid(supervisor):
+    """The daemon is the supervisor's only child."""
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == supervisor:
+                        return int(entry)
+            except OSError:
+                continue
+    return None
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+@pytest.fixture
+def daemon():
+    daemon = SensorDaemon(lambda: (StubSensor(), StubHistory())).start()
+    yield daemon
+    daemon.stop()
+
+
+def test_reads_and_history_through_the_socket(daemon):
+    client = daemon.client()
+
+    soil, meta = RemoteSensorService(client).read_soil_with_meta()
+    assert soil == SOIL and meta["source"] == "poller"
+
+    history = RemoteSoilHistory(client)
+    assert history.query(0, 60)["resolution"] == "minute"
+    with pytest.raises(ValueError):
+        history.query(0, 60, "fortnight")
+
+
+def test_unreachable_daemon(tmp_path):
+    client = SensorDaemonClient(str(tmp_path / "gone.sock"), b"key")
+
+    soil, meta = RemoteSensorService(client).read_soil_with_meta()
+    assert soil == SIMULATED_SOIL and meta["source"] == "simulated"
+
+    with pytest.raises(SensorDaemonUnavailable):
+        RemoteSensorService(client, simulate_on_fail=False).read_soil()
+
+    app = Flask(__name__)
+    app.register_blueprint(model_controller.api_bp, url_prefix="/api")
+    model_controller.init_history_controller(RemoteSoilHistory(client))
+    response = app.test_client().get("/api/soil/history")
+    assert response.status_code == 503
+    assert response.get_json() == {"error": "Soil history unavailable"}
+
+
+def test_killed_daemon_is_simulated_then_restarted(daemon):
+    sensor = RemoteSensorService(daemon.client())
+    sensor.read_soil()
+
+    first = wait_for(lambda: daemon_pid(daemon.pid))
+    os.kill(first, signal.SIGKILL)
+    wait_for(lambda: daemon_pid(daemon.pid) != first)
+
+    # Until the new daemon listens, requests still get a reading
+    _, meta = sensor.read_soil_with_meta()
+    assert meta["source"] in ("simulated", "poller")
+
+    wait_for(lambda: sensor.read_soil_with_meta()[1]["source"] == "poller")
+
+
+def test_stop_takes_the_daemon_down(daemon):
+    supervisor = daemon.pid
+    child = wait_for(lambda: daemon_pid(supervisor))
+
+    daemon.stop()
+
+    for pid in (supervisor, child):
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
+
+
+def test_worker_metrics_show_the_daemon_counters(daemon, monkeypatch):
+    monkeypatch.setattr(metrics, "_metrics", dict(metrics._metrics))
+    client = daemon.client()
+    RemoteSensorService(client).read_soil()
+
+    proxy_metrics(client, ttl_s=0)
+
+    # Nothing was read in this process, yet the daemon's reads show
+    assert not READ_SECONDS.samples()
+    assert "krishidhan_sensor_read_seconds_count 1" in metrics.render()
+    assert DAEMON_METRICS[0] in metrics.collect(DAEMON_METRICS)
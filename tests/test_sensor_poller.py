@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from services.sensor_service import SensorService
+from utilities import npk7
+
+NEW_REGISTERS = (600, 240, 100, 70, 90, 45, 40)
+
+
+@pytest.fixture
+def fake_sensor():
+    fake = npk7.FakeSensor(delay_s=0.3)
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def sensor(fake_sensor):
+    service = SensorService(
+        simulate_on_fail=False,
+        background_poll=True,
+        poll_interval_ms=60000,  # only fresh() triggers polls
+        max_age_s=0.5,
+        probes={fake_sensor.port: [npk7.SLAVE_ADDR]}
+    )
+    yield service
+    service.stop()
+
+
+def test_first_read_waits_for_the_poller(sensor):
+    soil, meta = sensor.read_soil_with_meta()
+
+    assert meta["source"] == "poller"
+    assert soil["N"] == 40.0
+
+
+def test_fresh_waits_for_a_poll_started_after_the_call(sensor, fake_sensor):
+    sensor.read_soil()
+
+    # Poll A is in flight (answer delayed) with the OLD registers...
+    in_flight = threading.Thread(target=sensor.read_soil, kwargs={"fresh": True})
+    in_flight.start()
+    time.sleep(0.1)
+
+    # ...so a fresh read issued now must not be served by it
+    fake_sensor.registers[npk7.SLAVE_ADDR] = NEW_REGISTERS
+    t0 = time.time()
+    soil, meta = sensor.read_soil_with_meta(fresh=True)
+    in_flight.join()
+
+    assert soil["N"] == 90.0
+    assert meta["timestamp"] >= t0
+
+
+def test_stale_reading_is_served_as_stale(sensor, fake_sensor):
+    sensor.read_soil()
+
+    fake_sensor.registers.clear()  # probe stops answering
+    time.sleep(0.6)
+    soil, meta = sensor.read_soil_with_meta(fresh=True)
+
+    assert soil["N"] == 40.0
+    assert meta["stale"] is True
+    assert meta["age_s"] > 0.5
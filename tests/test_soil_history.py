@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from services.soil_history import HISTORY_FIELDS, SoilHistory
+
+
+def _soil(n, ph=6.5):
+    return {"N": n, "P": 30.0, "K": 40.0, "temperature": 25.0, "humidity": 50.0, "ph": ph}
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = SoilHistory(str(tmp_path / "history.db"), batch_size=1000, flush_interval_s=3600)
+    yield store
+    store.close()
+
+
+def _count(store, table):
+    return store._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_minute_and_hour_rollups(history):
+    hour = int(time.time()) // 3600 * 3600 - 3600
+    history.record(_soil(10, ph=6.0), timestamp=hour + 5)
+    history.record(_soil(20, ph=7.0), timestamp=hour + 50)
+    history.flush()
+    # A later flush merges into the same buckets
+    history.record(_soil(60), timestamp=hour + 65)
+
+    minutes = history.query(hour, hour + 3599, resolution="minute")["points"]
+    assert [(p["t"], p["count"]) for p in minutes] == [(hour, 2), (hour + 60, 1)]
+    assert minutes[0]["avg"]["N"] == 15.0
+    assert (minutes[0]["min"]["ph"], minutes[0]["max"]["ph"]) == (6.0, 7.0)
+
+    (point,) = history.query(hour, hour + 3599, resolution="hour")["points"]
+    assert point["count"] == 3
+    assert point["avg"]["N"] == 30.0
+    assert set(point["avg"]) == set(HISTORY_FIELDS)
+
+
+def test_auto_resolution_follows_the_span(history):
+    now = time.time()
+    assert history.query(now - 3600, now)["resolution"] == "minute"
+    assert history.query(now - 7 * 86400, now)["resolution"] == "hour"
+    assert history.query(now - 90 * 86400, now)["resolution"] == "day"
+
+    with pytest.raises(ValueError):
+        history.query(now - 60, now, resolution="week")
+
+
+def test_retention_drops_raw_and_minute_data_only(history):
+    old = int(time.time()) - 40 * 86400
+    history.record(_soil(10), timestamp=old)
+    history.record(_soil(20), timestamp=int(time.time()))
+    history.flush()
+
+    assert _count(history, "readings") == 1
+    assert _count(history, "rollup_minute") == 1
+    assert _count(history, "rollup_hour") == 2
+    assert _count(history, "rollup_day") == 2
+
+
+def test_buffered_until_batch_size(tmp_path):
+    store = SoilHistory(str(tmp_path / "h.db"), batch_size=3, flush_interval_s=3600)
+    now = int(time.time())
+
+    store.record(_soil(1), timestamp=now - 2)
+    store.record(_soil(2), timestamp=now - 1)
+    assert _count(store, "readings") == 0
+
+    store.record(_soil(3), timestamp=now)
+    assert _count(store, "readings") == 3
+    store.close()
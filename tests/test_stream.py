@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from flask import Flask
+
+from controllers import stream_controller
+from services.scan_session import ScanSessionStore
+
+
+class Closed(Exception):
+    pass
+
+
+class FakeSocket:
+    """Replays client messages one by one, records what is sent."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.closed = None
+
+    def receive(self, timeout=None):
+        if timeout == 0:
+            return None  # nothing queued behind the current message
+        if not self.messages:
+            raise Closed()
+        return self.messages.pop(0)
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def close(self, reason=None, message=None):
+        self.closed = reason
+
+
+@pytest.fixture
+def stream(disease_service):
+    sessions = ScanSessionStore()
+    stream_controller.init_stream_controller(disease_service, sessions)
+    app = Flask(__name__)
+
+    def run(messages, query="session=s1"):
+        ws = FakeSocket(messages)
+        with app.test_request_context(f"/api/detect-disease/stream?{query}"):
+            with pytest.raises(Closed):
+                stream_controller.detect_disease_stream(ws)
+        return ws.sent
+
+    return run
+
+
+def test_non_string_crop_control_is_ignored(stream, leaf_jpeg):
+    sent = stream(['{"crop": 5}', '["POTATO"]', "not json", leaf_jpeg()])
+
+    assert len(sent) == 1
+    assert "error" not in sent[0]
+    assert sent[0]["session"]["frames"] == 1
+
+
+def test_crop_control_switches_context(stream, leaf_jpeg, disease_service, monkeypatch):
+    calls = []
+    original = disease_service.detect_disease_streaming
+
+    def spy(frame, session, crop="TOMATO", top_k=1):
+        calls.append(crop)
+        return original(frame, session, crop=crop, top_k=top_k)
+
+    monkeypatch.setattr(disease_service, "detect_disease_streaming", spy)
+    stream([leaf_jpeg(0), '{"crop": "potato"}', leaf_jpeg(1)])
+
+    assert calls == ["TOMATO", "potato"]
+
+
+def test_bad_frames_answer_with_errors_and_keep_the_stream(stream, leaf_jpeg, disease_service, monkeypatch):
+    def boom(**kwargs):
+        raise RuntimeError("boom")
+
+    sent = stream([b"not a jpeg", leaf_jpeg()])
+    assert sent[0]["error"] == "Invalid image"
+    assert "status" in sent[1]
+
+    monkeypatch.setattr(disease_service, "detect_disease_streaming", boom)
+    sent = stream([leaf_jpeg(), leaf_jpeg(1)])
+
+    assert [s["error"] for s in sent] == ["Processing failed", "Processing failed"]
+
+
+def test_session_ends_with_the_stream(stream, leaf_jpeg):
+    sessions = stream_controller.scan_sessions
+    stream([leaf_jpeg()], query="session=gone")
+
+    assert not sessions.end("gone")
+
+
+def test_streams_beyond_the_limit_are_sent_to_http(disease_service, leaf_jpeg):
+    stream_controller.init_stream_controller(disease_service, ScanSessionStore(), max_streams=1)
+    app = Flask(__name__)
+    held = stream_controller.stream_slots
+    held.acquire()  # one stream already open
+
+    try:
+        ws = FakeSocket([leaf_jpeg()])
+        with app.test_request_context("/api/detect-disease/stream"):
+            stream_controller.detect_disease_stream(ws)
+    finally:
+        held.release()
+
+    assert ws.closed == stream_controller.TRY_AGAIN_LATER
+    assert ws.sent == []
+
+    # The slot is free again once a stream ends
+    ws = FakeSocket([leaf_jpeg()])
+    with app.test_request_context("/api/detect-disease/stream"):
+        with pytest.raises(Closed):
+            stream_controller.detect_disease_stream(ws)
+    assert len(ws.sent) == 1
+    assert held.acquire(blocking=False)
@@ -0,0 +1,84 @@
+import json
+
+from services.translation_service import TranslationService
+
+
+class RecordingTranslator:
+    """Stands in for GoogleTranslator; upper-cases, records requests."""
+
+    def __init__(self, fail=False, keep_separator=True):
+        self.requests = []
+        self.fail = fail
+        self.keep_separator = keep_separator
+
+    def translate(self, text):
+        self.requests.append(text)
+        if self.fail:
+            raise ConnectionError("offline")
+        out = text.upper()
+        return out if self.keep_separator else out.replace("\n", " ")
+
+
+def _service(tmp_path, translator=None, **kwargs):
+    service = TranslationService(db_path=str(tmp_path / "t.db"), **kwargs)
+    if translator is not None:
+        service._translators["hi"] = translator
+    return service
+
+
+def test_misses_go_out_as_one_batched_request(tmp_path):
+    translator = RecordingTranslator()
+    service = _service(tmp_path, translator)
+
+    assert service.translate_list(["rice", "maize", "rice"], "hi") == ["RICE", "MAIZE", "RICE"]
+    assert translator.requests == ["rice\nmaize"]
+
+    # Memory hit: no new request
+    assert service.translate_text("maize", "hi") == "MAIZE"
+    assert len(translator.requests) == 1
+
+
+def test_persistent_store_survives_a_restart(tmp_path):
+    _service(tmp_path, RecordingTranslator()).translate_list(["cotton"], "hi")
+
+    offline = RecordingTranslator(fail=True)
+    restarted = _service(tmp_path, offline)
+
+    assert restarted.translate_list(["cotton"], "hi") == ["COTTON"]
+    assert offline.requests == []
+
+
+def test_failures_are_not_cached(tmp_path):
+    translator = RecordingTranslator(fail=True)
+    service = _service(tmp_path, translator)
+
+    assert service.translate_list(["jute"], "hi") == ["jute"]
+    translator.fail = False
+    assert service.translate_list(["jute"], "hi") == ["JUTE"]
+
+
+def test_lost_separator_falls_back_to_one_request_per_text(tmp_path):
+    translator = RecordingTranslator(keep_separator=False)
+    service = _service(tmp_path, translator)
+
+    assert service.translate_list(["a b", "c"], "hi") == ["A B", "C"]
+    assert translator.requests == ["a b\nc", "a b", "c"]
+
+
+def test_dictionary_warms_memory_and_store(tmp_path):
+    dictionary = tmp_path / "dict.json"
+    dictionary.write_text(json.dumps({"hi": {"rice": "चावल"}}), encoding="utf-8")
+    offline = RecordingTranslator(fail=True)
+    service = _service(tmp_path, offline, dictionary_path=str(dictionary))
+
+    assert service.translate_text("rice", "hi") == "चावल"
+    assert offline.requests == []
+    assert service._load(["rice"], "hi") == {"rice": "चावल"}
+
+
+def test_default_language_is_untouched(tmp_path):
+    translator = RecordingTranslator()
+    service = _service(tmp_path, translator)
+
+    assert service.translate_list(["rice"], "en") == ["rice"]
+    assert translator.requests == []
@@ -1,25 +1,217 @@
-from deep_translator import GoogleTranslator
+import json
+import os
+import sqlite3
+import threading
+
+from utilities.cache import LRUCache
+from utilities import metrics
+
+
+# Joins texts into ONE request; Google keeps line breaks intact
+BATCH_SEPARATOR = "\n"
+
+# Google rejects requests above 5000 characters
+MAX_BATCH_CHARS = 4500
+
+# memory / store / network lookup time
+STAGE_SECONDS = metrics.histogram(
+    "krishidhan_translation_stage_seconds",
+    "Translation time per lookup tier",
+    ("stage",)
+)
+LOOKUPS = metrics.counter(
+    "krishidhan_translation_lookups_total",
+    "Texts resolved per tier (failed: left untranslated)",
+    ("tier",)
+)
 
 
 class TranslationService:
-    def __init__(self, default_lang="en"):
+    """
+    Cached translation: in-memory LRU -> local SQLite store -> Google.
+
+    Cache misses of one call are sent as ONE batched request per
+    language. A bundled en -> hi / bn dictionary warms the store, so
+    crop names and common messages work offline.
+    """
+
+    def __init__(
+        self,
+        default_lang="en",
+        db_path=None,
+        dictionary_path=None,
+        cache_size=2048
+    ):
         self.default_lang = default_lang
+        self.cache = LRUCache(maxsize=cache_size)
+        metrics.register_cache("translation", self.cache)
+
+        self._translators = {}
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "lang TEXT, text TEXT, translated TEXT, "
+                "PRIMARY KEY (lang, text)) WITHOUT ROWID"
+            )
 
+        if dictionary_path:
+            self.warm(dictionary_path)
+
+    # --------------------------------------------------
+    # PUBLIC METHODS (used by controllers)
+    # --------------------------------------------------
     def translate_text(self, text, target_lang):
         if not text or target_lang == self.default_lang:
             return text
 
-        try:
-            return GoogleTranslator(
-                source="auto",
-                target=target_lang
-            ).translate(text)
-        except Exception as e:
-            print("Translation error:", e)
-            return text
+        return self.translate_list([text], target_lang)[0]
 
     def translate_list(self, texts, target_lang):
-        return [
-            self.translate_text(t, target_lang)
-            for t in texts
-        ]
+        if target_lang == self.default_lang:
+            return list(texts)
+
+        found = {}
+        missing = []
+        with STAGE_SECONDS.time("memory"):
+            for t in dict.fromkeys(texts):
+                if not t:
+                    continue
+                hit = self.cache.get((t, target_lang))
+                if hit is None:
+                    missing.append(t)
+                else:
+                    found[t] = hit
+        LOOKUPS.inc("memory", amount=len(found))
+
+        if missing:
+            with STAGE_SECONDS.time("store"):
+                stored = self._load(missing, target_lang)
+            LOOKUPS.inc("store", amount=len(stored))
+            found.update(stored)
+            missing = [t for t in missing if t not in stored]
+
+        if missing:
+            with STAGE_SECONDS.time("network"):
+                fetched = self.translate_batch(missing, target_lang)
+            LOOKUPS.inc("network", amount=len(fetched))
+            LOOKUPS.inc("failed", amount=len(missing) - len(fetched))
+            found.update(fetched)
+
+        return [found.get(t, t) for t in texts]
+
+    def translate_batch(self, texts, target_lang):
+        """
+        Translates uncached texts with as few requests as possible.
+        Returns {text: translation} for the texts that succeeded;
+        failures (e.g. offline) are left out and not cached.
+        """
+        results = {}
+
+        for chunk in self._chunks(texts):
+            try:
+                translator = self._translator(target_lang)
+                if len(chunk) == 1:
+                    translated = [translator.translate(chunk[0])]
+                else:
+                    joined = translator.translate(BATCH_SEPARATOR.join(chunk))
+                    translated = (joined or "").split(BATCH_SEPARATOR)
+                    if len(translated) != len(chunk):
+                        # Separator was not preserved: one request per text
+                        translated = [translator.translate(t) for t in chunk]
+            except Exception as e:
+                print("Translation error:", e)
+                continue
+
+            for text, out in zip(chunk, translated):
+                if out:
+                    results[text] = out.strip()
+
+        self._remember(results, target_lang)
+        return results
+
+    def warm(self, dictionary_path):
+        """
+        Loads a bundled dictionary: { "hi": { "rice": "..." }, ... }
+        Existing store entries are kept.
+        """
+        try:
+            with open(dictionary_path, encoding="utf-8") as f:
+                dictionary = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[TranslationService] Dictionary not loaded: {e}")
+            return
+
+        for lang, entries in dictionary.items():
+            for text, translated in entries.items():
+                self.cache.put((text, lang), translated)
+            self._store(entries, lang, replace=False)
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+    def _translator(self, target_lang):
+        # One translator per language, reused across calls
+        with self._lock:
+            translator = self._translators.get(target_lang)
+            if translator is None:
+                # Imported on first network use (offline boots skip it)
+                from deep_translator import GoogleTranslator
+
+                translator = GoogleTranslator(source="auto", target=target_lang)
+                self._translators[target_lang] = translator
+            return translator
+
+    def _chunks(self, texts):
+        chunk, size = [], 0
+        for t in texts:
+            if chunk and size + len(t) + 1 > MAX_BATCH_CHARS:
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(t)
+            size += len(t) + 1
+        if chunk:
+            yield chunk
+
+    def _load(self, texts, target_lang):
+        if self._db is None:
+            return {}
+
+        marks = ", ".join("?" * len(texts))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT text, translated FROM translations "
+                f"WHERE lang = ? AND text IN ({marks})",
+                (target_lang, *texts)
+            ).fetchall()
+
+        stored = dict(rows)
+        for text, translated in stored.items():
+            self.cache.put((text, target_lang), translated)
+        return stored
+
+    def _remember(self, results, target_lang):
+        for text, translated in results.items():
+            self.cache.put((text, target_lang), translated)
+        self._store(results, target_lang)
+
+    def _store(self, entries, target_lang, replace=True):
+        if self._db is None or not entries:
+            return
+
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock, self._db:
+            self._db.executemany(
+                f"{verb} INTO translations (lang, text, translated) VALUES (?, ?, ?)",
+                [(target_lang, t, out) for t, out in entries.items()]
+            )
@@ -1,7 +1,9 @@
-import pandas as pd
+from utilities.localization import render_alert
 
 def load_data(path):
     """Load dataset from CSV"""
+    import pandas as pd  # heavy: only needed for offline dataset tools
+
     return pd.read_csv(path)
 
 def get_available_crops(df):
@@ -12,12 +14,14 @@ def get_sample_for_crop(df, crop_name):
     """Return random sample row for selected crop"""
     return df[df['label'].str.lower() == crop_name].sample(1).iloc[0]
 
-def check_parameters(crop_name, parameters, thresholds, fertilizers):
+def evaluate_parameters(crop_name, parameters, thresholds, fertilizers):
     """
     Check nutrient and climate parameters, suggest fertilizers.
+    Returns structured alert records:
+    { code, param, value, bound, fertilizer } (fields depend on code)
     """
     if crop_name not in thresholds:
-        return [f"Crop '{crop_name}' is not supported."]
+        return [{'code': 'unsupported_crop', 'crop': crop_name}]
     
     limits = thresholds[crop_name]
     ferts = fertilizers.get(crop_name, {})
@@ -29,23 +33,41 @@ def check_parameters(crop_name, parameters, thresholds, fertilizers):
             continue
         
         if value < lower:
-            msg = f"{param.upper()} is LOW ({value}) → Recommended ≥ {lower}"
-            msg += f" → Suggest: {ferts.get(param, 'Consult agronomist')}"
-            alerts.append(msg)
+            alerts.append({
+                'code': 'low', 'param': param, 'value': value, 'bound': lower,
+                'fertilizer': ferts.get(param, 'Consult agronomist')
+            })
         elif value > upper:
-            msg = f"{param.upper()} is HIGH ({value}) → Recommended ≤ {upper}"
-            alerts.append(msg)
+            alerts.append({
+                'code': 'high', 'param': param, 'value': value, 'bound': upper
+            })
         
         # Special handling for pH
         if param.lower() == 'ph':
             if value < 5.5:
-                alerts.append(f"pH is too acidic ({value}) → Suggest: {ferts.get('pH_low', 'Apply Lime')}")
+                alerts.append({
+                    'code': 'ph_acidic', 'value': value,
+                    'fertilizer': ferts.get('pH_low', 'Apply Lime')
+                })
             elif value > 8.0:
-                alerts.append(f"pH is too alkaline ({value}) → Suggest: {ferts.get('pH_high', 'Apply Sulfur')}")
+                alerts.append({
+                    'code': 'ph_alkaline', 'value': value,
+                    'fertilizer': ferts.get('pH_high', 'Apply Sulfur')
+                })
             elif 6.0 <= value <= 7.5:
-                alerts.append("pH is ideal for most crops.")
+                alerts.append({'code': 'ph_ideal'})
     
     if not alerts:
-        alerts.append("All parameters are healthy.")
+        alerts.append({'code': 'all_healthy'})
     
     return alerts
+
+def check_parameters(crop_name, parameters, thresholds, fertilizers):
+    """
+    Check nutrient and climate parameters, suggest fertilizers.
+    Same checks as evaluate_parameters, rendered as English text.
+    """
+    return [
+        render_alert(alert)
+        for alert in evaluate_parameters(crop_name, parameters, thresholds, fertilizers)
+    ]